@@ -0,0 +1,125 @@
+"""
+Measures the memory taken by the annotations - bytes per annotation of the
+plain dataclasses with per-instance labels (as before the slotted classes),
+of the current slotted classes with interned labels, of their frozen variants
+and of the columnar batches.
+
+Usage:
+    python benchmarks/memory.py [--annotations N] [--aspects-per-review K]
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from pysent.annotation_batch import AnnotationBatch, SentimentBatch
+from pysent.data_structures import (
+    AspectAnnotation,
+    FrozenAspectAnnotation,
+    FrozenSentimentAnnotation,
+    SentimentAnnotation,
+)
+
+# labels as returned by the models, lowercased by the tools
+RAW_LABELS = ["POSITIVE", "NEGATIVE", "NEUTRAL"]
+
+
+@dataclass
+class PlainSentimentAnnotation:
+    text: str
+    label: str
+    score: Optional[float] = None
+
+
+@dataclass
+class PlainAspectAnnotation:
+    text: str
+    aspects: list[PlainSentimentAnnotation]
+
+
+def measure(build: Callable[[], object]) -> int:
+    """Returns the number of bytes allocated by build and still held by its result."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--annotations", type=int, default=1_000_000)
+    parser.add_argument("--aspects-per-review", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    n = args.annotations
+    k = args.aspects_per_review
+    # texts and scores are created up front, they are the same for all variants
+    texts = [f"text number {i}" for i in range(n)]
+    raw_labels = [rng.choice(RAW_LABELS) for _ in range(n)]
+    scores = [rng.random() for _ in range(n)]
+    reviews = [f"review number {i}" for i in range(n // k)]
+
+    def sentiment(cls):
+        return lambda: [
+            cls(text, label.lower(), score)
+            for text, label, score in zip(texts, raw_labels, scores)
+        ]
+
+    def aspect(cls, aspect_cls, container=list):
+        def build():
+            aspects = sentiment(aspect_cls)()
+            return [
+                cls(review, container(aspects[i * k : (i + 1) * k]))
+                for i, review in enumerate(reviews)
+            ]
+
+        return build
+
+    cases = [
+        ("SentimentAnnotation, plain", sentiment(PlainSentimentAnnotation), n),
+        ("SentimentAnnotation, slotted", sentiment(SentimentAnnotation), n),
+        ("SentimentAnnotation, frozen", sentiment(FrozenSentimentAnnotation), n),
+        (
+            "SentimentBatch",
+            lambda: SentimentBatch(
+                texts, [label.lower() for label in raw_labels], scores
+            ),
+            n,
+        ),
+        (
+            "AspectAnnotation, plain",
+            aspect(PlainAspectAnnotation, PlainSentimentAnnotation),
+            n,
+        ),
+        (
+            "AspectAnnotation, slotted",
+            aspect(AspectAnnotation, SentimentAnnotation),
+            n,
+        ),
+        (
+            "AspectAnnotation, frozen",
+            aspect(FrozenAspectAnnotation, FrozenSentimentAnnotation, tuple),
+            n,
+        ),
+        (
+            "AnnotationBatch",
+            lambda: AnnotationBatch.from_annotations(
+                aspect(AspectAnnotation, SentimentAnnotation)()
+            ),
+            n,
+        ),
+    ]
+    for name, build, count in cases:
+        print(f"{name}: {measure(build) / count:.1f} bytes per aspect")
+
+
+if __name__ == "__main__":
+    main()
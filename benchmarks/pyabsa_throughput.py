@@ -0,0 +1,92 @@
+"""
+Compares the throughput of the PyABSA tools in the default and the high
+throughput configuration.
+
+Usage:
+    python benchmarks/pyabsa_throughput.py [--texts FILE] [--n-texts N]
+        [--batch-size B] [--chunk-size C] [--repeats R]
+
+FILE contains one text per line, synthetic reviews are used if it is missing.
+"""
+
+import argparse
+import random
+import time
+
+from pysent.aspect_annotators.extractors.pyabsa_extractor import PyabsaExtractor
+from pysent.aspect_annotators.extrassifiers.pyabsa_extrasifier import (
+    PyabsaExtrassifier,
+)
+
+SUBJECTS = ["The battery", "The screen", "The food", "The service", "This book"]
+OPINIONS = ["is great", "is terrible", "could be better", "is really nice", "is ok"]
+
+
+def synthetic_texts(n_texts: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n_texts):
+        n_sentences = rng.randint(1, 6)
+        texts.append(
+            " ".join(
+                f"{rng.choice(SUBJECTS)} {rng.choice(OPINIONS)}."
+                for _ in range(n_sentences)
+            )
+        )
+    return texts
+
+
+def measure(run, texts: list[str], repeats: int) -> tuple[float, list]:
+    run(texts[:8])  # warm up
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        results = run(texts)
+        best = min(best, time.perf_counter() - start)
+    return len(texts) / best, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--texts", help="file with one text per line")
+    parser.add_argument("--n-texts", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.texts:
+        with open(args.texts, encoding="utf-8") as file:
+            texts = [line.strip() for line in file if line.strip()]
+    else:
+        texts = synthetic_texts(args.n_texts)
+
+    tools = [
+        ("PyabsaExtractor", "extract", PyabsaExtractor, {}),
+        ("PyabsaExtrassifier", "classify", PyabsaExtrassifier, {}),
+    ]
+    for name, method, tool_class, kwargs in tools:
+        baseline = tool_class(**kwargs)
+        fast = tool_class(
+            high_throughput=True,
+            batch_size=args.batch_size,
+            chunk_size=args.chunk_size,
+            **kwargs,
+        )
+        baseline_rate, baseline_results = measure(
+            getattr(baseline, method), texts, args.repeats
+        )
+        fast_rate, fast_results = measure(getattr(fast, method), texts, args.repeats)
+        same = sum(a == b for a, b in zip(baseline_results, fast_results))
+        print(
+            f"{name}: default {baseline_rate:.1f} texts/s, "
+            f"high throughput {fast_rate:.1f} texts/s "
+            f"({fast_rate / baseline_rate:.2f}x), "
+            f"identical outputs {same}/{len(texts)}"
+        )
+        baseline.release()
+        fast.release()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Deterministic stub backends and synthetic corpora of the benchmark suite. The
+stubs need no network or downloaded models: labels are derived from the CRC32
+of the texts, so every run gives the same annotations. Where the backend
+package is installed, the real tool is used with a stub model in place of the
+downloaded one, so the code of the tool itself is measured.
+"""
+
+import importlib.util
+import random
+import zlib
+from contextlib import contextmanager
+from unittest import mock
+
+from pysent.aspect_annotators.classifiers.aspect_classifer import AspectClassifier
+from pysent.aspect_annotators.extractors.aspect_extractor import AspectExtractor
+from pysent.data_structures import (
+    AspectAnnotation,
+    ExtractedAspect,
+    SentimentAnnotation,
+)
+from pysent.overall_annotators.overall_annotator_abstract import (
+    OverallAnnotatorAbstract,
+)
+
+LABELS = ["positive", "negative", "neutral"]
+SUBJECTS = ["battery", "screen", "food", "service", "book", "price", "staff"]
+OPINIONS = ["is great", "is terrible", "could be better", "is really nice", "is ok"]
+FILLERS = ["I think", "Honestly", "Overall", "To be fair", "As expected"]
+
+
+def stub_label(text: str) -> str:
+    return LABELS[zlib.crc32(text.encode("utf-8")) % len(LABELS)]
+
+
+def stub_score(text: str) -> float:
+    return (zlib.crc32(text.encode("utf-8")) % 1000) / 1000
+
+
+def make_corpus(
+    n_texts: int, seed: int = 0
+) -> tuple[list[str], list[str], list[AspectAnnotation]]:
+    """Creates synthetic reviews with one to six sentences, each sentence about
+    one subject.
+
+    Parameters
+    ----------
+    n_texts : int
+        Number of reviews.
+    seed : int, optional
+        Seed of the generator, by default 0
+
+    Returns
+    -------
+    tuple[list[str], list[str], list[AspectAnnotation]]
+        Reviews, their overall labels and their true aspect annotations.
+    """
+    rng = random.Random(seed)
+    texts, labels, annotations = [], [], []
+    for _ in range(n_texts):
+        sentences, aspects = [], []
+        for _ in range(rng.randint(1, 6)):
+            subject = rng.choice(SUBJECTS)
+            sentence = f"The {subject} {rng.choice(OPINIONS)}."
+            if rng.random() < 0.3:
+                sentence = f"{rng.choice(FILLERS)}, {sentence[0].lower()}{sentence[1:]}"
+            sentences.append(sentence)
+            aspects.append(SentimentAnnotation(text=subject, label=rng.choice(LABELS)))
+        text = " ".join(sentences)
+        texts.append(text)
+        labels.append(rng.choice(LABELS))
+        annotations.append(AspectAnnotation(text=text, aspects=aspects))
+    return texts, labels, annotations
+
+
+class StubAnnotator(OverallAnnotatorAbstract):
+    """Overall tool labeling each text by its checksum."""
+
+    def get_config(self) -> dict:
+        return {}
+
+    def classify(self, texts: list[str]) -> list[SentimentAnnotation]:
+        super().check_arguments(texts)
+        return [
+            SentimentAnnotation(
+                text=text, label=stub_label(text), score=stub_score(text)
+            )
+            for text in texts
+        ]
+
+
+class StubExtractor(AspectExtractor):
+    """Extractor returning the known subjects found in the texts."""
+
+    def __init__(self, n_neighbors: int = 4):
+        self.n_neighbors = n_neighbors
+
+    def get_config(self) -> dict:
+        return {"n_neighbors": self.n_neighbors}
+
+    def extract(self, texts: list[str]) -> list[list[ExtractedAspect]]:
+        super().check_arguments(texts)
+        aspects = []
+        for text in texts:
+            words = text.split()
+            extracted = []
+            for i, word in enumerate(words):
+                word = word.strip(".,")
+                if word in SUBJECTS:
+                    start = max(0, i - self.n_neighbors)
+                    context = " ".join(words[start : i + self.n_neighbors + 1])
+                    extracted.append(ExtractedAspect(aspect=word, text=context))
+            aspects.append(extracted)
+        return aspects
+
+
+class StubClassifier(AspectClassifier):
+    """Classifier labeling each aspect by the checksum of its context."""
+
+    def get_config(self) -> dict:
+        return {}
+
+    def classify(
+        self, aspects: list[list[ExtractedAspect]], texts: list[str]
+    ) -> list[AspectAnnotation]:
+        super().check_arguments(aspects, texts)
+        return [
+            AspectAnnotation(
+                text=text,
+                aspects=[
+                    SentimentAnnotation(
+                        text=aspect.aspect,
+                        label=stub_label(aspect.text),
+                        score=stub_score(aspect.text),
+                    )
+                    for aspect in text_aspects
+                ],
+            )
+            for text_aspects, text in zip(aspects, texts)
+        ]
+
+
+def is_installed(package: str) -> bool:
+    return importlib.util.find_spec(package) is not None
+
+
+class StubFlairModel:
+    """Replaces the Flair sentiment classifier, labels the sentences in place."""
+
+    def predict(self, sentences, mini_batch_size: int = 32):
+        for sentence in sentences:
+            text = sentence.to_original_text()
+            sentence.add_label("sentiment", stub_label(text).upper(), stub_score(text))
+
+
+@contextmanager
+def stub_flair_model():
+    """Puts the stub model into the model registry, so the Flair tools created
+    inside the block use it instead of downloading the real one."""
+    import flair
+
+    from pysent.model_registry import registry
+
+    handle = registry.acquire("flair:sentiment", str(flair.device), StubFlairModel)
+    try:
+        yield
+    finally:
+        handle.release()
+
+
+def stub_spacy_pipeline(language: str = "en"):
+    """Blank spacy pipeline with a component marking the known subjects as
+    nominal subjects, in place of the dependency parser."""
+    import spacy
+    from spacy.language import Language
+
+    if "pysent_stub_parser" not in Language.factories:
+
+        @Language.component("pysent_stub_parser")
+        def stub_parser(doc):
+            # sentence starts can not be set once the doc has dependencies
+            for token in doc:
+                token.is_sent_start = token.i == 0 or doc[token.i - 1].text == "."
+            for token in doc:
+                if token.text in SUBJECTS:
+                    token.dep_ = "nsubj"
+            return doc
+
+    nlp = spacy.blank(language)
+    nlp.add_pipe("pysent_stub_parser")
+    return nlp
+
+
+def make_spacy_extractor(**kwargs):
+    """Creates the SpacyExtractor with the stub pipeline in place of the
+    downloaded model."""
+    from pysent.aspect_annotators.extractors.spacy_extractor import SpacyExtractor
+
+    with mock.patch(
+        "pysent.aspect_annotators.extractors.spacy_extractor.spacy.load",
+        lambda name, **_: stub_spacy_pipeline(name.split("_")[0]),
+    ):
+        return SpacyExtractor(**kwargs)
@@ -0,0 +1,501 @@
+"""
+Benchmark suite of the backends and the stages of the annotation. Every case
+is run on synthetic corpora of several sizes with deterministic stub backends,
+so no network or downloaded models are needed. Reported are the throughput
+(texts/s), percentiles of the batch latency and the peak memory traced by
+tracemalloc. Cases of the 'overhead' stage run the annotators with stub tools
+only, so they measure the code of the annotators around the tools and not any
+backend. The time of importing pysent and its subpackages is measured in fresh
+interpreters. Results can be stored as a baseline and compared with it.
+
+Usage (pysent is imported from the checkout the suite is in, not from the
+installed package, so it can be run from any directory):
+    python benchmarks/suite.py [--sizes N [N ...]] [--batch-size B]
+        [--repeats R] [--filter TEXT] [--save NAME] [--compare NAME]
+        [--threshold T]
+
+Baselines are stored in benchmarks/baselines/NAME.json, which is not tracked,
+as the results depend on the machine. Save a baseline before a change and
+compare with it after the change on the same machine. A baseline records the
+machine, the Python and the time of a fixed calibration workload. With
+--compare, every ratio is divided by the ratio of the calibration times, so
+a machine that is faster or slower as a whole (e.g. a different CPU frequency)
+does not count as a change, and a warning is printed when the machine or the
+Python differs. The exit code is 1 if the normalized throughput of any case
+dropped, or the normalized import time grew, by more than the threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+BENCHMARKS = Path(__file__).resolve().parent
+ROOT = BENCHMARKS.parent
+# the suite measures the checkout it is in, also when pysent is installed
+sys.path[:0] = [str(ROOT), str(BENCHMARKS)]
+
+import stubs
+from pysent.aspect_annotator import AspectAnotator
+from pysent.data_structures import transform_output
+from pysent.overall_annotator import OverallAnotator
+from pysent.transforms import transform_aspects
+
+BASELINES = BENCHMARKS / "baselines"
+# modules whose import time is measured, importing them must stay cheap
+IMPORTED_MODULES = [
+    "pysent",
+    "pysent.overall_annotators",
+    "pysent.aspect_annotators",
+    "pysent.aspect_annotators.classifiers",
+    "pysent.aspect_annotators.extractors",
+    "pysent.aspect_annotators.extrassifiers",
+]
+
+
+@dataclass
+class Case:
+    """
+    One measured case - a stage of a backend.
+
+    Parameters
+    ----------
+
+    stage : str
+        Measured stage, e.g. annotate, extract or transform_output.
+    backend : str
+        Backend used in the stage, '-' for the stages without one.
+    prepare : Callable[[range], Any]
+        Function creating the input of run from the positions of the texts
+        of a batch, not included in the time.
+    run : Callable[[Any], Any]
+        Function processing the input of one batch.
+    """
+
+    stage: str
+    backend: str
+    prepare: Callable[[range], Any]
+    run: Callable[[Any], Any]
+
+
+@dataclass
+class Measurement:
+    """
+    Results of one case.
+
+    Parameters
+    ----------
+
+    texts_per_s : float
+        Number of texts processed per second, of the fastest repeat.
+    p50_ms, p95_ms, p99_ms : float
+        Percentiles of the batch latency over all repeats, in milliseconds.
+    peak_mb : float
+        Peak of the memory traced while processing the whole corpus, in MiB.
+    """
+
+    texts_per_s: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    peak_mb: float
+
+
+def batches(n_items: int, batch_size: int) -> list[range]:
+    return [
+        range(i, min(i + batch_size, n_items)) for i in range(0, n_items, batch_size)
+    ]
+
+
+def backends(stack: ExitStack) -> dict[str, tuple[str, list]]:
+    """Creates the backends available in the environment.
+
+    Returns
+    -------
+    dict[str, tuple[str, list]]
+        Level ('overall' or 'aspect') and the tools of each backend.
+    """
+    found = {
+        "stub": ("overall", [stubs.StubAnnotator()]),
+        "stub+stub": ("aspect", [stubs.StubExtractor(), stubs.StubClassifier()]),
+    }
+    if stubs.is_installed("flair"):
+        from pysent.aspect_annotators.classifiers.flair_classifier import (
+            FlairClassifier,
+        )
+        from pysent.overall_annotators.flair_annotator import FlairAnnotator
+
+        stack.enter_context(stubs.stub_flair_model())
+        found["flair"] = ("overall", [FlairAnnotator()])
+        found["stub+flair"] = ("aspect", [stubs.StubExtractor(), FlairClassifier()])
+    if stubs.is_installed("spacy"):
+        found["spacy+stub"] = (
+            "aspect",
+            [stubs.make_spacy_extractor(), stubs.StubClassifier()],
+        )
+        if "flair" in found:
+            found["spacy+flair"] = (
+                "aspect",
+                [found["spacy+stub"][1][0], found["stub+flair"][1][1]],
+            )
+    return found
+
+
+def cases(
+    texts: list[str], labels: list[str], true_annotations: list, stack: ExitStack
+) -> list[Case]:
+    """Creates the cases of the suite. Inputs of the stages other than
+    annotation are computed up front from the outputs of the stub backends,
+    so every classifier gets the same aspects."""
+
+    def select(values: list) -> Callable[[range], list]:
+        return lambda positions: [values[i] for i in positions]
+
+    found = []
+    # stub tools are not measured on their own, pipelines of stubs only
+    # measure the overhead of the annotators
+    measured = {("extract", "stub"), ("classify", "stub")}
+    for name, (level, tools) in backends(stack).items():
+        stage = "overhead" if set(name.split("+")) == {"stub"} else "annotate"
+        if level == "overall":
+            annotator = OverallAnotator(tools[0])
+            found.append(Case(stage, name, select(texts), annotator.annotate))
+            continue
+        extractor, classifier = tools
+        extractor_name, classifier_name = name.split("+")
+        # tools shared by several pipelines are measured once
+        if ("extract", extractor_name) not in measured:
+            measured.add(("extract", extractor_name))
+            found.append(
+                Case("extract", extractor_name, select(texts), extractor.extract)
+            )
+        if ("classify", classifier_name) not in measured:
+            measured.add(("classify", classifier_name))
+            extracted = stubs.StubExtractor().extract(texts)
+            found.append(
+                Case(
+                    "classify",
+                    classifier_name,
+                    lambda positions, extracted=extracted: (
+                        select(extracted)(positions),
+                        select(texts)(positions),
+                    ),
+                    lambda inputs, classifier=classifier: classifier.classify(*inputs),
+                )
+            )
+        found.append(Case(stage, name, select(texts), AspectAnotator(tools).annotate))
+
+    overall = OverallAnotator(stubs.StubAnnotator())
+    predicted_labels = [annotation.label for annotation in overall.annotate(texts)]
+    aspect = AspectAnotator([stubs.StubExtractor(), stubs.StubClassifier()])
+    predicted = aspect.annotate(texts)
+
+    def data_frame(positions: range):
+        frame = transform_output(select(texts)(positions), select(predicted)(positions))
+        frame.insert(0, "id", frame["review"].map({texts[i]: i for i in positions}))
+        return frame
+
+    found += [
+        Case(
+            "calculate_results",
+            "overall",
+            lambda positions: (
+                select(labels)(positions),
+                select(predicted_labels)(positions),
+            ),
+            lambda inputs: overall.calculate_results(*inputs),
+        ),
+        Case(
+            "calculate_results",
+            "aspect",
+            lambda positions: (
+                select(true_annotations)(positions),
+                select(predicted)(positions),
+            ),
+            lambda inputs: aspect.calculate_results(*inputs),
+        ),
+        Case(
+            "transform_output",
+            "-",
+            lambda positions: (select(texts)(positions), select(predicted)(positions)),
+            lambda inputs: transform_output(*inputs),
+        ),
+        Case(
+            "transform_aspects",
+            "-",
+            data_frame,
+            lambda frame: transform_aspects(frame, "id", "review", "aspect", "label"),
+        ),
+    ]
+    return found
+
+
+def measure(case: Case, n_texts: int, batch_size: int, repeats: int) -> Measurement:
+    inputs = [case.prepare(positions) for positions in batches(n_texts, batch_size)]
+    case.run(inputs[0])  # warm up
+
+    latencies = []
+    best = float("inf")
+    for _ in range(repeats):
+        total = 0.0
+        for batch in inputs:
+            start = time.perf_counter()
+            case.run(batch)
+            elapsed = time.perf_counter() - start
+            latencies.append(elapsed)
+            total += elapsed
+        best = min(best, total)
+
+    # tracing slows the code down, so the memory is measured in a separate run
+    tracemalloc.start()
+    for batch in inputs:
+        case.run(batch)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return Measurement(
+        texts_per_s=n_texts / best if best > 0 else float("inf"),
+        p50_ms=float(p50),
+        p95_ms=float(p95),
+        p99_ms=float(p99),
+        peak_mb=peak / 2**20,
+    )
+
+
+def measure_import(module: str, repeats: int) -> dict[str, float]:
+    """Measures the time of importing the module in fresh interpreters, without
+    the start of the interpreter itself.
+
+    Returns
+    -------
+    dict[str, float]
+        Fastest import time of the repeats, in milliseconds.
+    """
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(ROOT), env.get("PYTHONPATH")])
+    )
+    best = float("inf")
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        best = min(best, float(output))
+    return {"import_ms": best * 1000}
+
+
+def calibration_workload():
+    # fixed pure Python work, similar to the code of the annotators
+    counts = {}
+    for i in range(200_000):
+        word = str(i % 1000).lower()
+        counts[word] = counts.get(word, 0) + 1
+    return sorted(counts.items())
+
+
+def measure_calibration(repeats: int) -> float:
+    """Measures the calibration workload, which relates the speed of the
+    machines of the baseline and of the current run.
+
+    Returns
+    -------
+    float
+        Fastest time of the workload, in milliseconds.
+    """
+    best = float("inf")
+    for _ in range(max(repeats, 5)):
+        start = time.perf_counter()
+        calibration_workload()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def cpu_model() -> str:
+    # platform.processor() is often empty on Linux
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as file:
+            for line in file:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def machine_info() -> dict[str, Any]:
+    """Describes the machine and the Python the results were measured with.
+
+    Returns
+    -------
+    dict[str, Any]
+        Hardware, operating system, Python and numpy details.
+    """
+    return {
+        "cpu": cpu_model(),
+        "cpu_count": os.cpu_count(),
+        "architecture": platform.machine(),
+        "platform": platform.platform(),
+        "python_implementation": platform.python_implementation(),
+        "python": platform.python_version(),
+        "python_compiler": platform.python_compiler(),
+        "numpy": np.__version__,
+    }
+
+
+def key(stage: str, backend: str, size: int) -> str:
+    return f"{stage}[{backend}]@{size}"
+
+
+def compare(
+    results: dict[str, dict],
+    baseline: dict[str, dict],
+    threshold: float,
+    speedup: float = 1.0,
+) -> list[str]:
+    """Prints the throughput (or the speed of the import) relative to the
+    baseline and returns the keys of the cases slower by more than the
+    threshold.
+
+    Parameters
+    ----------
+    results : dict[str, dict]
+        Results of the current run by the keys of the cases.
+    baseline : dict[str, dict]
+        Results of the baseline by the keys of the cases.
+    threshold : float
+        Allowed relative drop of the normalized speed.
+    speedup : float, optional
+        Speed of the current machine relative to the machine of the baseline,
+        the ratios are divided by it, by default 1.0
+
+    Returns
+    -------
+    list[str]
+        Keys of the regressed cases.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        if "import_ms" in result:
+            ratio = baseline[name]["import_ms"] / result["import_ms"] / speedup
+            details = f"{ratio:6.2f}x import speed {result['import_ms']:9.1f} ms"
+        else:
+            ratio = result["texts_per_s"] / baseline[name]["texts_per_s"] / speedup
+            memory = result["peak_mb"] - baseline[name]["peak_mb"]
+            details = f"{ratio:6.2f}x throughput {memory:+9.2f} MiB"
+        flag = ""
+        if ratio < 1 - threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:48} {details}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--filter", default="", help="run cases containing the text")
+    parser.add_argument("--save", metavar="NAME", help="store results as a baseline")
+    parser.add_argument("--compare", metavar="NAME", help="compare with a baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="allowed relative drop of the throughput (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    machine = machine_info()
+    calibration_ms = measure_calibration(args.repeats)
+    print(f"{machine['cpu']}, {machine['cpu_count']} CPUs, Python {machine['python']}")
+    print(f"calibration {calibration_ms:.1f} ms\n")
+
+    results = {}
+    print(
+        f"{'case':48} {'texts/s':>12} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'p99 ms':>9} {'peak MiB':>9}"
+    )
+    for size in args.sizes:
+        texts, labels, true_annotations = stubs.make_corpus(size)
+        with ExitStack() as stack:
+            for case in cases(texts, labels, true_annotations, stack):
+                name = key(case.stage, case.backend, size)
+                if args.filter not in name:
+                    continue
+                measurement = measure(case, len(texts), args.batch_size, args.repeats)
+                results[name] = asdict(measurement)
+                print(
+                    f"{name:48} {measurement.texts_per_s:12.1f} "
+                    f"{measurement.p50_ms:9.3f} {measurement.p95_ms:9.3f} "
+                    f"{measurement.p99_ms:9.3f} {measurement.peak_mb:9.2f}"
+                )
+
+    for module in IMPORTED_MODULES:
+        name = f"import[{module}]"
+        if args.filter not in name:
+            continue
+        results[name] = measure_import(module, args.repeats)
+        print(f"{name:48} {results[name]['import_ms']:9.1f} ms")
+
+    if args.save:
+        BASELINES.mkdir(exist_ok=True)
+        payload = {
+            "machine": machine,
+            "calibration_ms": calibration_ms,
+            "settings": {
+                "sizes": args.sizes,
+                "batch_size": args.batch_size,
+                "repeats": args.repeats,
+            },
+            "results": results,
+        }
+        path = BASELINES / f"{args.save}.json"
+        path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+        print(f"saved baseline {path}")
+
+    if args.compare:
+        path = BASELINES / f"{args.compare}.json"
+        baseline = json.loads(path.read_text(encoding="utf-8"))
+        speedup = baseline["calibration_ms"] / calibration_ms
+        print(f"\ncompared with {path}, this machine is {speedup:.2f}x as fast")
+        differences = [
+            name
+            for name, value in machine.items()
+            if baseline["machine"].get(name) != value
+        ]
+        if differences:
+            print(
+                "warning: the baseline was measured with a different "
+                f"{', '.join(differences)}, ratios are only approximate"
+            )
+        regressions = compare(results, baseline["results"], args.threshold, speedup)
+        if regressions:
+            print(f"{len(regressions)} case(s) slower than the baseline")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
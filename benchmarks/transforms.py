@@ -0,0 +1,72 @@
+"""
+Measures the time of the conversions between the annotations and the data
+frames - transform_output and transform_aspects.
+
+Usage:
+    python benchmarks/transforms.py [--rows N] [--aspects-per-review K]
+"""
+
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from pysent.data_structures import (
+    AspectAnnotation,
+    SentimentAnnotation,
+    transform_output,
+)
+from pysent.transforms import transform_aspects
+
+LABELS = ["positive", "negative", "neutral"]
+
+
+def make_annotations(
+    n_rows: int, aspects_per_review: int, seed: int = 0
+) -> tuple[list[str], list[AspectAnnotation]]:
+    rng = random.Random(seed)
+    reviews = []
+    annotations = []
+    n_reviews = n_rows // aspects_per_review
+    for i in range(n_reviews):
+        review = f"Review number {i} about the product."
+        reviews.append(review)
+        annotations.append(
+            AspectAnnotation(
+                text=review,
+                aspects=[
+                    SentimentAnnotation(
+                        text=f"aspect {rng.randrange(1000)}", label=rng.choice(LABELS)
+                    )
+                    for _ in range(aspects_per_review)
+                ],
+            )
+        )
+    return reviews, annotations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--aspects-per-review", type=int, default=4)
+    args = parser.parse_args()
+
+    reviews, annotations = make_annotations(args.rows, args.aspects_per_review)
+
+    start = time.perf_counter()
+    data_frame = transform_output(reviews, annotations)
+    elapsed = time.perf_counter() - start
+    print(f"transform_output: {len(data_frame)} rows in {elapsed:.2f} s")
+
+    data_frame.insert(0, "id", data_frame.groupby("review", sort=False).ngroup())
+    start = time.perf_counter()
+    restored = transform_aspects(data_frame, "id", "review", "aspect", "label")
+    elapsed = time.perf_counter() - start
+    print(f"transform_aspects: {len(data_frame)} rows in {elapsed:.2f} s")
+
+    assert len(restored) == len(annotations)
+
+
+if __name__ == "__main__":
+    main()
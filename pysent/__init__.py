@@ -1,9 +1,39 @@
 """
-Init for module
+Init for module. Attributes are loaded lazily, so importing pysent does not
+import any of the backends until they are used.
 """
 
-from pysent.data_structures import *
-from pysent.aspect_annotators.classifiers import *
-from pysent.overall_annotators import *
-from pysent.aspect_annotator import AspectAnotator
-from pysent.overall_annotator import OverallAnotator
+from pysent._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "ExtractedAspect": "pysent.data_structures",
+        "SentimentAnnotation": "pysent.data_structures",
+        "AspectAnnotation": "pysent.data_structures",
+        "FrozenExtractedAspect": "pysent.data_structures",
+        "FrozenSentimentAnnotation": "pysent.data_structures",
+        "FrozenAspectAnnotation": "pysent.data_structures",
+        "SentimentLabel": "pysent.data_structures",
+        "OrdinaryResults": "pysent.data_structures",
+        "AspectBasedResults": "pysent.data_structures",
+        "concat_results": "pysent.data_structures",
+        "transform_output": "pysent.data_structures",
+        "SentimentBatch": "pysent.annotation_batch",
+        "AnnotationBatch": "pysent.annotation_batch",
+        "AspectClassifier": "pysent.aspect_annotators.classifiers.aspect_classifer",
+        "FlairClassifier": "pysent.aspect_annotators.classifiers.flair_classifier",
+        "SentiClassifier": "pysent.aspect_annotators.classifiers.senti_classifier",
+        "OverallAnnotatorAbstract": "pysent.overall_annotators.overall_annotator_abstract",
+        "FlairAnnotator": "pysent.overall_annotators.flair_annotator",
+        "ChatGPTAnnotator": "pysent.overall_annotators.chatgpt_annotator",
+        "SentiAnnotator": "pysent.overall_annotators.senti_annotator",
+        "AspectAnotator": "pysent.aspect_annotator",
+        "OverallAnotator": "pysent.overall_annotator",
+        "AnnotationCache": "pysent.cache",
+        "cached": "pysent.cache",
+        "read_texts": "pysent.corpus",
+        "AnnotationWriter": "pysent.corpus",
+        "annotate_corpus": "pysent.corpus",
+    },
+)
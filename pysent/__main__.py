@@ -0,0 +1,7 @@
+import sys
+
+from pysent.cli import main
+
+# spawned worker processes import this module again, under another name
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""
+Helpers for lazy, on demand loading of module attributes (PEP 562). Backends
+pull in heavy dependencies (torch, spacy, pyabsa, openai), so packages only
+import the module that defines an attribute when it is accessed for the first time.
+"""
+
+import importlib
+import sys
+from typing import Callable
+
+
+def attach(
+    package_name: str, attributes: dict[str, str]
+) -> tuple[Callable, Callable, list[str]]:
+    """Creates module level __getattr__ and __dir__ functions for a package.
+
+    Parameters
+    ----------
+    package_name : str
+        Name of the package the functions are created for, usually __name__.
+    attributes : dict[str, str]
+        Mapping from the attribute name to the absolute name of the module
+        that defines it.
+
+    Returns
+    -------
+    tuple[Callable, Callable, list[str]]
+        __getattr__, __dir__ and __all__ of the package.
+    """
+
+    def __getattr__(name: str):
+        module_name = attributes.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package_name!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name), name)
+        # cache the attribute so __getattr__ is not called again
+        setattr(sys.modules[package_name], name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(vars(sys.modules[package_name])) | set(attributes))
+
+    return __getattr__, __dir__, list(attributes)
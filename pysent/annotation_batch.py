@@ -0,0 +1,375 @@
+"""
+Columnar containers of the annotations. Instead of one dataclass per
+annotation, texts, aspects, label codes and scores are kept in NumPy arrays,
+so they can be passed to pandas or Arrow without looping in Python. The
+containers behave like lists of SentimentAnnotation / AspectAnnotation, so they
+can be returned by the tools in place of the lists.
+"""
+
+import operator
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from pysent.data_structures import AspectAnnotation, SentimentAnnotation
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+
+def encode_labels(labels: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Encodes the labels as indices of the distinct labels, in the order of
+    their first occurrence.
+
+    Parameters
+    ----------
+    labels : list[str]
+        List of labels.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        Codes of the labels and the distinct labels.
+    """
+    categories = {}
+    codes = [categories.setdefault(label, len(categories)) for label in labels]
+    return np.array(codes, dtype=np.int32), to_object_array(list(categories))
+
+
+def to_object_array(values: list) -> np.ndarray:
+    # np.array would turn a list of equal length sequences into a 2D array
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+class SentimentBatch(Sequence):
+    def __init__(
+        self,
+        text: list[str],
+        label: list[str],
+        score: Optional[list[Optional[float]]] = None,
+    ):
+        """Columnar list of sentiment annotations.
+
+        Parameters
+        ----------
+        text : list[str]
+            Labeled texts (or aspects).
+        label : list[str]
+            Label of each text.
+        score : Optional[list[Optional[float]]], optional
+            Score of each text, missing scores are None or NaN, by default None
+
+        Raises
+        ------
+        ValueError
+            Error if the columns have different lengths.
+        """
+        label_codes, labels = encode_labels(label)
+        self._set_columns(to_object_array(list(text)), label_codes, labels, score)
+
+    def _set_columns(
+        self,
+        text: np.ndarray,
+        label_codes: np.ndarray,
+        labels: np.ndarray,
+        score: Optional[np.ndarray],
+    ):
+        if score is None:
+            score = np.full(len(text), np.nan)
+        score = np.asarray(score, dtype=np.float64)
+        if not len(text) == len(label_codes) == len(score):
+            raise ValueError("All columns must have the same length!")
+        self.text = text
+        self.label_codes = label_codes
+        self.labels = labels
+        self.score = score
+
+    @classmethod
+    def from_codes(
+        cls,
+        text: np.ndarray,
+        label_codes: np.ndarray,
+        labels: np.ndarray,
+        score: Optional[np.ndarray] = None,
+    ) -> "SentimentBatch":
+        """Creates the batch from already encoded labels, without copying the
+        arrays.
+
+        Parameters
+        ----------
+        text : np.ndarray
+            Object array of the labeled texts.
+        label_codes : np.ndarray
+            Integer array, index of the label of each text in labels.
+        labels : np.ndarray
+            Object array of the distinct labels.
+        score : Optional[np.ndarray], optional
+            Float array of the scores, NaN for missing, by default None
+
+        Returns
+        -------
+        SentimentBatch
+            Batch with the given columns.
+        """
+        batch = cls.__new__(cls)
+        batch._set_columns(text, label_codes, labels, score)
+        return batch
+
+    @classmethod
+    def from_annotations(
+        cls, annotations: list[SentimentAnnotation]
+    ) -> "SentimentBatch":
+        """Creates the batch from the list of annotations.
+
+        Parameters
+        ----------
+        annotations : list[SentimentAnnotation]
+            List of annotations.
+
+        Returns
+        -------
+        SentimentBatch
+            Batch with the same annotations.
+        """
+        return cls(
+            [annotation.text for annotation in annotations],
+            [annotation.label for annotation in annotations],
+            [
+                np.nan if annotation.score is None else annotation.score
+                for annotation in annotations
+            ],
+        )
+
+    @property
+    def label(self) -> np.ndarray:
+        """Object array with the label of each text."""
+        return self.labels[self.label_codes]
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            # slices are views of the same arrays
+            return self.from_codes(
+                self.text[index],
+                self.label_codes[index],
+                self.labels,
+                self.score[index],
+            )
+        index = operator.index(index)
+        score = self.score[index]
+        return SentimentAnnotation(
+            text=self.text[index],
+            label=self.labels[self.label_codes[index]],
+            score=None if np.isnan(score) else float(score),
+        )
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
+
+    def to_list(self) -> list[SentimentAnnotation]:
+        """Converts the batch into the list of annotations."""
+        return list(self)
+
+    def to_pandas(self) -> "pd.DataFrame":
+        """Converts the batch into a data frame with the text, label and score
+        columns. Labels are categorical, so the codes are not copied.
+
+        Returns
+        -------
+        pd.DataFrame
+            Data frame with one row per annotation.
+        """
+        import pandas as pd
+
+        return pd.DataFrame(
+            {
+                "text": self.text,
+                "label": pd.Categorical.from_codes(self.label_codes, self.labels),
+                "score": self.score,
+            },
+            copy=False,
+        )
+
+    def to_arrow(self) -> "pa.Table":
+        """Converts the batch into an Arrow table with the text, label and score
+        columns. Label codes and scores are shared with the batch without
+        copying (labels are dictionary encoded, missing scores are NaN), texts
+        are converted into Arrow strings.
+
+        Returns
+        -------
+        pa.Table
+            Table with one row per annotation.
+        """
+        import pyarrow as pa
+
+        return pa.table(
+            {
+                "text": pa.array(self.text, type=pa.string()),
+                "label": pa.DictionaryArray.from_arrays(
+                    self.label_codes, pa.array(self.labels, type=pa.string())
+                ),
+                "score": pa.array(self.score),
+            }
+        )
+
+
+class AnnotationBatch(Sequence):
+    def __init__(self, text: list[str], offsets: list[int], aspects: SentimentBatch):
+        """Columnar list of aspect annotations. Aspects of all texts are kept in
+        one SentimentBatch, aspects of the i-th text are its rows from
+        offsets[i] to offsets[i + 1].
+
+        Parameters
+        ----------
+        text : list[str]
+            Annotated texts.
+        offsets : list[int]
+            Boundaries of the aspects of each text, one element longer than text,
+            starting with 0.
+        aspects : SentimentBatch
+            Aspects of all texts.
+
+        Raises
+        ------
+        ValueError
+            Error if the offsets do not match the texts and the aspects.
+        """
+        offsets = np.asarray(offsets, dtype=np.int64)
+        if len(offsets) != len(text) + 1 or offsets[0] != 0:
+            raise ValueError(
+                "Offsets must start with 0 and have one element per text more!"
+            )
+        if offsets[-1] != len(aspects) or np.any(np.diff(offsets) < 0):
+            raise ValueError(
+                "Offsets must be non decreasing and end with number of aspects!"
+            )
+        self.text = (
+            text if isinstance(text, np.ndarray) else to_object_array(list(text))
+        )
+        self.offsets = offsets
+        self.aspects = aspects
+
+    @classmethod
+    def from_annotations(cls, annotations: list[AspectAnnotation]) -> "AnnotationBatch":
+        """Creates the batch from the list of annotations.
+
+        Parameters
+        ----------
+        annotations : list[AspectAnnotation]
+            List of annotations.
+
+        Returns
+        -------
+        AnnotationBatch
+            Batch with the same annotations.
+        """
+        counts = [len(annotation.aspects) for annotation in annotations]
+        return cls(
+            [annotation.text for annotation in annotations],
+            np.concatenate([[0], np.cumsum(counts, dtype=np.int64)]),
+            SentimentBatch.from_annotations(
+                [aspect for annotation in annotations for aspect in annotation.aspects]
+            ),
+        )
+
+    @property
+    def text_ids(self) -> np.ndarray:
+        """Index of the text of each aspect."""
+        return np.repeat(np.arange(len(self.text)), np.diff(self.offsets))
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            indices = range(len(self))[index]
+            if indices.step != 1:
+                return self.from_annotations([self[i] for i in indices])
+            start, stop = indices.start, max(indices.start, indices.stop)
+            offsets = self.offsets[start : stop + 1]
+            return AnnotationBatch(
+                self.text[start:stop],
+                offsets - offsets[0],
+                self.aspects[offsets[0] : offsets[-1]],
+            )
+        index = range(len(self))[operator.index(index)]
+        start, stop = self.offsets[index], self.offsets[index + 1]
+        return AspectAnnotation(
+            text=self.text[index], aspects=list(self.aspects[start:stop])
+        )
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
+
+    def to_list(self) -> list[AspectAnnotation]:
+        """Converts the batch into the list of annotations."""
+        return list(self)
+
+    def to_pandas(self) -> "pd.DataFrame":
+        """Converts the batch into a data frame with one row per aspect and the
+        text_id, review, aspect, label and score columns. Texts without aspects
+        have no rows.
+
+        Returns
+        -------
+        pd.DataFrame
+            Data frame with one row per aspect.
+        """
+        import pandas as pd
+
+        text_ids = self.text_ids
+        return pd.DataFrame(
+            {
+                "text_id": text_ids,
+                "review": self.text[text_ids],
+                "aspect": self.aspects.text,
+                "label": pd.Categorical.from_codes(
+                    self.aspects.label_codes, self.aspects.labels
+                ),
+                "score": self.aspects.score,
+            },
+            copy=False,
+        )
+
+    def to_arrow(self) -> "pa.Table":
+        """Converts the batch into an Arrow table with one row per aspect and the
+        text_id, aspect, label and score columns, and the texts stored once as
+        a dictionary of the review column.
+
+        Returns
+        -------
+        pa.Table
+            Table with one row per aspect.
+        """
+        import pyarrow as pa
+
+        aspects = self.aspects.to_arrow()
+        text_ids = self.text_ids
+        return pa.table(
+            {
+                "text_id": pa.array(text_ids),
+                "review": pa.DictionaryArray.from_arrays(
+                    text_ids, pa.array(self.text, type=pa.string())
+                ),
+                "aspect": aspects.column("text"),
+                "label": aspects.column("label"),
+                "score": aspects.column("score"),
+            }
+        )
@@ -4,20 +4,24 @@ wraps them into one. The class also allows user to perform aspect based
 sentiment analysis and test tools on already annotated texts.
 """
 
-from typing import Literal
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Literal, Optional
 from pysent.data_structures import (
     SentimentAnnotation,
     AspectAnnotation,
     AspectBasedResults,
 )
 from pysent.transforms import transform_aspects
-import numpy as np
-import pandas as pd
+from pysent.matching import count_matches
+from pysent.batching import deduplicate_texts, expand_results, iter_chunks
+from pysent.parallel import parallel_annotate
 
 from pysent.aspect_annotators.extractors import AspectExtractor
 from pysent.aspect_annotators.classifiers import AspectClassifier
 from pysent.aspect_annotators.extrassifiers import AspectExtrassifier
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 class AspectAnotator:
     def __init__(self, pipeline: list) -> None:
@@ -60,14 +64,21 @@ class AspectAnotator:
                 )
 
         self.pipeline = pipeline
+        self.last_dedup_ratio = None
 
-    def annotate(self, texts: list[str]) -> list[AspectAnnotation]:
+    def annotate(
+        self, texts: list[str], deduplicate: bool = False
+    ) -> list[AspectAnnotation]:
         """Extracts and annotates aspects from the given texts.
 
         Parameters
         ----------
         texts : list[str]
             List of texts to annotate.
+        deduplicate : bool, optional
+            If True, each distinct text is annotated once and the annotation is
+            shared by all its duplicates. The fraction of texts that were
+            duplicates is stored in last_dedup_ratio, by default False
 
         Returns
         -------
@@ -77,6 +88,14 @@ class AspectAnotator:
         if isinstance(texts, str):
             texts = [texts]
 
+        if deduplicate:
+            unique_texts, inverse = deduplicate_texts(texts)
+            self.last_dedup_ratio = (
+                1 - len(unique_texts) / len(texts) if len(texts) > 0 else 0.0
+            )
+            annotations = self.annotate(unique_texts)
+            return expand_results(annotations, inverse)
+
         if len(self.pipeline) == 2:
             extractor = self.pipeline[0]
             classifier = self.pipeline[1]
@@ -90,9 +109,89 @@ class AspectAnotator:
 
         return annotations
 
+    def annotate_iter(
+        self, texts: Iterable[str], batch_size: int = 256, deduplicate: bool = False
+    ) -> Iterator[AspectAnnotation]:
+        """Annotates the texts lazily, pulling batch_size texts at a time from
+        the iterable, so neither the texts nor the annotations have to fit
+        in memory at once.
+
+        Parameters
+        ----------
+        texts : Iterable[str]
+            Iterable of texts to annotate, e.g. a generator reading them from a file.
+        batch_size : int, optional
+            Number of texts passed to the tools at once, by default 256
+        deduplicate : bool, optional
+            If True, duplicates are removed within each batch, see annotate,
+            by default False
+
+        Yields
+        ------
+        AspectAnnotation
+            Aspects with sentiment of each text, in the same order as the texts.
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+
+        for batch in iter_chunks(texts, batch_size):
+            yield from self.annotate(batch, deduplicate=deduplicate)
+
+    @classmethod
+    def annotate_parallel(
+        cls,
+        factory: Callable[[], list],
+        texts: Iterable[str],
+        n_workers: Optional[int] = None,
+        batch_size: int = 256,
+        threads_per_worker: Optional[int] = None,
+        deduplicate: bool = False,
+    ) -> list[AspectAnnotation]:
+        """Annotates the texts in parallel worker processes. Each worker builds
+        its own pipeline list once with the factory, so the factory (not the loaded model)
+        has to be picklable, e.g. a module level function returning [SpacyExtractor(), FlairClassifier()].
+
+        Parameters
+        ----------
+        factory : Callable[[], list]
+            Function without arguments which creates the pipeline list.
+        texts : Iterable[str]
+            Iterable of texts to annotate.
+        n_workers : Optional[int], optional
+            Number of worker processes, by default number of cores
+        batch_size : int, optional
+            Number of texts sent to a worker at once, by default 256
+        threads_per_worker : Optional[int], optional
+            Number of torch / BLAS threads of each worker, by default number of
+            cores divided by n_workers
+        deduplicate : bool, optional
+            If True, duplicates are removed within each batch, by default False
+
+        Returns
+        -------
+        list[AspectAnnotation]
+            List of aspects with sentiment, in the same order as the texts. All
+            annotations are held in memory, pysent.parallel.parallel_annotate
+            yields them one by one instead.
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+
+        return list(
+            parallel_annotate(
+                cls,
+                factory,
+                texts,
+                n_workers=n_workers,
+                batch_size=batch_size,
+                threads_per_worker=threads_per_worker,
+                deduplicate=deduplicate,
+            )
+        )
+
     def test_annotator(
         self,
-        true_annotations: list[AspectAnnotation] | pd.DataFrame,
+        true_annotations: "list[AspectAnnotation] | pd.DataFrame",
         id_column: str = None,
         text_column: str = None,
         aspect_column: str = None,
@@ -124,6 +223,8 @@ class AspectAnotator:
         ValueError
             If columns are missing
         """
+        import pandas as pd
+
         if isinstance(true_annotations, pd.DataFrame):
             for col in [id_column, text_column, aspect_column, sentiment_column]:
                 if col is None:
@@ -159,44 +260,18 @@ class AspectAnotator:
         AspectBasedResults
             Object with results, class AspectBasedResults
         """
-        COR = 0
-        INC = 0
-        PAR = 0
-        SPU = 0
+        import pandas as pd
 
         if isinstance(true_annotations, pd.DataFrame):
             true_annotations = transform_aspects(true_annotations)
 
-        for pred_an, true_an in zip(predicted_annotations, true_annotations):
-            for pred in pred_an.aspects:
-                pred_aspect = pred.text.lower()
-                pred_sentiment = pred.label.lower()
-                matching_aspect = False
-                for true_ in true_an.aspects:
-                    true_aspect = true_.text.lower()
-                    true_sentiment = true_.label.lower()
-                    if pred_aspect == true_aspect:
-                        if pred_sentiment == true_sentiment:
-                            COR += 1
-                        else:
-                            INC += 1
-                        matching_aspect = True
-                        break
-                if not matching_aspect:
-                    for true_ in true_an.aspects:
-                        true_aspect = true_.text.lower()
-                        true_sentiment = true_.label.lower()
-                        if true_aspect in pred_aspect or pred_aspect in true_aspect:
-                            if pred_sentiment == true_sentiment:
-                                PAR += 1
-                            else:
-                                INC += 1
-                            matching_aspect = True
-                            break
-                if not matching_aspect:
-                    SPU += 1
-
-        MIS = np.sum([len(ta.aspects) for ta in true_annotations]) - COR - INC - PAR
+        counts = count_matches(true_annotations, predicted_annotations)
+        COR = counts.correct
+        INC = counts.incorrect
+        PAR = counts.partial
+        SPU = counts.spurious
+
+        MIS = sum([len(ta.aspects) for ta in true_annotations]) - COR - INC - PAR
 
         name = " + ".join([type(tool).__name__ for tool in self.pipeline])
         return AspectBasedResults(
@@ -0,0 +1,17 @@
+from pysent._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "AspectClassifier": "pysent.aspect_annotators.classifiers.aspect_classifer",
+        "FlairClassifier": "pysent.aspect_annotators.classifiers.flair_classifier",
+        "SentiClassifier": "pysent.aspect_annotators.classifiers.senti_classifier",
+        "AspectExtractor": "pysent.aspect_annotators.extractors.aspect_extractor",
+        "SpacyExtractor": "pysent.aspect_annotators.extractors.spacy_extractor",
+        "ChatGPTExtractor": "pysent.aspect_annotators.extractors.chatgpt_extractor",
+        "PyabsaExtractor": "pysent.aspect_annotators.extractors.pyabsa_extractor",
+        "AspectExtrassifier": "pysent.aspect_annotators.extrassifiers.aspect_extrassifier",
+        "PyabsaExtrassifier": "pysent.aspect_annotators.extrassifiers.pyabsa_extrasifier",
+        "ChatGPTExtrassifier": "pysent.aspect_annotators.extrassifiers.chatgpt_extrassifier",
+    },
+)
@@ -1,3 +0,0 @@
-from pysent.aspect_annotators.classifiers import *
-from pysent.aspect_annotators.extractors import *
-from pysent.aspect_annotators.extrassifiers import *
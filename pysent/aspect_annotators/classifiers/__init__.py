@@ -1,3 +1,10 @@
-from pysent.aspect_annotators.classifiers.aspect_classifer import AspectClassifier
-from pysent.aspect_annotators.classifiers.flair_classifier import FlairClassifier
-from pysent.aspect_annotators.classifiers.senti_classifier import SentiClassifier
+from pysent._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "AspectClassifier": "pysent.aspect_annotators.classifiers.aspect_classifer",
+        "FlairClassifier": "pysent.aspect_annotators.classifiers.flair_classifier",
+        "SentiClassifier": "pysent.aspect_annotators.classifiers.senti_classifier",
+    },
+)
@@ -2,11 +2,15 @@
 Sentiment classifier based on the Flair Python package.
 """
 
+import flair
 from flair.data import Sentence
 from flair.nn import Classifier
-from itertools import chain
+from itertools import accumulate, chain
 
 from pysent.aspect_annotators.classifiers.aspect_classifer import AspectClassifier
+from pysent.annotation_batch import AnnotationBatch, SentimentBatch
+from pysent.batching import length_buckets
+from pysent.model_registry import registry
 from pysent.data_structures import (
     AspectAnnotation,
     ExtractedAspect,
@@ -15,42 +19,109 @@ from pysent.data_structures import (
 
 
 class FlairClassifier(AspectClassifier):
-    def __init__(self, language: str = "en"):
+    def __init__(
+        self,
+        language: str = "en",
+        mini_batch_size: int = 32,
+        return_batch: bool = False,
+    ):
         """Object constructor
 
         Parameters
         ----------
         language : str, optional
             Language to use, one of ['pl', 'en'], by default "en"
+        mini_batch_size : int, optional
+            Number of chunks passed to the model in one forward pass, by default 32
+        return_batch : bool, optional
+            If True, annotations are returned as AnnotationBatch (columnar, list-like)
+            instead of the list of dataclasses, by default False
 
         Raises
         ------
         ValueError
             Error is language not supported
+        ValueError
+            Error if mini_batch_size is not positive
         """
         if language not in ["en", "pl"]:
             raise ValueError("Language must be either 'en' or 'pl'!")
-        self.classifier = Classifier.load("sentiment")
+        if mini_batch_size < 1:
+            raise ValueError("mini_batch_size must be a positive integer!")
+        self.language = language
+        self.mini_batch_size = mini_batch_size
+        self.return_batch = return_batch
+        # the model is shared with other Flair tools of the process
+        self.model_handle = registry.acquire(
+            "flair:sentiment", str(flair.device), lambda: Classifier.load("sentiment")
+        )
+        self.classifier = self.model_handle.model
+
+    def get_config(self) -> dict:
+        return {"language": self.language, "model": "sentiment"}
+
+    def release(self):
+        """Releases the model shared through the registry, the tool can not be
+        used afterwards."""
+        self.model_handle.release()
+        self.classifier = None
 
     def classify(
         self, aspects: list[list[ExtractedAspect]], texts: str
     ) -> list[AspectAnnotation]:
         super().check_arguments(aspects, texts)
 
-        annotations = []
-
-        for text_aspects, text in zip(aspects, texts):
-            aspects_list = []
-            for extracted_aspect in text_aspects:
-                aspect = extracted_aspect.aspect
-                chunk = extracted_aspect.text
-                sentence = Sentence(chunk)
-                self.classifier.predict(sentence)
-                aspects_list.append(
-                    SentimentAnnotation(
-                        text=aspect, label=sentence.tag.lower(), score=sentence.score
-                    )
+        # chunks of all texts are flattened into one stream, identical chunks
+        # are predicted only once
+        aspects_unlist = list(chain.from_iterable(aspects))
+        chunk_ids = {}
+        for extracted_aspect in aspects_unlist:
+            chunk_ids.setdefault(extracted_aspect.text, len(chunk_ids))
+        sentences = [Sentence(chunk) for chunk in chunk_ids]
+
+        buckets = length_buckets(
+            [len(sentence) for sentence in sentences], self.mini_batch_size
+        )
+        with self.model_handle.lock:
+            for bucket in buckets:
+                self.classifier.predict(
+                    [sentences[i] for i in bucket],
+                    mini_batch_size=self.mini_batch_size,
                 )
-            annotations.append(AspectAnnotation(text=text, aspects=aspects_list))
+
+        offsets = list(
+            accumulate([len(text_aspects) for text_aspects in aspects], initial=0)
+        )
+
+        if self.return_batch:
+            chunk_sentences = [
+                sentences[chunk_ids[extracted_aspect.text]]
+                for extracted_aspect in aspects_unlist
+            ]
+            return AnnotationBatch(
+                texts,
+                offsets,
+                SentimentBatch(
+                    [extracted_aspect.aspect for extracted_aspect in aspects_unlist],
+                    [sentence.tag.lower() for sentence in chunk_sentences],
+                    [sentence.score for sentence in chunk_sentences],
+                ),
+            )
+
+        sentiments = []
+        for extracted_aspect in aspects_unlist:
+            sentence = sentences[chunk_ids[extracted_aspect.text]]
+            sentiments.append(
+                SentimentAnnotation(
+                    text=extracted_aspect.aspect,
+                    label=sentence.tag.lower(),
+                    score=sentence.score,
+                )
+            )
+
+        annotations = [
+            AspectAnnotation(text=text, aspects=sentiments[start:stop])
+            for text, start, stop in zip(texts, offsets, offsets[1:])
+        ]
 
         return annotations
@@ -2,11 +2,14 @@
 Sentiment classifier based on the SentiStrenght tool and Python wrapper for it - PySentiStr package.
 """
 
+import os
+
 from sentistrength import PySentiStr
 import numpy as np
-from itertools import chain
+from itertools import accumulate, chain, islice
 
 from pysent.aspect_annotators.classifiers.aspect_classifer import AspectClassifier
+from pysent.sentistrength_pool import get_pool
 from pysent.data_structures import (
     AspectAnnotation,
     ExtractedAspect,
@@ -16,7 +19,13 @@ from pysent.data_structures import (
 
 class SentiClassifier(AspectClassifier):
     def __init__(
-        self, language: str = "en", ss_jar_path: str = None, ss_lang_path: str = None
+        self,
+        language: str = "en",
+        ss_jar_path: str = None,
+        ss_lang_path: str = None,
+        use_keywords: bool = True,
+        n_workers: int = 2,
+        chunk_size: int = 5000,
     ):
         """Object constructor
 
@@ -28,6 +37,19 @@ class SentiClassifier(AspectClassifier):
             Path to jar SentiStrenght file, by default None
         ss_lang_path : str, optional
             Path to jar SentiStrenght language folder, by default None
+        use_keywords : bool, optional
+            If True, the whole text is scored with the aspect as the SentiStrength
+            keyword, which requires a new SentiStrength run per call. If False,
+            the context of the aspect found by the extractor is scored by the
+            pool of persistent SentiStrength processes shared with other tools,
+            by default True
+        n_workers : int, optional
+            Number of SentiStrength processes of the pool, used if use_keywords
+            is False and the pool for the given files is not created yet,
+            by default 2
+        chunk_size : int, optional
+            Number of texts (if use_keywords is True) or aspects scored at once,
+            by default 5000
 
         Raises
         ------
@@ -37,47 +59,98 @@ class SentiClassifier(AspectClassifier):
             Error if data folder path is missing.
         ValueError
             Error if language is not one of ['en', 'pl'].
+        ValueError
+            Error if chunk_size is not positive.
         """
         if ss_jar_path == None:
             raise ValueError(
                 "Missing path for SentiStrength .jar! Note: Provide absolute path instead of relative path"
             )
-        if ss_jar_path == None:
+        if ss_lang_path == None:
             raise ValueError(
                 "Missing path for SentiStrength data folder! Note: Provide absolute path instead of relative path"
             )
         if language not in ["en", "pl"]:
             raise ValueError("Language must be either 'en' or 'pl'!")
-        self.classifier = PySentiStr()
-        self.classifier.setSentiStrengthPath(ss_jar_path)
-        self.classifier.setSentiStrengthLanguageFolderPath(ss_lang_path)
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer!")
+        self.language = language
+        self.ss_jar_path = os.path.abspath(ss_jar_path)
+        self.ss_lang_path = os.path.abspath(ss_lang_path)
+        self.chunk_size = chunk_size
+        self.use_keywords = use_keywords
+        if use_keywords:
+            # SentiStrength takes keywords per process, so they can not be
+            # streamed through the persistent processes of the pool
+            self.classifier = PySentiStr()
+            self.classifier.setSentiStrengthPath(ss_jar_path)
+            self.classifier.setSentiStrengthLanguageFolderPath(ss_lang_path)
+        else:
+            self.pool = get_pool(ss_jar_path, ss_lang_path, n_workers=n_workers)
+
+    def get_config(self) -> dict:
+        # the output depends on the SentiStrength files, not on the language
+        return {
+            "language": self.language,
+            "ss_jar_path": self.ss_jar_path,
+            "ss_lang_path": self.ss_lang_path,
+            "use_keywords": self.use_keywords,
+        }
 
     def classify(
         self, aspects: list[list[ExtractedAspect]], texts: str
     ) -> list[AspectAnnotation]:
         super().check_arguments(aspects, texts)
 
-        rep = [len(a) for a in aspects]
-        texts_rep = np.repeat(texts, rep)
-        aspects_unlist = [el.aspect for el in list(chain.from_iterable((aspects)))]
+        # labels indexed by the position of the strongest of the
+        # (positive, negative, trinary) scores
+        labels = np.array([self.map_sentiment(i) for i in range(3)], dtype=object)
 
-        sentiments = self.classifier.getSentiment(
-            texts_rep, keywords=aspects_unlist, score="trinary"
-        )
-        sentiments = [np.argmax(np.abs(sentiment)) for sentiment in sentiments]
-        sentiments = list(map(self.map_sentiment, sentiments))
-        sentiments = [
-            SentimentAnnotation(text=aspects_unlist[i], label=sentiments[i])
-            for i in range(len(sentiments))
-        ]
+        if self.use_keywords:
+            # SentiStrength applies the keywords to the whole run, so, as in
+            # a single call, every text is scored with all aspects of all texts
+            # as keywords. Each text is then sent once and its label is shared
+            # by all its aspects.
+            keywords = [el.aspect for el in chain.from_iterable(aspects)]
+            annotated = (
+                (text, text_aspects)
+                for text, text_aspects in zip(texts, aspects)
+                if len(text_aspects) > 0
+            )
+            sentiments = []
+            while chunk := list(islice(annotated, self.chunk_size)):
+                scores = self.classifier.getSentiment(
+                    [text for text, _ in chunk], keywords=keywords, score="trinary"
+                )
+                sentiment_index = np.argmax(
+                    np.abs(np.asarray(scores).reshape(-1, 3)), axis=1
+                )
+                sentiments.extend(
+                    SentimentAnnotation(text=el.aspect, label=label)
+                    for (_, text_aspects), label in zip(
+                        chunk, labels[sentiment_index].tolist()
+                    )
+                    for el in text_aspects
+                )
+        else:
+            # contexts of the aspects are generated lazily, so only one chunk
+            # is held in memory at a time
+            contexts = chain.from_iterable(aspects)
+            sentiments = []
+            while chunk := list(islice(contexts, self.chunk_size)):
+                scores = self.pool.score([el.text for el in chunk])
+                sentiment_index = np.argmax(
+                    np.abs(np.asarray(scores).reshape(-1, 3)), axis=1
+                )
+                sentiments.extend(
+                    SentimentAnnotation(text=el.aspect, label=label)
+                    for el, label in zip(chunk, labels[sentiment_index].tolist())
+                )
 
-        rep_cum = np.insert(np.cumsum(rep), 0, 0, axis=0)
-        sentiments_grouped = [
-            sentiments[rep_cum[i] : rep_cum[i + 1]] for i in range(len(rep_cum) - 1)
-        ]
+        offsets = list(accumulate([len(a) for a in aspects], initial=0))
         annotations = [
-            AspectAnnotation(text=texts[i], aspects=sentiments_grouped[i])
-            for i in range(len(sentiments_grouped))
+            AspectAnnotation(text=text, aspects=sentiments[start:end])
+            for text, start, end in zip(texts, offsets, offsets[1:])
         ]
 
         return annotations
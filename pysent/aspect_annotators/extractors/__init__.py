@@ -1,4 +1,11 @@
-from pysent.aspect_annotators.extractors.aspect_extractor import AspectExtractor
-from pysent.aspect_annotators.extractors.spacy_extractor import SpacyExtractor
-from pysent.aspect_annotators.extractors.chatgpt_extractor import ChatGPTExtractor
-from pysent.aspect_annotators.extractors.pyabsa_extractor import PyabsaExtractor
+from pysent._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "AspectExtractor": "pysent.aspect_annotators.extractors.aspect_extractor",
+        "SpacyExtractor": "pysent.aspect_annotators.extractors.spacy_extractor",
+        "ChatGPTExtractor": "pysent.aspect_annotators.extractors.chatgpt_extractor",
+        "PyabsaExtractor": "pysent.aspect_annotators.extractors.pyabsa_extractor",
+    },
+)
@@ -4,6 +4,7 @@ classes that extracts aspects and context from texts.
 """
 
 from abc import ABC, ABCMeta, abstractmethod
+from typing import Optional
 from pysent.data_structures import AspectAnnotation, ExtractedAspect
 
 
@@ -27,6 +28,17 @@ class AspectExtractor(ABC):
         """
         return
 
+    def get_config(self) -> dict:
+        """Returns the configuration of the tool that influences its output,
+        e.g. language, model or prompt version. Used to build cache keys.
+
+        Returns
+        -------
+        dict
+            Configuration of the tool, values must be JSON serializable.
+        """
+        return {}
+
     @staticmethod
     def check_arguments(texts: list[str]):
         """Checks if the arguments for aspects extraction are valid.
@@ -56,7 +68,8 @@ class AspectExtractor(ABC):
     @staticmethod
     def get_neighbors(main_word, full_text: str, n_neighbors: int = 3) -> str:
         """Taking out the context for the aspect, by including words surrounding
-        the aspect.
+        the aspect. The text is split again for every aspect, extractors that
+        know the tokens and position of the aspect use get_context instead.
 
         Parameters
         ----------
@@ -81,3 +94,58 @@ class AspectExtractor(ABC):
         except:
             context = full_text
         return context
+
+    @staticmethod
+    def get_context(
+        tokens: list[str], start: int, stop: int, n_neighbors: int = 3
+    ) -> str:
+        """Taking out the context for the aspect from already tokenized text.
+
+        Parameters
+        ----------
+        tokens : list[str]
+            Tokens of the text from which the aspect was taken.
+        start : int
+            Index of the first token of the aspect.
+        stop : int
+            Index of the token following the last token of the aspect.
+        n_neighbors : int
+            Number of tokens to be taken on each side of the aspect, by default 3
+
+        Returns
+        -------
+        str
+            Aspect with the context (close words).
+        """
+        return " ".join(tokens[max(0, start - n_neighbors) : stop + n_neighbors])
+
+    @staticmethod
+    def token_offsets(
+        tokens: list[str], full_text: str
+    ) -> list[Optional[tuple[int, int]]]:
+        """Finds character offsets of the consecutive tokens in the text in one
+        left to right scan.
+
+        Parameters
+        ----------
+        tokens : list[str]
+            Tokens of the text, in order.
+        full_text : str
+            Text the tokens were created from.
+
+        Returns
+        -------
+        list[Optional[tuple[int, int]]]
+            Start and end character offset of each token, None if the token
+            was not found in the text (e.g. it was normalized by the tool).
+        """
+        offsets = []
+        cursor = 0
+        for token in tokens:
+            start = full_text.find(token, cursor)
+            if start == -1:
+                offsets.append(None)
+                continue
+            cursor = start + len(token)
+            offsets.append((start, cursor))
+        return offsets
@@ -1,39 +1,32 @@
 """
 Sentiment extractor based on the ChatGPT.
 """
-from openai import OpenAI
-import openai
-import time
+
+import json
 
 from pysent.aspect_annotators.extractors.aspect_extractor import AspectExtractor
+from pysent.chatgpt_engine import ChatGPTTool
 from pysent.data_structures import ExtractedAspect
 
 
-class ChatGPTExtractor(AspectExtractor):
-    def __init__(self, api_key: str, free_tier: bool = True):
-        """Object constructor
+class ChatGPTExtractor(ChatGPTTool, AspectExtractor):
+    def create_message(self, text: str) -> list[dict]:
+        """Creates the prompt for the given text.
 
         Parameters
         ----------
-        api_key : str
-            API key to the Open AI service
-        free_tier : bool, optional
-            Indicator whether account connected with the API key is free.
-            For free account, the cooldown is added, by default True
-        """
-        openai.api_key = api_key
-        self.free_tier = free_tier
+        text : str
+            Text to extract aspects from.
 
-    def extract(self, texts: list[str]) -> list[list[ExtractedAspect]]:
-        super().check_arguments(texts)
-        aspects = []
-
-        for text in texts:
-            text_aspects = []
-            message = [
-                {
-                    "role": "system",
-                    "content": f"""For Text below provide me it's distinct aspects - subjects present in the text, that can be later used for aspect based sentiment analysis. 
+        Returns
+        -------
+        list[dict]
+            Message to send to the Chat GPT.
+        """
+        return [
+            {
+                "role": "system",
+                "content": f"""For Text below provide me it's distinct aspects - subjects present in the text, that can be later used for aspect based sentiment analysis. 
                 You can return one or multiple aspects, but they shouldn't repeat. 
                 If there are two chunks about the same thing in the text, you should find a way to distinguish them in the aspect name.
                 Keep the aspects concise (no more than 3 words). 
@@ -54,27 +47,107 @@ class ChatGPTExtractor(AspectExtractor):
                 Text:
                 {text}
                 """,
-                }
-            ]
-            chat = OpenAI(api_key=openai.api_key).chat
-            chat_completion = chat.completions.create(
-                messages=message,
-                model="gpt-3.5-turbo",
-            )
-            reply = chat_completion.choices[0].message.content
-            try:
-                aspects_list = []
-                split_by_aspects = reply.split("\n\n")
-                for aspect_chunk in split_by_aspects:
-                    aspect, chunk = aspect_chunk.split("\n")
-                    aspect = aspect.removeprefix("Aspect: ")
-                    chunk = chunk.removeprefix("Chunk: ")
-                    text_aspects.append(ExtractedAspect(aspect, chunk))
-
-                if self.free_tier:
-                    time.sleep(20)
-            except:
-                ValueError(f"Something wrong in the response: {reply}!")
-
-            aspects.append(text_aspects)
-        return aspects
+            }
+        ]
+
+    def parse_reply(self, text: str, reply: str) -> list[ExtractedAspect]:
+        """Turns the reply of the Chat GPT into extracted aspects.
+
+        Parameters
+        ----------
+        text : str
+            Text the aspects were extracted from.
+        reply : str
+            Reply of the Chat GPT.
+
+        Returns
+        -------
+        list[ExtractedAspect]
+            Aspects extracted from the reply.
+
+        Raises
+        ------
+        ValueError
+            Error if the reply is not in the requested format.
+        """
+        text_aspects = []
+        try:
+            split_by_aspects = reply.split("\n\n")
+            for aspect_chunk in split_by_aspects:
+                aspect, chunk = aspect_chunk.split("\n")
+                aspect = aspect.removeprefix("Aspect: ")
+                chunk = chunk.removeprefix("Chunk: ")
+                text_aspects.append(ExtractedAspect(aspect, chunk))
+        except (AttributeError, ValueError):
+            raise ValueError(f"Something wrong in the response: {reply}!")
+        return text_aspects
+
+    def create_packed_message(self, texts: list[str]) -> list[dict]:
+        """Creates the prompt for multiple texts sent in one request.
+
+        Parameters
+        ----------
+        texts : list[str]
+            Texts to extract aspects from.
+
+        Returns
+        -------
+        list[dict]
+            Message to send to the Chat GPT.
+        """
+        numbered_texts = json.dumps(
+            {str(i): text for i, text in enumerate(texts)}, ensure_ascii=False
+        )
+        return [
+            {
+                "role": "system",
+                "content": f"""For each Text below provide me it's distinct aspects - subjects present in the text, that can be later used for aspect based sentiment analysis. 
+                You can return one or multiple aspects, but they shouldn't repeat. 
+                If there are two chunks about the same thing in the text, you should find a way to distinguish them in the aspect name.
+                Keep the aspects concise (no more than 3 words). 
+                Besides the aspect, provide the chunk of the text that describes that aspect. Chunks should sum up to the entire sentence.
+                Texts are given as a JSON object keyed by the index of the text.
+                Answer only with a JSON object keyed by the same indices, in the format:
+                {{"<index>": [{{"aspect": "<aspect you suggest, exact words from text, do not change its form>", "chunk": "<piece of the Text about the aspect>"}}, ...]}}
+                Answer should be in the same language as the input.
+
+                Texts:
+                {numbered_texts}
+                """,
+            }
+        ]
+
+    def parse_packed_item(self, text: str, item: list) -> list[ExtractedAspect]:
+        """Turns the item of the JSON reply to the packed prompt into extracted
+        aspects.
+
+        Parameters
+        ----------
+        text : str
+            Text the aspects were extracted from.
+        item : list
+            Item of the reply for the text.
+
+        Returns
+        -------
+        list[ExtractedAspect]
+            Aspects extracted from the text.
+
+        Raises
+        ------
+        ValueError
+            Error if the item is not a list of aspects.
+        """
+        if not isinstance(item, list):
+            raise ValueError(f"Something wrong in the response: {item}!")
+        return [ExtractedAspect(str(el["aspect"]), str(el["chunk"])) for el in item]
+
+    def empty_result(self, text: str) -> list[ExtractedAspect]:
+        """No aspects are extracted from the text whose replies could not be
+        parsed."""
+        return []
+
+    def extract(self, texts: list[str]) -> list[list[ExtractedAspect]]:
+        super().check_arguments(texts)
+
+        return self.complete_texts(texts)
@@ -1,15 +1,23 @@
 """
 Sentiment classifier based on the PyABSA Python package.
 """
-from pyabsa import AspectTermExtraction as ATEPC, available_checkpoints
+from pyabsa import AspectTermExtraction as ATEPC
 
 
 from pysent.aspect_annotators.extractors.aspect_extractor import AspectExtractor
+from pysent.batching import run_in_buckets
+from pysent.model_registry import registry
 from pysent.data_structures import ExtractedAspect
 
 
 class PyabsaExtractor(AspectExtractor):
-    def __init__(self, n_neighbors: int = 4):
+    def __init__(
+        self,
+        n_neighbors: int = 4,
+        high_throughput: bool = False,
+        batch_size: int = 32,
+        chunk_size: int = 1024,
+    ):
         """Object constructor
 
         Parameters
@@ -17,45 +25,154 @@ class PyabsaExtractor(AspectExtractor):
         n_neighbors : int, optional
             Number of surroding words to be taken while extracting context,
             by default 4
+        high_throughput : bool, optional
+            If True, the model is loaded without the perplexity calculation,
+            the sentiment of the aspects (not used by the extractor) is not
+            predicted and the texts are predicted in chunks of similar length,
+            by default False
+        batch_size : int, optional
+            Number of texts passed to the model in one forward pass, by default 32
+        chunk_size : int, optional
+            Number of texts passed to the tool at once in the high throughput
+            mode, by default 1024
 
         Raises
         ------
         ValueError
-            Error is language not supported
+            Error if batch_size or chunk_size is not positive
         """
-        checkpoint_map = available_checkpoints()
-
-        self.classifier = ATEPC.AspectExtractor(
-            "multilingual",
-            auto_device=False,  # True,  # False means load model on CPU
-            cal_perplexity=True,
-        )
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer!")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer!")
         self.n_neighbors = n_neighbors
+        self.high_throughput = high_throughput
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        cal_perplexity = not high_throughput
+        # the model is shared with other PyABSA tools of the process
+        self.model_handle = registry.acquire(
+            f"pyabsa:atepc:multilingual:cal_perplexity={cal_perplexity}",
+            "cpu",
+            lambda: ATEPC.AspectExtractor(
+                "multilingual",
+                auto_device=False,  # True,  # False means load model on CPU
+                cal_perplexity=cal_perplexity,
+            ),
+        )
+        self.classifier = self.model_handle.model
 
-    def extract(self, texts: list[str]) -> list[list[ExtractedAspect]]:
-        super().check_arguments(texts)
+    def get_config(self) -> dict:
+        return {
+            "checkpoint": "multilingual",
+            "n_neighbors": self.n_neighbors,
+            "high_throughput": self.high_throughput,
+        }
+
+    def release(self):
+        """Releases the model shared through the registry, the tool can not be
+        used afterwards."""
+        self.model_handle.release()
+        self.classifier = None
 
-        tool_annotations = self.classifier.predict(
+    def predict(self, texts: list[str]) -> list[dict]:
+        """Runs the tool on the texts.
+
+        Parameters
+        ----------
+        texts : list[str]
+            List of texts.
+
+        Returns
+        -------
+        list[dict]
+            Results of the tool, one for each text.
+        """
+        return self.classifier.predict(
             texts,
             save_result=False,
             print_result=False,  # print the result
             ignore_error=True,  # ignore the error when the model cannot predict the input
+            pred_sentiment=not self.high_throughput,
+            eval_batch_size=self.batch_size,
         )
+
+    @staticmethod
+    def iob_aspects(tokens: list[str], iob: list[str]) -> list[tuple[str, list[int]]]:
+        """Reads the aspects from the IOB tags of the tokens, used when the tool
+        does not predict their sentiment.
+
+        Parameters
+        ----------
+        tokens : list[str]
+            Tokens of the text.
+        iob : list[str]
+            IOB tag of each token, e.g. "B-ASP", "I-ASP" or "O".
+
+        Returns
+        -------
+        list[tuple[str, list[int]]]
+            Aspects and the positions of their tokens.
+        """
+        spans = []
+        for i, tag in enumerate(iob):
+            if tag.startswith("I-") and len(spans) > 0 and spans[-1][-1] == i - 1:
+                spans[-1].append(i)
+            elif tag.startswith(("B-", "I-")):
+                spans.append([i])
+        return [(" ".join(tokens[i] for i in span), span) for span in spans]
+
+    def extract(self, texts: list[str]) -> list[list[ExtractedAspect]]:
+        super().check_arguments(texts)
+
+        with self.model_handle.lock:
+            if self.high_throughput:
+                tool_annotations = run_in_buckets(
+                    self.predict,
+                    texts,
+                    [len(text.split()) for text in texts],
+                    self.chunk_size,
+                )
+            else:
+                tool_annotations = self.predict(texts)
         aspects = []
 
-        for anotation in tool_annotations:
-            aspects.append(
-                [
+        for text, anotation in zip(texts, tool_annotations):
+            # the text is tokenized once by the tool, contexts and offsets
+            # are taken from these tokens and the positions of the aspects
+            tokens = anotation["tokens"]
+            offsets = self.token_offsets(tokens, text)
+            text_aspects = []
+            if self.high_throughput:
+                found_aspects = self.iob_aspects(tokens, anotation["IOB"])
+            else:
+                found_aspects = zip(anotation["aspect"], anotation["position"])
+            for aspect, position in found_aspects:
+                position = [idx for idx in position if 0 <= idx < len(tokens)]
+                if len(position) == 0:
+                    text_aspects.append(
+                        ExtractedAspect(
+                            aspect=aspect,
+                            text=self.get_neighbors(
+                                main_word=aspect,
+                                full_text=anotation["sentence"],
+                                n_neighbors=self.n_neighbors,
+                            ),
+                        )
+                    )
+                    continue
+                start, stop = min(position), max(position) + 1
+                first_offset, last_offset = offsets[start], offsets[stop - 1]
+                text_aspects.append(
                     ExtractedAspect(
                         aspect=aspect,
-                        text=self.get_neighbors(
-                            main_word=aspect,
-                            full_text=anotation["sentence"],
-                            n_neighbors=self.n_neighbors,
+                        text=self.get_context(
+                            tokens, start, stop, n_neighbors=self.n_neighbors
                         ),
+                        start=first_offset[0] if first_offset else None,
+                        end=last_offset[1] if last_offset else None,
                     )
-                    for aspect in anotation["aspect"]
-                ]
-            )
+                )
+            aspects.append(text_aspects)
 
         return aspects
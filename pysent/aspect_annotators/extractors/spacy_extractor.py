@@ -2,6 +2,8 @@
 Sentiment classifier based on the spacy Python package.
 """
 
+from itertools import tee
+
 import spacy
 
 from pysent.aspect_annotators.extractors.aspect_extractor import AspectExtractor
@@ -9,7 +11,25 @@ from pysent.data_structures import ExtractedAspect
 
 
 class SpacyExtractor(AspectExtractor):
-    def __init__(self, n_neighbors: int = 4, language="en"):
+    # the extraction rule reads only dependency labels, so the components
+    # below are not loaded at all
+    UNUSED_COMPONENTS = [
+        "tagger",
+        "morphologizer",
+        "attribute_ruler",
+        "lemmatizer",
+        "ner",
+        "senter",
+    ]
+
+    def __init__(
+        self,
+        n_neighbors: int = 4,
+        language="en",
+        batch_size: int = 256,
+        n_process: int = 1,
+        first_sentence_only: bool = False,
+    ):
         """Object constructor
 
         Parameters
@@ -19,39 +39,108 @@ class SpacyExtractor(AspectExtractor):
             by default 4
         language : str, optional
             Language to use, one of ['pl', 'en'], by default "en"
+        batch_size : int, optional
+            Number of texts buffered by spacy while streaming them through
+            the pipeline, by default 256
+        n_process : int, optional
+            Number of processes used by spacy to parse the texts, by default 1
+        first_sentence_only : bool, optional
+            If True, only the first sentence (found by the rule based sentencizer)
+            is passed to the parser, since aspects are extracted only from it.
+            It is faster on long texts, but the sentencizer may end the first
+            sentence elsewhere than the parser does, so the extracted aspects
+            can differ from the default ones, by default False
 
         Raises
         ------
         ValueError
             Error is language not supported
+        ValueError
+            Error if batch_size or n_process is not positive
         """
         if language not in ["en", "pl"]:
             raise ValueError("Language must be either 'en' or 'pl'!")
+        if batch_size < 1 or n_process < 1:
+            raise ValueError("batch_size and n_process must be positive integers!")
+        self.language = language
         self.n_neighbors = n_neighbors
-        self.annotator = spacy.load(language + "_core_web_sm")
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.first_sentence_only = first_sentence_only
+        self.annotator = spacy.load(
+            language + "_core_web_sm", exclude=self.UNUSED_COMPONENTS
+        )
+        self.sentencizer = spacy.blank(language)
+        self.sentencizer.add_pipe("sentencizer")
+
+    def get_config(self) -> dict:
+        return {
+            "language": self.language,
+            "n_neighbors": self.n_neighbors,
+            "first_sentence_only": self.first_sentence_only,
+        }
+
+    @staticmethod
+    def first_sentence(doc) -> str:
+        """Cuts the text of the doc after the end of its first sentence.
+
+        Parameters
+        ----------
+        doc : spacy.tokens.Doc
+            Doc processed by the rule based sentencizer.
+
+        Returns
+        -------
+        str
+            Text cut after the end of the first sentence.
+        """
+        if len(doc) == 0:
+            return doc.text
+        return doc.text[: next(doc.sents).end_char]
 
     def extract(self, texts: list[str]) -> list[list[ExtractedAspect]]:
         super().check_arguments(texts)
         aspects = []
 
-        for text in texts:
-            doc = self.annotator(text)
-            sentence = next(doc.sents)
-            subjects = [
-                word.orth_
-                for word in sentence
-                if word.dep_ in ["nsubj"] and word.orth_ not in ["I", "you"]
-            ]
-
-            extracted_aspect = [
-                ExtractedAspect(
-                    aspect=aspect,
-                    text=self.get_neighbors(
-                        main_word=aspect, full_text=text, n_neighbors=self.n_neighbors
-                    ),
+        if self.first_sentence_only:
+            # the whole text is tokenized once by the cheap sentencizer pipeline,
+            # only the first sentence is parsed, contexts are sliced from
+            # the tokens of the whole text
+            full_docs, prefix_docs = tee(
+                self.sentencizer.pipe(texts, batch_size=self.batch_size)
+            )
+            inputs = (self.first_sentence(doc) for doc in prefix_docs)
+            docs = self.annotator.pipe(
+                inputs, batch_size=self.batch_size, n_process=self.n_process
+            )
+        else:
+            full_docs, docs = tee(
+                self.annotator.pipe(
+                    texts, batch_size=self.batch_size, n_process=self.n_process
+                )
+            )
+
+        for full_doc, doc in zip(full_docs, docs):
+            sentence = next(doc.sents, [])
+            extracted_aspect = []
+            for word in sentence:
+                if word.dep_ not in ["nsubj"] or word.orth_ in ["I", "you"]:
+                    continue
+                # character offsets are the same in the parsed prefix and in the
+                # whole text
+                start_char = word.idx
+                end_char = word.idx + len(word)
+                span = full_doc.char_span(start_char, end_char, alignment_mode="expand")
+                start = max(0, span.start - self.n_neighbors)
+                stop = span.end + self.n_neighbors
+                extracted_aspect.append(
+                    ExtractedAspect(
+                        aspect=word.orth_,
+                        text=full_doc[start:stop].text,
+                        start=start_char,
+                        end=end_char,
+                    )
                 )
-                for aspect in subjects
-            ]
             aspects.append(extracted_aspect)
 
         return aspects
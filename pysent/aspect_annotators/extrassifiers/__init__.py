@@ -1,7 +1,10 @@
-from pysent.aspect_annotators.extrassifiers.aspect_extrassifier import (
-    AspectExtrassifier,
-)
-from pysent.aspect_annotators.extrassifiers.pyabsa_extrasifier import PyabsaExtrassifier
-from pysent.aspect_annotators.extrassifiers.chatgpt_extrassifier import (
-    ChatGPTExtrassifier,
+from pysent._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "AspectExtrassifier": "pysent.aspect_annotators.extrassifiers.aspect_extrassifier",
+        "PyabsaExtrassifier": "pysent.aspect_annotators.extrassifiers.pyabsa_extrasifier",
+        "ChatGPTExtrassifier": "pysent.aspect_annotators.extrassifiers.chatgpt_extrassifier",
+    },
 )
@@ -27,6 +27,17 @@ class AspectExtrassifier(ABC):
         """
         return
 
+    def get_config(self) -> dict:
+        """Returns the configuration of the tool that influences its output,
+        e.g. language, model or prompt version. Used to build cache keys.
+
+        Returns
+        -------
+        dict
+            Configuration of the tool, values must be JSON serializable.
+        """
+        return {}
+
     @staticmethod
     def check_arguments(texts: list[str]):
         """Checks if the arguments for aspects extraction are valid.
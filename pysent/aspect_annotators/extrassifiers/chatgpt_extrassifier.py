@@ -1,13 +1,13 @@
 """
 Sentiment extrassifier based on the ChatGPT.
 """
-from openai import OpenAI
-import openai
-import time
+
+import json
 
 from pysent.aspect_annotators.extrassifiers.aspect_extrassifier import (
     AspectExtrassifier,
 )
+from pysent.chatgpt_engine import ChatGPTTool
 from pysent.data_structures import (
     AspectAnnotation,
     ExtractedAspect,
@@ -15,30 +15,24 @@ from pysent.data_structures import (
 )
 
 
-class ChatGPTExtrassifier(AspectExtrassifier):
-    def __init__(self, api_key: str, free_tier: bool = True):
-        """Object constructor
+class ChatGPTExtrassifier(ChatGPTTool, AspectExtrassifier):
+    def create_message(self, text: str) -> list[dict]:
+        """Creates the prompt for the given text.
 
         Parameters
         ----------
-        api_key : str
-            API key to the Open AI service
-        free_tier : bool, optional
-            Indicator whether account connected with the API key is free.
-            For free account, the cooldown is added, by default True
-        """
-        openai.api_key = api_key
-        self.free_tier = free_tier
-
-    def classify(self, texts: list[str]) -> list[AspectAnnotation]:
-        super().check_arguments(texts)
+        text : str
+            Text to analyse.
 
-        annotations = []
-        for text in texts:
-            message = [
-                {
-                    "role": "system",
-                    "content": f"""For text below provide me an aspect based sentiment analysis and score in the format:
+        Returns
+        -------
+        list[dict]
+            Message to send to the Chat GPT.
+        """
+        return [
+            {
+                "role": "system",
+                "content": f"""For text below provide me an aspect based sentiment analysis and score in the format:
                     Aspect: <aspect you suggest, exact words from text, do not change its form>
                     Label: <label you suggest>
                     Score: <score you suggest>
@@ -48,32 +42,114 @@ class ChatGPTExtrassifier(AspectExtrassifier):
                     Text:
                     {text}
                     """,
-                }
-            ]
-            chat = OpenAI(api_key=openai.api_key).chat
-            chat_completion = chat.completions.create(
-                messages=message,
-                model="gpt-3.5-turbo",
+            }
+        ]
+
+    def parse_reply(self, text: str, reply: str) -> AspectAnnotation:
+        """Turns the reply of the Chat GPT into annotation.
+
+        Parameters
+        ----------
+        text : str
+            Analysed text.
+        reply : str
+            Reply of the Chat GPT.
+
+        Returns
+        -------
+        AspectAnnotation
+            Annotation of the text.
+
+        Raises
+        ------
+        ValueError
+            Error if the reply is not in the requested format.
+        """
+        aspects_list = []
+        try:
+            split_by_aspects = reply.split("\n\n")
+            for aspect_label_score in split_by_aspects:
+                aspect, label, score = aspect_label_score.split("\n")
+                aspect = aspect.removeprefix("Aspect:")
+                label = label.removeprefix("Label: ")
+                score = score.removeprefix("Score: ")
+                score = float(score)
+                aspects_list.append(
+                    SentimentAnnotation(text=aspect, label=label, score=score)
+                )
+        except (AttributeError, ValueError):
+            raise ValueError(f"Something wrong in the response: {reply}!")
+
+        return AspectAnnotation(text=text, aspects=aspects_list)
+
+    def create_packed_message(self, texts: list[str]) -> list[dict]:
+        """Creates the prompt for multiple texts sent in one request.
+
+        Parameters
+        ----------
+        texts : list[str]
+            Texts to analyse.
+
+        Returns
+        -------
+        list[dict]
+            Message to send to the Chat GPT.
+        """
+        numbered_texts = json.dumps(
+            {str(i): text for i, text in enumerate(texts)}, ensure_ascii=False
+        )
+        return [
+            {
+                "role": "system",
+                "content": f"""For each text below provide me an aspect based sentiment analysis and score.
+                    Texts are given as a JSON object keyed by the index of the text.
+                    Answer only with a JSON object keyed by the same indices, in the format:
+                    {{"<index>": [{{"aspect": "<aspect you suggest, exact words from text, do not change its form>", "label": "<label you suggest>", "score": <score you suggest>}}, ...]}}
+
+                    Answer should be in the same language as the input.
+
+                    Texts:
+                    {numbered_texts}
+                    """,
+            }
+        ]
+
+    def parse_packed_item(self, text: str, item: list) -> AspectAnnotation:
+        """Turns the item of the JSON reply to the packed prompt into annotation.
+
+        Parameters
+        ----------
+        text : str
+            Analysed text.
+        item : list
+            Item of the reply for the text.
+
+        Returns
+        -------
+        AspectAnnotation
+            Annotation of the text.
+
+        Raises
+        ------
+        ValueError
+            Error if the item is not a list of aspects.
+        """
+        if not isinstance(item, list):
+            raise ValueError(f"Something wrong in the response: {item}!")
+        aspects_list = [
+            SentimentAnnotation(
+                text=str(el["aspect"]), label=str(el["label"]), score=float(el["score"])
             )
-            reply = chat_completion.choices[0].message.content
-            # wait to fit into OpenAI 3RequestsPerMinute restriction
-            if self.free_tier:
-                time.sleep(20)
-            try:
-                aspects_list = []
-                split_by_aspects = reply.split("\n\n")
-                for aspect_label_score in split_by_aspects:
-                    aspect, label, score = aspect_label_score.split("\n")
-                    aspect = aspect.removeprefix("Aspect:")
-                    label = label.removeprefix("Label: ")
-                    score = score.removeprefix("Score: ")
-                    score = float(score)
-                    aspects_list.append(
-                        SentimentAnnotation(text=aspect, label=label, score=score)
-                    )
-            except:
-                ValueError(f"Something wrong in the response: {reply}!")
-
-            annotations.append(AspectAnnotation(text=text, aspects=aspects_list))
-
-        return annotations
+            for el in item
+        ]
+        return AspectAnnotation(text=text, aspects=aspects_list)
+
+    def empty_result(self, text: str) -> AspectAnnotation:
+        """Annotation without aspects of the text whose replies could not be
+        parsed."""
+        return AspectAnnotation(text=text, aspects=[])
+
+    def classify(self, texts: list[str]) -> list[AspectAnnotation]:
+        super().check_arguments(texts)
+
+        return self.complete_texts(texts)
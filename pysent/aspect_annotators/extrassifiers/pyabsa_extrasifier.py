@@ -2,11 +2,13 @@
 Sentiment extrassifier based on the pyabsa Python package.
 """
 
-from pyabsa import AspectTermExtraction as ATEPC, available_checkpoints
+from pyabsa import AspectTermExtraction as ATEPC
 
 from pysent.aspect_annotators.extrassifiers.aspect_extrassifier import (
     AspectExtrassifier,
 )
+from pysent.batching import run_in_buckets
+from pysent.model_registry import registry
 from pysent.data_structures import (
     AspectAnnotation,
     ExtractedAspect,
@@ -15,25 +17,94 @@ from pysent.data_structures import (
 
 
 class PyabsaExtrassifier(AspectExtrassifier):
-    def __init__(self):
-        checkpoint_map = available_checkpoints()
+    def __init__(
+        self,
+        high_throughput: bool = False,
+        batch_size: int = 32,
+        chunk_size: int = 1024,
+    ):
+        """Object constructor
 
-        self.classifier = ATEPC.AspectExtractor(
-            "multilingual",
-            auto_device=False,  # True,  # False means load model on CPU
-            cal_perplexity=True,
+        Parameters
+        ----------
+        high_throughput : bool, optional
+            If True, the model is loaded without the perplexity calculation and
+            the texts are predicted in chunks of similar length, by default False
+        batch_size : int, optional
+            Number of texts passed to the model in one forward pass, by default 32
+        chunk_size : int, optional
+            Number of texts passed to the tool at once in the high throughput
+            mode, by default 1024
+
+        Raises
+        ------
+        ValueError
+            Error if batch_size or chunk_size is not positive
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer!")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer!")
+        self.high_throughput = high_throughput
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        cal_perplexity = not high_throughput
+        # the model is shared with other PyABSA tools of the process
+        self.model_handle = registry.acquire(
+            f"pyabsa:atepc:multilingual:cal_perplexity={cal_perplexity}",
+            "cpu",
+            lambda: ATEPC.AspectExtractor(
+                "multilingual",
+                auto_device=False,  # True,  # False means load model on CPU
+                cal_perplexity=cal_perplexity,
+            ),
         )
+        self.classifier = self.model_handle.model
 
-    def classify(self, texts: list[str]) -> list[AspectAnnotation]:
-        super().check_arguments(texts)
+    def get_config(self) -> dict:
+        return {"checkpoint": "multilingual", "high_throughput": self.high_throughput}
+
+    def release(self):
+        """Releases the model shared through the registry, the tool can not be
+        used afterwards."""
+        self.model_handle.release()
+        self.classifier = None
+
+    def predict(self, texts: list[str]) -> list[dict]:
+        """Runs the tool on the texts.
 
-        tool_annotations = self.classifier.predict(
+        Parameters
+        ----------
+        texts : list[str]
+            List of texts.
+
+        Returns
+        -------
+        list[dict]
+            Results of the tool, one for each text.
+        """
+        return self.classifier.predict(
             texts,
             save_result=False,
             print_result=False,  # print the result
             ignore_error=True,  # ignore the error when the model cannot predict the input
+            eval_batch_size=self.batch_size,
         )
 
+    def classify(self, texts: list[str]) -> list[AspectAnnotation]:
+        super().check_arguments(texts)
+
+        with self.model_handle.lock:
+            if self.high_throughput:
+                tool_annotations = run_in_buckets(
+                    self.predict,
+                    texts,
+                    [len(text.split()) for text in texts],
+                    self.chunk_size,
+                )
+            else:
+                tool_annotations = self.predict(texts)
+
         annotations = [
             AspectAnnotation(
                 text=result["sentence"],
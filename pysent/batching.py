@@ -0,0 +1,132 @@
+"""
+Helpers used by the tools to process texts in batches.
+"""
+
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+
+
+def length_buckets(lengths: list[int], bucket_size: int) -> list[list[int]]:
+    """Groups indices of the elements into buckets of similar length. Elements
+    are sorted by length (longest first), so each bucket needs as little padding
+    as possible when it is passed to the model.
+
+    Parameters
+    ----------
+    lengths : list[int]
+        Lengths of the elements, e.g. number of tokens in each text.
+    bucket_size : int
+        Maximal number of elements in one bucket.
+
+    Returns
+    -------
+    list[list[int]]
+        List of buckets, each bucket is a list of indices of the original elements.
+
+    Raises
+    ------
+    ValueError
+        If bucket_size is not positive.
+    """
+    if bucket_size < 1:
+        raise ValueError("Bucket size must be a positive integer!")
+
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    return [order[i : i + bucket_size] for i in range(0, len(order), bucket_size)]
+
+
+def run_in_buckets(
+    predict: Callable[[list], list], items: list, lengths: list[int], bucket_size: int
+) -> list:
+    """Runs the prediction on buckets of elements of similar length and
+    returns the results in the order of the elements.
+
+    Parameters
+    ----------
+    predict : Callable[[list], list]
+        Function returning one result for each element of the given list.
+    items : list
+        Elements to predict.
+    lengths : list[int]
+        Lengths of the elements, e.g. number of words in each text.
+    bucket_size : int
+        Maximal number of elements passed to predict at once.
+
+    Returns
+    -------
+    list
+        Results, in the same order as the elements.
+    """
+    results = [None] * len(items)
+    for bucket in length_buckets(lengths, bucket_size):
+        for i, result in zip(bucket, predict([items[i] for i in bucket])):
+            results[i] = result
+    return results
+
+
+def deduplicate_texts(texts: list[str]) -> tuple[list[str], list[int]]:
+    """Finds unique texts, so each of them is processed only once.
+
+    Parameters
+    ----------
+    texts : list[str]
+        List of texts, possibly with duplicates.
+
+    Returns
+    -------
+    tuple[list[str], list[int]]
+        Unique texts in the order of their first occurrence and, for each of
+        the given texts, index of its unique text.
+    """
+    positions = {}
+    inverse = [positions.setdefault(text, len(positions)) for text in texts]
+    return list(positions), inverse
+
+
+def expand_results(results: list, inverse: list[int]) -> list:
+    """Scatters results computed for unique texts back to the positions of the
+    original texts. Duplicated texts share the same result object.
+
+    Parameters
+    ----------
+    results : list
+        Results of the unique texts.
+    inverse : list[int]
+        Index of the unique text for each original text, as returned
+        by deduplicate_texts.
+
+    Returns
+    -------
+    list
+        Results, the same length as the original texts.
+    """
+    return [results[i] for i in inverse]
+
+
+def iter_chunks(iterable: Iterable, size: int) -> Iterator[list]:
+    """Pulls consecutive chunks from the iterable, so only one chunk is held
+    in memory at a time.
+
+    Parameters
+    ----------
+    iterable : Iterable
+        Any iterable, e.g. a generator reading texts from a file.
+    size : int
+        Maximal number of elements in one chunk.
+
+    Yields
+    ------
+    list
+        Chunk of the elements, the last one may be shorter.
+
+    Raises
+    ------
+    ValueError
+        If size is not positive.
+    """
+    if size < 1:
+        raise ValueError("Chunk size must be a positive integer!")
+
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
@@ -0,0 +1,523 @@
+"""
+Persistent, content addressed cache of the tools outputs. Results are stored in
+a SQLite database under the key built from the tool class, its configuration
+and the hash of the input, so any tool can be wrapped and only the inputs
+missing in the cache are sent to the tool. Results are stored as JSON, so
+reading a cache file from elsewhere does not run any code.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from pysent.data_structures import (
+    AspectAnnotation,
+    ExtractedAspect,
+    SentimentAnnotation,
+)
+from pysent.overall_annotators.overall_annotator_abstract import (
+    OverallAnnotatorAbstract,
+)
+from pysent.aspect_annotators.extractors.aspect_extractor import AspectExtractor
+from pysent.aspect_annotators.classifiers.aspect_classifer import AspectClassifier
+from pysent.aspect_annotators.extrassifiers.aspect_extrassifier import (
+    AspectExtrassifier,
+)
+
+
+def encode_result(value: Any) -> str:
+    """Serializes the output of a tool for a single input into JSON.
+
+    Parameters
+    ----------
+    value : Any
+        SentimentAnnotation, AspectAnnotation or list of ExtractedAspect.
+
+    Returns
+    -------
+    str
+        JSON representation of the value.
+
+    Raises
+    ------
+    ValueError
+        Error if the value is not one of the types above.
+    """
+
+    def sentiment(annotation: SentimentAnnotation) -> list:
+        score = None if annotation.score is None else float(annotation.score)
+        return [annotation.text, annotation.label, score]
+
+    if isinstance(value, SentimentAnnotation):
+        payload = {"sentiment": sentiment(value)}
+    elif isinstance(value, AspectAnnotation):
+        payload = {
+            "aspect": [value.text, [sentiment(aspect) for aspect in value.aspects]]
+        }
+    elif isinstance(value, list) and all(
+        isinstance(el, ExtractedAspect) for el in value
+    ):
+        payload = {
+            "extracted": [[el.aspect, el.text, el.start, el.end] for el in value]
+        }
+    else:
+        raise ValueError(f"Results of type {type(value).__name__} can not be cached!")
+    return json.dumps(payload)
+
+
+def decode_result(data: str) -> Any:
+    """Reads the output of a tool serialized by encode_result.
+
+    Parameters
+    ----------
+    data : str
+        JSON representation of the value.
+
+    Returns
+    -------
+    Any
+        SentimentAnnotation, AspectAnnotation or list of ExtractedAspect.
+    """
+    payload = json.loads(data)
+    if "sentiment" in payload:
+        return SentimentAnnotation(*payload["sentiment"])
+    if "aspect" in payload:
+        text, aspects = payload["aspect"]
+        return AspectAnnotation(text, [SentimentAnnotation(*el) for el in aspects])
+    return [ExtractedAspect(*el) for el in payload["extracted"]]
+
+
+@dataclass
+class CacheStats:
+    """
+    Contains statistics of the cache.
+
+    Parameters
+    ----------
+
+    hits : int
+        Number of inputs served from the cache.
+    misses : int
+        Number of inputs not found in the cache, duplicates of an input are
+        sent to the tool once.
+    entries : int
+        Number of results stored in the cache.
+    size : int
+        Size of the stored results in bytes.
+    """
+
+    hits: int
+    misses: int
+    entries: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests > 0 else 0.0
+
+
+class AnnotationCache:
+    # SQLite limits the number of parameters of one query
+    QUERY_CHUNK = 500
+
+    def __init__(self, path: str, max_size: int = 1024**3):
+        """Object constructor
+
+        Parameters
+        ----------
+        path : str
+            Path to the SQLite database file, created if it does not exist.
+        max_size : int, optional
+            Maximal size of the stored results in bytes. When it is exceeded,
+            the least recently used results are evicted, by default 1 GiB
+
+        Raises
+        ------
+        ValueError
+            Error if max_size is not positive.
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be a positive integer!")
+        self.path = path
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS annotations ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS annotations_accessed ON annotations (accessed)"
+            )
+        self._size = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM annotations"
+        ).fetchone()[0]
+
+    @staticmethod
+    def namespace(tool: Any) -> str:
+        """Creates the part of the key identifying the tool - its class and
+        configuration.
+
+        Parameters
+        ----------
+        tool : Any
+            Tool with the get_config method.
+
+        Returns
+        -------
+        str
+            Namespace of the tool.
+        """
+        tool_class = type(tool)
+        identity = [
+            f"{tool_class.__module__}.{tool_class.__qualname__}",
+            tool.get_config(),
+        ]
+        return json.dumps(identity, sort_keys=True)
+
+    @staticmethod
+    def make_key(namespace: str, payload: str) -> str:
+        """Creates the key of the result.
+
+        Parameters
+        ----------
+        namespace : str
+            Namespace of the tool.
+        payload : str
+            Input of the tool serialized into string.
+
+        Returns
+        -------
+        str
+            Key of the result.
+        """
+        digest = hashlib.sha256(namespace.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(payload.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        """Reads the results stored under the keys.
+
+        Parameters
+        ----------
+        keys : list[str]
+            List of keys.
+
+        Returns
+        -------
+        dict[str, Any]
+            Found results by their keys.
+        """
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            for i in range(0, len(unique_keys), self.QUERY_CHUNK):
+                chunk = unique_keys[i : i + self.QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._connection.execute(
+                    f"SELECT key, value FROM annotations WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for key, value in rows:
+                    # rows not written as JSON (e.g. by older versions) are
+                    # never deserialized, they are computed again
+                    if isinstance(value, str):
+                        found[key] = decode_result(value)
+            if len(found) > 0:
+                now = time.time()
+                with self._connection:
+                    self._connection.executemany(
+                        "UPDATE annotations SET accessed = ? WHERE key = ?",
+                        [(now, key) for key in found],
+                    )
+        return found
+
+    def set_many(self, items: dict[str, Any]):
+        """Stores the results and evicts the least recently used ones if the
+        cache is too big.
+
+        Parameters
+        ----------
+        items : dict[str, Any]
+            Results by their keys.
+        """
+        now = time.time()
+        rows = []
+        for key, value in items.items():
+            data = encode_result(value)
+            rows.append((key, data, len(data.encode("utf-8")), now))
+        with self._lock:
+            with self._connection:
+                for i in range(0, len(rows), self.QUERY_CHUNK):
+                    chunk = rows[i : i + self.QUERY_CHUNK]
+                    placeholders = ",".join("?" * len(chunk))
+                    replaced = self._connection.execute(
+                        "SELECT COALESCE(SUM(size), 0) FROM annotations "
+                        f"WHERE key IN ({placeholders})",
+                        [row[0] for row in chunk],
+                    ).fetchone()[0]
+                    self._connection.executemany(
+                        "INSERT OR REPLACE INTO annotations VALUES (?, ?, ?, ?)",
+                        chunk,
+                    )
+                    self._size += sum(row[2] for row in chunk) - replaced
+                if self._size > self.max_size:
+                    self._evict()
+
+    def _evict(self):
+        # frees space down to 90% of max_size, so eviction does not run
+        # after every insert
+        to_free = self._size - int(self.max_size * 0.9)
+        cursor = self._connection.execute(
+            "SELECT key, size FROM annotations ORDER BY accessed"
+        )
+        evicted = []
+        freed = 0
+        for key, size in cursor:
+            if freed >= to_free:
+                break
+            evicted.append((key,))
+            freed += size
+        cursor.close()
+        self._connection.executemany("DELETE FROM annotations WHERE key = ?", evicted)
+        self._size -= freed
+
+    def fetch(
+        self,
+        namespace: str,
+        payloads: list[str],
+        compute: Callable[[list[int]], list],
+    ) -> list:
+        """Returns results for all inputs, serving the cached ones in bulk and
+        computing only the missing ones.
+
+        Parameters
+        ----------
+        namespace : str
+            Namespace of the tool.
+        payloads : list[str]
+            Inputs of the tool serialized into strings.
+        compute : Callable[[list[int]], list]
+            Function which computes results for the inputs with given indices.
+
+        Returns
+        -------
+        list
+            Results, in the same order as the payloads.
+        """
+        keys = [self.make_key(namespace, payload) for payload in payloads]
+        found = self.get_many(keys)
+
+        # identical inputs missing in the cache are computed once
+        missing = {}
+        for i, key in enumerate(keys):
+            if key not in found:
+                missing.setdefault(key, i)
+        computed = {}
+        if len(missing) > 0:
+            results = compute(list(missing.values()))
+            computed = dict(zip(missing.keys(), results))
+            self.set_many(computed)
+
+        # duplicates of a missing input are misses as well, even though the
+        # tool computes it once
+        n_misses = sum(key not in found for key in keys)
+        with self._lock:
+            self.hits += len(keys) - n_misses
+            self.misses += n_misses
+
+        return [found[key] if key in found else computed[key] for key in keys]
+
+    def stats(self) -> CacheStats:
+        """Returns statistics of the cache.
+
+        Returns
+        -------
+        CacheStats
+            Statistics of the cache.
+        """
+        with self._lock:
+            entries = self._connection.execute(
+                "SELECT COUNT(*) FROM annotations"
+            ).fetchone()[0]
+            return CacheStats(
+                hits=self.hits, misses=self.misses, entries=entries, size=self._size
+            )
+
+    def clear(self):
+        """Removes all results from the cache."""
+        with self._lock:
+            with self._connection:
+                self._connection.execute("DELETE FROM annotations")
+            self._size = 0
+
+    def close(self):
+        """Closes the connection to the database."""
+        with self._lock:
+            self._connection.close()
+
+
+class CachedOverallAnnotator(OverallAnnotatorAbstract):
+    def __init__(self, tool: OverallAnnotatorAbstract, cache: AnnotationCache):
+        """Wrapper which serves the annotations of the tool from the cache.
+
+        Parameters
+        ----------
+        tool : OverallAnnotatorAbstract
+            Wrapped tool.
+        cache : AnnotationCache
+            Cache of the results.
+        """
+        self.tool = tool
+        self.cache = cache
+        self.namespace = cache.namespace(tool)
+
+    def get_config(self) -> dict:
+        return self.tool.get_config()
+
+    def classify(self, texts: list[str]) -> list[SentimentAnnotation]:
+        super().check_arguments(texts)
+        return self.cache.fetch(
+            self.namespace,
+            texts,
+            lambda indices: self.tool.classify([texts[i] for i in indices]),
+        )
+
+
+class CachedExtractor(AspectExtractor):
+    def __init__(self, tool: AspectExtractor, cache: AnnotationCache):
+        """Wrapper which serves the extracted aspects of the tool from the cache.
+
+        Parameters
+        ----------
+        tool : AspectExtractor
+            Wrapped tool.
+        cache : AnnotationCache
+            Cache of the results.
+        """
+        self.tool = tool
+        self.cache = cache
+        self.namespace = cache.namespace(tool)
+
+    def get_config(self) -> dict:
+        return self.tool.get_config()
+
+    def extract(self, texts: list[str]) -> list[list[ExtractedAspect]]:
+        super().check_arguments(texts)
+        return self.cache.fetch(
+            self.namespace,
+            texts,
+            lambda indices: self.tool.extract([texts[i] for i in indices]),
+        )
+
+
+class CachedClassifier(AspectClassifier):
+    def __init__(self, tool: AspectClassifier, cache: AnnotationCache):
+        """Wrapper which serves the annotations of the tool from the cache.
+
+        Parameters
+        ----------
+        tool : AspectClassifier
+            Wrapped tool.
+        cache : AnnotationCache
+            Cache of the results.
+        """
+        self.tool = tool
+        self.cache = cache
+        self.namespace = cache.namespace(tool)
+
+    def get_config(self) -> dict:
+        return self.tool.get_config()
+
+    def classify(
+        self, aspects: list[list[ExtractedAspect]], texts: list[str]
+    ) -> list[AspectAnnotation]:
+        super().check_arguments(aspects, texts)
+        payloads = [
+            json.dumps(
+                [
+                    text,
+                    [[el.aspect, el.text, el.start, el.end] for el in text_aspects],
+                ]
+            )
+            for text_aspects, text in zip(aspects, texts)
+        ]
+        return self.cache.fetch(
+            self.namespace,
+            payloads,
+            lambda indices: self.tool.classify(
+                [aspects[i] for i in indices], [texts[i] for i in indices]
+            ),
+        )
+
+
+class CachedExtrassifier(AspectExtrassifier):
+    def __init__(self, tool: AspectExtrassifier, cache: AnnotationCache):
+        """Wrapper which serves the annotations of the tool from the cache.
+
+        Parameters
+        ----------
+        tool : AspectExtrassifier
+            Wrapped tool.
+        cache : AnnotationCache
+            Cache of the results.
+        """
+        self.tool = tool
+        self.cache = cache
+        self.namespace = cache.namespace(tool)
+
+    def get_config(self) -> dict:
+        return self.tool.get_config()
+
+    def classify(self, texts: list[str]) -> list[AspectAnnotation]:
+        super().check_arguments(texts)
+        return self.cache.fetch(
+            self.namespace,
+            texts,
+            lambda indices: self.tool.classify([texts[i] for i in indices]),
+        )
+
+
+def cached(tool: Any, cache: AnnotationCache) -> Any:
+    """Wraps the tool with the cache.
+
+    Parameters
+    ----------
+    tool : Any
+        Tool inheriting from OverallAnnotatorAbstract, AspectExtractor,
+        AspectClassifier or AspectExtrassifier.
+    cache : AnnotationCache
+        Cache of the results.
+
+    Returns
+    -------
+    Any
+        Wrapped tool, which can be used in place of the original one.
+
+    Raises
+    ------
+    ValueError
+        Error if the tool does not inherit from any of the classes above.
+    """
+    if isinstance(tool, OverallAnnotatorAbstract):
+        return CachedOverallAnnotator(tool, cache)
+    if isinstance(tool, AspectExtractor):
+        return CachedExtractor(tool, cache)
+    if isinstance(tool, AspectClassifier):
+        return CachedClassifier(tool, cache)
+    if isinstance(tool, AspectExtrassifier):
+        return CachedExtrassifier(tool, cache)
+    raise ValueError(
+        "Tool must be (inherit from) an OverallAnnotatorAbstract, AspectExtractor, "
+        "AspectClassifier or AspectExtrassifier class!"
+    )
@@ -0,0 +1,725 @@
+"""
+Asynchronous engine that sends requests to the Chat GPT for the ChatGPT based
+tools. Requests are sent concurrently with one pooled HTTP client per engine,
+replies are returned in the order of the requests. Throughput is kept under
+the rate limits of the API key by the RateController shared by all engines
+using the same key.
+"""
+
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional
+
+import httpx
+import openai
+from openai import AsyncOpenAI
+
+# limits of the gpt-3.5-turbo model for free and the lowest paid tier, used
+# until the API returns the actual limits in the response headers
+FREE_TIER_LIMITS = {"requests_per_minute": 3, "tokens_per_minute": 40_000}
+PAID_TIER_LIMITS = {"requests_per_minute": 3_500, "tokens_per_minute": 60_000}
+
+# errors after which the request is sent again
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+def parse_reset_time(value: str) -> Optional[float]:
+    """Parses the reset time from the rate limit headers, e.g. "1s", "6m0s"
+    or "20ms", into seconds.
+
+    Parameters
+    ----------
+    value : str
+        Value of the header.
+
+    Returns
+    -------
+    Optional[float]
+        Number of seconds, None if the value can not be parsed.
+    """
+    units = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value or "")
+    if len(parts) == 0:
+        return None
+    return sum(float(number) * units[unit] for number, unit in parts)
+
+
+def pack_texts(texts: list[str], pack_size: int, token_budget: int) -> list[list[int]]:
+    """Groups consecutive texts into packs sent in one request. A pack has at
+    most pack_size texts and their estimated number of tokens (4 characters per
+    token) does not exceed the budget, unless a single text exceeds it.
+
+    Parameters
+    ----------
+    texts : list[str]
+        List of texts.
+    pack_size : int
+        Maximal number of texts in one pack.
+    token_budget : int
+        Maximal estimated number of tokens of the texts in one pack.
+
+    Returns
+    -------
+    list[list[int]]
+        List of packs, each pack is a list of indices of the texts.
+    """
+    packs = []
+    pack, pack_tokens = [], 0.0
+    for i, text in enumerate(texts):
+        n_tokens = len(text) / 4
+        if len(pack) > 0 and (
+            len(pack) == pack_size or pack_tokens + n_tokens > token_budget
+        ):
+            packs.append(pack)
+            pack, pack_tokens = [], 0.0
+        pack.append(i)
+        pack_tokens += n_tokens
+    if len(pack) > 0:
+        packs.append(pack)
+    return packs
+
+
+def parse_packed_reply(reply: Optional[str]) -> dict[int, Any]:
+    """Reads the JSON object keyed by the index of the text from the reply to
+    a packed prompt.
+
+    Parameters
+    ----------
+    reply : Optional[str]
+        Reply of the Chat GPT.
+
+    Returns
+    -------
+    dict[int, Any]
+        Items of the reply by the index of the text in the pack. Empty if the
+        reply is not a JSON object.
+    """
+    reply = (reply or "").strip()
+    # the model tends to wrap JSON in a markdown code block
+    if reply.startswith("```"):
+        reply = reply.strip("`").removeprefix("json").strip()
+    try:
+        parsed = json.loads(reply)
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(parsed, dict):
+        return {}
+
+    items = {}
+    for key, value in parsed.items():
+        try:
+            items[int(key)] = value
+        except ValueError:
+            continue
+    return items
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        """Token bucket refilled continuously up to the limit per minute.
+        Reservations may take the level below zero, the deficit is the time
+        the caller has to wait.
+
+        Parameters
+        ----------
+        per_minute : float
+            Capacity of the bucket and its refill rate per minute.
+        """
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        rate = self.capacity / 60
+        self.level = min(self.capacity, self.level + (now - self.updated) * rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Takes the amount out of the bucket and returns number of seconds
+        to wait until it is available."""
+        self.refill(now)
+        self.level -= amount
+        if self.level >= 0:
+            return 0.0
+        return -self.level / (self.capacity / 60)
+
+
+class RateController:
+    # controllers are shared by the engines using the same API key, since
+    # the limits are set per key, engines created with other initial limits
+    # (e.g. the free and the paid tier) get their own controller
+    _controllers = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        """Rate controller which budgets both requests per minute and tokens per
+        minute and adapts to the x-ratelimit-* and Retry-After headers returned
+        by the API. It is thread safe, so it can be shared by engines running
+        in different threads.
+
+        Parameters
+        ----------
+        requests_per_minute : float
+            Initial limit of requests per minute.
+        tokens_per_minute : float
+            Initial limit of tokens per minute.
+        """
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_key(
+        cls, api_key: str, requests_per_minute: float, tokens_per_minute: float
+    ) -> "RateController":
+        """Returns the controller shared by all engines using the API key with
+        the same initial limits, creates it if it does not exist.
+
+        Parameters
+        ----------
+        api_key : str
+            API key to the Open AI service
+        requests_per_minute : float
+            Initial limit of requests per minute.
+        tokens_per_minute : float
+            Initial limit of tokens per minute.
+
+        Returns
+        -------
+        RateController
+            Shared controller.
+        """
+        with cls._registry_lock:
+            key = (api_key, requests_per_minute, tokens_per_minute)
+            if key not in cls._controllers:
+                cls._controllers[key] = cls(requests_per_minute, tokens_per_minute)
+            return cls._controllers[key]
+
+    def reserve(self, n_tokens: float) -> tuple[float, float]:
+        """Reserves one request and the given number of tokens, at most the
+        whole token budget.
+
+        Parameters
+        ----------
+        n_tokens : float
+            Estimated number of tokens used by the request.
+
+        Returns
+        -------
+        tuple[float, float]
+            Number of seconds to wait before sending the request and number
+            of tokens reserved, to be passed to settle.
+        """
+        with self._lock:
+            now = time.monotonic()
+            reserved_tokens = min(n_tokens, self.tokens.capacity)
+            wait = max(
+                self.requests.reserve(1, now),
+                self.tokens.reserve(reserved_tokens, now),
+                self.blocked_until - now,
+            )
+        return max(0.0, wait), reserved_tokens
+
+    def settle(self, reserved_tokens: float, used_tokens: float):
+        """Corrects the token budget after the actual usage is known.
+
+        Parameters
+        ----------
+        reserved_tokens : float
+            Number of tokens reserved for the request, as returned by reserve.
+        used_tokens : float
+            Number of tokens reported by the API.
+        """
+        with self._lock:
+            self.tokens.level += reserved_tokens - used_tokens
+
+    def update(self, headers: httpx.Headers):
+        """Adapts the budgets to the rate limit headers of a response.
+
+        Parameters
+        ----------
+        headers : httpx.Headers
+            Headers of the response.
+        """
+        with self._lock:
+            now = time.monotonic()
+            for bucket, kind in [(self.requests, "requests"), (self.tokens, "tokens")]:
+                limit = headers.get(f"x-ratelimit-limit-{kind}")
+                remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+                bucket.refill(now)
+                if limit is not None and limit.isdigit() and int(limit) > 0:
+                    bucket.capacity = float(limit)
+                if remaining is not None and remaining.isdigit():
+                    bucket.level = min(bucket.level, float(remaining))
+                    if int(remaining) == 0:
+                        reset = parse_reset_time(
+                            headers.get(f"x-ratelimit-reset-{kind}")
+                        )
+                        if reset is not None:
+                            self.blocked_until = max(self.blocked_until, now + reset)
+
+    def pause(self, seconds: float):
+        """Stops sending of all requests for the given number of seconds.
+
+        Parameters
+        ----------
+        seconds : float
+            Number of seconds to wait.
+        """
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class ChatGPTEngine:
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-3.5-turbo",
+        max_concurrency: int = 8,
+        rate_controller: RateController = None,
+        max_retries: int = 6,
+        expected_completion_tokens: int = 256,
+    ):
+        """Object constructor
+
+        Parameters
+        ----------
+        api_key : str
+            API key to the Open AI service
+        model : str, optional
+            Chat model to query, by default "gpt-3.5-turbo"
+        max_concurrency : int, optional
+            Maximal number of requests in flight at the same time, by default 8
+        rate_controller : RateController, optional
+            Controller which keeps the requests under the rate limits, by default
+            the controller shared by the API key, with the paid tier limits
+        max_retries : int, optional
+            Number of times a request is sent again after rate limit, connection
+            or server error, by default 6
+        expected_completion_tokens : int, optional
+            Number of tokens of the reply assumed while reserving the token
+            budget, by default 256
+
+        Raises
+        ------
+        ValueError
+            Error if max_concurrency is not positive
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be a positive integer!")
+        self.api_key = api_key
+        self.model = model
+        self.max_concurrency = max_concurrency
+        if rate_controller is None:
+            rate_controller = RateController.for_key(api_key, **PAID_TIER_LIMITS)
+        self.rate_controller = rate_controller
+        self.max_retries = max_retries
+        self.expected_completion_tokens = expected_completion_tokens
+        self._client = None
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        # the engine owns an event loop running in a background thread, so the
+        # pooled client is bound to one loop and the sync methods work also
+        # when the caller already runs an event loop (e.g. Jupyter)
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, daemon=True
+                )
+                self._thread.start()
+        return self._loop
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        """Pooled client shared by all requests of the engine."""
+        if self._client is None:
+            limits = httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            )
+            # retries are handled by the engine, so they are coordinated with
+            # the rate controller
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                max_retries=0,
+                http_client=httpx.AsyncClient(limits=limits),
+            )
+        return self._client
+
+    def complete(self, messages: list[list[dict]]) -> list[str]:
+        """Sends the messages to the Chat GPT and waits for all replies.
+
+        Parameters
+        ----------
+        messages : list[list[dict]]
+            List of messages, each one is sent in a separate request.
+
+        Returns
+        -------
+        list[str]
+            Replies, in the same order as the messages.
+        """
+        if len(messages) == 0:
+            return []
+        future = asyncio.run_coroutine_threadsafe(
+            self.complete_async(messages), self._get_loop()
+        )
+        return future.result()
+
+    async def complete_async(self, messages: list[list[dict]]) -> list[str]:
+        """Asynchronous version of the complete method. Has to be awaited in
+        the loop of the engine.
+
+        Parameters
+        ----------
+        messages : list[list[dict]]
+            List of messages, each one is sent in a separate request.
+
+        Returns
+        -------
+        list[str]
+            Replies, in the same order as the messages.
+        """
+        replies = [None] * len(messages)
+        indices = iter(range(len(messages)))
+
+        async def worker():
+            # workers share one iterator, so at most max_concurrency
+            # requests are in flight
+            for i in indices:
+                replies[i] = await self.complete_one(messages[i])
+
+        n_workers = min(self.max_concurrency, len(messages))
+        tasks = [asyncio.ensure_future(worker()) for _ in range(n_workers)]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return replies
+
+    def complete_packed(
+        self,
+        texts: list[str],
+        pack_size: int,
+        token_budget: int,
+        create_packed_message: Callable[[list[str]], list[dict]],
+        parse_item: Callable[[str, Any], Any],
+    ) -> list[Optional[Any]]:
+        """Sends the texts packed into shared requests and parses the replies.
+
+        Parameters
+        ----------
+        texts : list[str]
+            List of texts.
+        pack_size : int
+            Maximal number of texts in one request.
+        token_budget : int
+            Maximal estimated number of tokens of the texts in one request.
+        create_packed_message : Callable[[list[str]], list[dict]]
+            Function which creates the message for the texts of a pack.
+        parse_item : Callable[[str, Any], Any]
+            Function which turns the text and its item of the JSON reply into
+            the result. Raises ValueError, TypeError or KeyError if the item is
+            malformed.
+
+        Returns
+        -------
+        list[Optional[Any]]
+            Results, in the same order as the texts. None for the texts missing
+            in the reply or with malformed items, they should be sent again
+            individually.
+        """
+        packs = pack_texts(texts, pack_size, token_budget)
+        replies = self.complete(
+            [create_packed_message([texts[i] for i in pack]) for pack in packs]
+        )
+
+        results = [None] * len(texts)
+        for pack, reply in zip(packs, replies):
+            items = parse_packed_reply(reply)
+            for position, i in enumerate(pack):
+                if position not in items:
+                    continue
+                try:
+                    results[i] = parse_item(texts[i], items[position])
+                except (ValueError, TypeError, KeyError):
+                    continue
+        return results
+
+    def estimate_tokens(self, message: list[dict]) -> float:
+        """Estimates number of tokens used by the request, assuming 4 characters
+        per token of the prompt.
+
+        Parameters
+        ----------
+        message : list[dict]
+            Message to send.
+
+        Returns
+        -------
+        float
+            Estimated number of tokens of the prompt and the reply.
+        """
+        n_characters = sum(len(part["content"]) for part in message)
+        return n_characters / 4 + self.expected_completion_tokens
+
+    @staticmethod
+    def get_retry_after(error: Exception) -> Optional[float]:
+        """Reads the time to wait from the Retry-After headers of the error response.
+
+        Parameters
+        ----------
+        error : Exception
+            Error raised by the client.
+
+        Returns
+        -------
+        Optional[float]
+            Number of seconds to wait, None if the headers are missing.
+        """
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+        retry_after_ms = response.headers.get("retry-after-ms")
+        if retry_after_ms is not None:
+            try:
+                return float(retry_after_ms) / 1000
+            except ValueError:
+                pass
+        retry_after = response.headers.get("retry-after")
+        if retry_after is not None:
+            try:
+                return float(retry_after)
+            except ValueError:
+                return None
+        return None
+
+    async def complete_one(self, message: list[dict]) -> str:
+        """Sends one request to the Chat GPT, waiting for the rate controller and
+        retrying with jittered exponential backoff.
+
+        Parameters
+        ----------
+        message : list[dict]
+            Message to send.
+
+        Returns
+        -------
+        str
+            Content of the reply.
+        """
+        estimated_tokens = self.estimate_tokens(message)
+        for attempt in range(self.max_retries + 1):
+            wait, reserved_tokens = self.rate_controller.reserve(estimated_tokens)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                response = await self.client.chat.completions.with_raw_response.create(
+                    messages=message,
+                    model=self.model,
+                )
+            except RETRYABLE_ERRORS as error:
+                self.rate_controller.settle(reserved_tokens, 0)
+                if attempt == self.max_retries:
+                    raise
+                delay = self.get_retry_after(error)
+                if delay is None:
+                    delay = min(60.0, 2**attempt) * random.uniform(0.5, 1.5)
+                if isinstance(error, openai.RateLimitError):
+                    # all requests sharing the key wait, the pause is included
+                    # in the next reservation
+                    self.rate_controller.pause(delay)
+                else:
+                    await asyncio.sleep(delay)
+                continue
+
+            self.rate_controller.update(response.headers)
+            chat_completion = response.parse()
+            if chat_completion.usage is not None:
+                self.rate_controller.settle(
+                    reserved_tokens, chat_completion.usage.total_tokens
+                )
+            return chat_completion.choices[0].message.content
+
+    def close(self):
+        """Closes the pooled client and stops the background event loop."""
+        with self._lock:
+            loop, thread, client = self._loop, self._thread, self._client
+            self._loop, self._thread, self._client = None, None, None
+        if loop is None:
+            return
+        if client is not None:
+            asyncio.run_coroutine_threadsafe(client.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    def __enter__(self) -> "ChatGPTEngine":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ChatGPTTool(ABC):
+    # increase after every change of the prompt, so cached replies are not
+    # reused, tools override it when their prompts change
+    PROMPT_VERSION = 1
+    # number of times a text with a malformed reply is sent again
+    MAX_REPLY_RETRIES = 1
+
+    def __init__(
+        self,
+        api_key: str,
+        free_tier: bool = True,
+        max_concurrency: int = 8,
+        pack_size: int = 1,
+        pack_token_budget: int = 2000,
+    ):
+        """Common part of the ChatGPT based tools - the engine sending the
+        requests and the flow of the packed and individual requests. Tools
+        define the prompts and the parsing of the replies.
+
+        Parameters
+        ----------
+        api_key : str
+            API key to the Open AI service
+        free_tier : bool, optional
+            Indicator whether account connected with the API key is free.
+            Used to pick the initial rate limits, which are later adapted to the
+            limits returned by the API, by default True
+        max_concurrency : int, optional
+            Maximal number of requests in flight at the same time, by default 8
+        pack_size : int, optional
+            Maximal number of texts sent in one request. If greater than 1,
+            texts are packed into shared requests with the JSON reply keyed by
+            the index of the text. Texts missing in the reply or with malformed
+            answers are sent again individually, by default 1. Texts whose
+            individual replies stay malformed after MAX_REPLY_RETRIES get the
+            empty_result, so the other replies of the batch are kept.
+        pack_token_budget : int, optional
+            Maximal estimated number of tokens of the texts packed into one
+            request, by default 2000
+
+        Raises
+        ------
+        ValueError
+            Error if pack_size or pack_token_budget is not positive
+        """
+        if pack_size < 1:
+            raise ValueError("pack_size must be a positive integer!")
+        if pack_token_budget < 1:
+            raise ValueError("pack_token_budget must be a positive integer!")
+        self.free_tier = free_tier
+        self.pack_size = pack_size
+        self.pack_token_budget = pack_token_budget
+        limits = FREE_TIER_LIMITS if free_tier else PAID_TIER_LIMITS
+        self.engine = ChatGPTEngine(
+            api_key,
+            max_concurrency=max_concurrency,
+            rate_controller=RateController.for_key(api_key, **limits),
+        )
+
+    def get_config(self) -> dict:
+        return {
+            "model": self.engine.model,
+            "prompt_version": self.PROMPT_VERSION,
+            "packed": self.pack_size > 1,
+        }
+
+    def close(self):
+        """Closes the HTTP client and stops the event loop of the engine. The
+        engine is started again by the next request."""
+        self.engine.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @abstractmethod
+    def create_message(self, text: str) -> list[dict]:
+        """Creates the prompt for the given text."""
+        return
+
+    @abstractmethod
+    def parse_reply(self, text: str, reply: str) -> Any:
+        """Turns the reply to the prompt of the text into the result. Raises
+        ValueError if the reply is not in the requested format."""
+        return
+
+    @abstractmethod
+    def create_packed_message(self, texts: list[str]) -> list[dict]:
+        """Creates the prompt for multiple texts sent in one request."""
+        return
+
+    @abstractmethod
+    def parse_packed_item(self, text: str, item: Any) -> Any:
+        """Turns the item of the JSON reply to the packed prompt into the result."""
+        return
+
+    @abstractmethod
+    def empty_result(self, text: str) -> Any:
+        """Result of the text whose replies could not be parsed."""
+        return
+
+    def complete_texts(self, texts: list[str]) -> list:
+        """Sends the texts to the Chat GPT, packed if pack_size is greater than 1,
+        and parses the replies.
+
+        Parameters
+        ----------
+        texts : list[str]
+            List of texts.
+
+        Returns
+        -------
+        list
+            Results, in the same order as the texts.
+        """
+        results = [None] * len(texts)
+        if self.pack_size > 1:
+            results = self.engine.complete_packed(
+                texts,
+                self.pack_size,
+                self.pack_token_budget,
+                self.create_packed_message,
+                self.parse_packed_item,
+            )
+
+        # texts not answered in the packed replies are sent individually, texts
+        # with malformed replies are sent again, the other replies are kept
+        missing = [i for i, result in enumerate(results) if result is None]
+        for _ in range(self.MAX_REPLY_RETRIES + 1):
+            if len(missing) == 0:
+                break
+            replies = self.engine.complete(
+                [self.create_message(texts[i]) for i in missing]
+            )
+            malformed = []
+            for i, reply in zip(missing, replies):
+                try:
+                    results[i] = self.parse_reply(texts[i], reply)
+                except ValueError:
+                    malformed.append(i)
+            missing = malformed
+        for i in missing:
+            results[i] = self.empty_result(texts[i])
+        return results
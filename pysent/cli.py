@@ -0,0 +1,424 @@
+"""
+Command line interface. `pysent annotate TOOL INPUT OUTPUT` annotates the texts
+of a Parquet, CSV or JSONL file and writes the annotations to a Parquet file
+batch by batch. TOOL is a name of an overall tool or an aspect extrassifier
+(e.g. `flair`, `pyabsa`) or an extractor and a classifier joined with `+`
+(e.g. `spacy+flair`). Arguments of the tools are given with --language,
+--ss-jar-path, --ss-lang-path or --tool-option NAME=VALUE.
+"""
+
+import argparse
+import ast
+import functools
+import importlib
+import inspect
+import os
+import sys
+import time
+from collections import deque
+from typing import Any, Optional
+
+# tools by their names in the spec, imported only when used
+OVERALL_TOOLS = {
+    "flair": "pysent.overall_annotators.flair_annotator:FlairAnnotator",
+    "senti": "pysent.overall_annotators.senti_annotator:SentiAnnotator",
+    "chatgpt": "pysent.overall_annotators.chatgpt_annotator:ChatGPTAnnotator",
+}
+EXTRACTORS = {
+    "spacy": "pysent.aspect_annotators.extractors.spacy_extractor:SpacyExtractor",
+    "pyabsa": "pysent.aspect_annotators.extractors.pyabsa_extractor:PyabsaExtractor",
+    "chatgpt": "pysent.aspect_annotators.extractors.chatgpt_extractor:ChatGPTExtractor",
+}
+CLASSIFIERS = {
+    "flair": "pysent.aspect_annotators.classifiers.flair_classifier:FlairClassifier",
+    "senti": "pysent.aspect_annotators.classifiers.senti_classifier:SentiClassifier",
+}
+EXTRASSIFIERS = {
+    "pyabsa": "pysent.aspect_annotators.extrassifiers.pyabsa_extrasifier:PyabsaExtrassifier",
+    "chatgpt": "pysent.aspect_annotators.extrassifiers.chatgpt_extrassifier:ChatGPTExtrassifier",
+}
+
+
+def parse_spec(spec: str, level: Optional[str] = None) -> tuple[str, list[str]]:
+    """Splits the tool spec into the annotation level and the paths of the
+    tools.
+
+    Parameters
+    ----------
+    spec : str
+        Name of a tool or names of an extractor and a classifier joined with +.
+    level : Optional[str], optional
+        'overall' or 'aspect', by default 'overall' if the spec is a name of
+        an overall tool and 'aspect' otherwise
+
+    Returns
+    -------
+    tuple[str, list[str]]
+        Annotation level and the paths of the tools in the pipeline.
+
+    Raises
+    ------
+    ValueError
+        Error if the spec does not name known tools.
+    """
+    names = [name.strip().lower() for name in spec.split("+")]
+    if len(names) == 2:
+        extractor, classifier = names
+        if level == "overall":
+            raise ValueError("Overall annotation takes a single tool!")
+        if extractor not in EXTRACTORS:
+            raise ValueError(f"Extractor must be one of {sorted(EXTRACTORS)}!")
+        if classifier not in CLASSIFIERS:
+            raise ValueError(f"Classifier must be one of {sorted(CLASSIFIERS)}!")
+        return "aspect", [EXTRACTORS[extractor], CLASSIFIERS[classifier]]
+    if len(names) != 1:
+        raise ValueError("Tool spec must be a tool name or extractor+classifier!")
+
+    name = names[0]
+    if level is None:
+        if name not in OVERALL_TOOLS and name not in EXTRASSIFIERS:
+            raise ValueError(
+                f"Tool must be one of {sorted(OVERALL_TOOLS.keys() | EXTRASSIFIERS.keys())}"
+                " or extractor+classifier!"
+            )
+        level = "overall" if name in OVERALL_TOOLS else "aspect"
+    tools = OVERALL_TOOLS if level == "overall" else EXTRASSIFIERS
+    if name not in tools:
+        raise ValueError(f"{level.capitalize()} tool must be one of {sorted(tools)}!")
+    return level, [tools[name]]
+
+
+def import_tool(path: str) -> type:
+    module, name = path.split(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def parse_tool_option(option: str) -> tuple[str, Any]:
+    """Splits the NAME=VALUE option, the value is parsed as a Python literal
+    (e.g. 4, 0.5, True) or kept as a string."""
+    name, sep, value = option.partition("=")
+    if not sep or not name.strip():
+        raise argparse.ArgumentTypeError(f"{option!r} is not in the NAME=VALUE format")
+    try:
+        value = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        pass
+    return name.strip(), value
+
+
+def tool_kwargs(tool_class: type, options: dict[str, Any]) -> dict[str, Any]:
+    # each tool gets the options its constructor accepts
+    parameters = inspect.signature(tool_class.__init__).parameters
+    return {name: value for name, value in options.items() if name in parameters}
+
+
+def check_options(paths: list[str], options: dict[str, Any]):
+    """Checks that every option is accepted by one of the tools.
+
+    Parameters
+    ----------
+    paths : list[str]
+        Paths of the tools in the pipeline.
+    options : dict[str, Any]
+        Arguments of the tools.
+
+    Raises
+    ------
+    ValueError
+        Error if an option is not accepted by any of the tools.
+    """
+    accepted = set()
+    for path in paths:
+        accepted.update(tool_kwargs(import_tool(path), options))
+    unknown = sorted(options.keys() - accepted)
+    if unknown:
+        raise ValueError(f"Options {unknown} are not accepted by the tools!")
+
+
+def build_tool(
+    path: str,
+    cache_path: Optional[str] = None,
+    options: Optional[dict[str, Any]] = None,
+) -> Any:
+    """Imports and creates the tool, wrapped with the cache if its path is given.
+    ChatGPT tools read the API key from the OPENAI_API_KEY variable.
+
+    Parameters
+    ----------
+    path : str
+        Path of the tool class, 'module:ClassName'.
+    cache_path : Optional[str], optional
+        Path to the cache database, by default None
+    options : Optional[dict[str, Any]], optional
+        Arguments of the tools, only the ones accepted by the constructor of
+        the tool are passed to it, by default None
+
+    Returns
+    -------
+    Any
+        Created tool.
+
+    Raises
+    ------
+    ValueError
+        Error if the API key of a ChatGPT tool is missing.
+    """
+    tool_class = import_tool(path)
+    kwargs = tool_kwargs(tool_class, options or {})
+    if tool_class.__name__.startswith("ChatGPT"):
+        if "OPENAI_API_KEY" not in os.environ:
+            raise ValueError("OPENAI_API_KEY must be set to use the ChatGPT tools!")
+        kwargs["api_key"] = os.environ["OPENAI_API_KEY"]
+    tool = tool_class(**kwargs)
+
+    if cache_path is not None:
+        from pysent.cache import AnnotationCache, cached
+
+        tool = cached(tool, AnnotationCache(cache_path))
+    return tool
+
+
+def build_pipeline(
+    level: str,
+    paths: list[str],
+    cache_path: Optional[str] = None,
+    options: Optional[dict[str, Any]] = None,
+):
+    # module level, so functools.partial of it can be sent to the workers
+    tools = [build_tool(path, cache_path, options) for path in paths]
+    return tools[0] if level == "overall" else tools
+
+
+def close_pipeline(pipeline: Any):
+    # releases the HTTP clients of the ChatGPT tools and the cache connections
+    tools = pipeline if isinstance(pipeline, list) else [pipeline]
+    for tool in tools:
+        for resource in (getattr(tool, "cache", None), getattr(tool, "tool", tool)):
+            if hasattr(resource, "close"):
+                resource.close()
+
+
+def annotator_class(level: str) -> type:
+    if level == "overall":
+        from pysent.overall_annotator import OverallAnotator
+
+        return OverallAnotator
+    from pysent.aspect_annotator import AspectAnotator
+
+    return AspectAnotator
+
+
+class Progress:
+    def __init__(self, enabled: bool, interval: float = 1.0):
+        """Reports the number of annotated texts and the throughput on stderr,
+        at most once per interval.
+
+        Parameters
+        ----------
+        enabled : bool
+            If False, nothing is reported.
+        interval : float, optional
+            Minimal number of seconds between the reports, by default 1.0
+        """
+        self.enabled = enabled
+        self.interval = interval
+        self.start = time.perf_counter()
+        self.last_report = self.start
+        self.n_texts = 0
+
+    def update(self, n_texts: int):
+        self.n_texts += n_texts
+        now = time.perf_counter()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            self.report(end="\r" if sys.stderr.isatty() else "\n")
+
+    def report(self, end: str = "\n"):
+        if not self.enabled:
+            return
+        elapsed = time.perf_counter() - self.start
+        rate = self.n_texts / elapsed if elapsed > 0 else 0.0
+        print(
+            f"annotated {self.n_texts} texts in {elapsed:.1f} s ({rate:.1f} texts/s)",
+            end=end,
+            file=sys.stderr,
+            flush=True,
+        )
+
+
+def tool_options(args: argparse.Namespace) -> dict[str, Any]:
+    options = dict(args.tool_option)
+    for name in ["language", "ss_jar_path", "ss_lang_path"]:
+        if getattr(args, name) is not None:
+            options[name] = getattr(args, name)
+    return options
+
+
+def annotate(args: argparse.Namespace, level: str, paths: list[str]):
+    # numpy is imported only when texts are annotated, not for --help
+    from pysent.corpus import AnnotationWriter, read_texts
+
+    factory = functools.partial(
+        build_pipeline, level, paths, args.cache, tool_options(args)
+    )
+    batches = read_texts(
+        args.input, args.text_column, args.id_column, args.batch_size, args.format
+    )
+    progress = Progress(enabled=not args.quiet)
+
+    with AnnotationWriter(args.output, row_group_size=args.row_group_size) as writer:
+        if args.workers == 1:
+            pipeline = factory()
+            annotator = annotator_class(level)(pipeline)
+            try:
+                for batch in batches:
+                    writer.write(
+                        batch.ids,
+                        annotator.annotate(batch.texts, deduplicate=args.deduplicate),
+                    )
+                    progress.update(len(batch.texts))
+            finally:
+                close_pipeline(pipeline)
+        else:
+            from pysent.parallel import parallel_annotate
+
+            # ids of the batches whose texts were sent to the workers, the
+            # annotations come back in the same order
+            pending_ids = deque()
+
+            def texts():
+                for batch in batches:
+                    if len(batch.texts) > 0:
+                        pending_ids.append(batch.ids)
+                        yield from batch.texts
+
+            annotations = []
+            for annotation in parallel_annotate(
+                annotator_class(level),
+                factory,
+                texts(),
+                n_workers=args.workers,
+                batch_size=args.batch_size,
+                threads_per_worker=args.threads_per_worker,
+                deduplicate=args.deduplicate,
+            ):
+                annotations.append(annotation)
+                if len(annotations) == len(pending_ids[0]):
+                    writer.write(pending_ids.popleft(), annotations)
+                    progress.update(len(annotations))
+                    annotations = []
+    progress.report()
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive integer")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="pysent", description=__doc__.split("\n\n")[0].strip()
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    annotate_parser = subparsers.add_parser(
+        "annotate",
+        help="annotate texts of a file",
+        description=__doc__.strip(),
+    )
+    annotate_parser.add_argument(
+        "tool", help="tool spec, e.g. flair, spacy+flair, pyabsa"
+    )
+    annotate_parser.add_argument(
+        "input", help="Parquet, CSV or JSONL file with the texts"
+    )
+    annotate_parser.add_argument("output", help="output Parquet file")
+    annotate_parser.add_argument(
+        "--level",
+        choices=["overall", "aspect"],
+        help="annotation level, by default inferred from the tool spec",
+    )
+    annotate_parser.add_argument("--text-column", default="text")
+    annotate_parser.add_argument(
+        "--id-column", help="column with the ids of the texts, by default row numbers"
+    )
+    annotate_parser.add_argument(
+        "--format",
+        choices=["parquet", "csv", "jsonl"],
+        help="format of the input, by default inferred from the extension",
+    )
+    annotate_parser.add_argument(
+        "--batch-size",
+        type=positive_int,
+        default=1000,
+        help="number of texts read and annotated at once (default: %(default)s)",
+    )
+    annotate_parser.add_argument(
+        "--workers",
+        type=positive_int,
+        default=1,
+        help="number of worker processes (default: %(default)s)",
+    )
+    annotate_parser.add_argument(
+        "--threads-per-worker",
+        type=positive_int,
+        help="torch / BLAS threads of each worker, by default cores / workers",
+    )
+    annotate_parser.add_argument(
+        "--cache",
+        help="path to the SQLite cache of the results, only with a single worker",
+    )
+    annotate_parser.add_argument(
+        "--deduplicate",
+        action="store_true",
+        help="annotate each distinct text of a batch once",
+    )
+    annotate_parser.add_argument(
+        "--row-group-size",
+        type=positive_int,
+        default=100_000,
+        help="rows in a row group of the output (default: %(default)s)",
+    )
+    annotate_parser.add_argument(
+        "--quiet", action="store_true", help="do not report the progress"
+    )
+
+    tool_group = annotate_parser.add_argument_group(
+        "tool options", "arguments passed to the tools which accept them"
+    )
+    tool_group.add_argument("--language", help="language of the texts, e.g. en")
+    tool_group.add_argument("--ss-jar-path", help="path to the SentiStrength jar")
+    tool_group.add_argument(
+        "--ss-lang-path", help="path to the SentiStrength language folder"
+    )
+    tool_group.add_argument(
+        "--tool-option",
+        type=parse_tool_option,
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="other argument of the tools, the value is parsed as a Python "
+        "literal or kept as a string, can be repeated",
+    )
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.cache is not None and args.workers > 1:
+        # workers would write to the same SQLite file from separate connections
+        parser.error("--cache can be used only with a single worker")
+    try:
+        level, paths = parse_spec(args.tool, args.level)
+        check_options(paths, tool_options(args))
+    except ValueError as error:
+        parser.error(str(error))
+    annotate(args, level, paths)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
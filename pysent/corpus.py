@@ -0,0 +1,384 @@
+"""
+Streaming input and output of the annotated corpora. Texts are read from
+Parquet, CSV or JSONL files in batches and the annotations are written to
+a Parquet file as row groups, so the memory used does not depend on the size
+of the corpus. pyarrow is needed for the Parquet files.
+"""
+
+import json
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator, Optional, Union
+
+import numpy as np
+
+from pysent.annotation_batch import AnnotationBatch, SentimentBatch
+from pysent.data_structures import AspectAnnotation, SentimentAnnotation
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+FORMATS = {
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+
+
+@dataclass(slots=True)
+class TextBatch:
+    """
+    Contains one batch of the texts read from a corpus.
+
+    Parameters
+    ----------
+
+    ids : list
+        Identifiers of the texts - values of the id column or the row numbers.
+    texts : list[str]
+        Texts to annotate.
+    """
+
+    ids: list
+    texts: list[str]
+
+
+def infer_format(path: Union[str, Path]) -> str:
+    """Returns the format of the file based on its extension.
+
+    Parameters
+    ----------
+    path : Union[str, Path]
+        Path to the file.
+
+    Returns
+    -------
+    str
+        One of 'parquet', 'csv' and 'jsonl'.
+
+    Raises
+    ------
+    ValueError
+        Error if the extension is not known.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix not in FORMATS:
+        raise ValueError(
+            f"Cannot infer format of {path}, extension must be one of {list(FORMATS)}!"
+        )
+    return FORMATS[suffix]
+
+
+def _iter_columns(
+    path: Union[str, Path], columns: list[str], batch_size: int, file_format: str
+) -> Iterator[dict[str, list]]:
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+
+        with pq.ParquetFile(path) as parquet_file:
+            for batch in parquet_file.iter_batches(
+                batch_size=batch_size, columns=columns
+            ):
+                yield {column: batch.column(column).to_pylist() for column in columns}
+        return
+
+    if file_format == "jsonl":
+        # lines are parsed with json instead of pandas, which turns integer
+        # ids into floats in the chunks with a missing id, and the ids are
+        # read as strings, as from the CSV files, so their type is the same
+        # in all batches
+        with open(path, encoding="utf-8") as jsonl_file:
+            lines = (line for line in jsonl_file if line.strip())
+            while rows := [json.loads(line) for line in islice(lines, batch_size)]:
+                missing = [
+                    column
+                    for column in columns
+                    if not any(column in row for row in rows)
+                ]
+                if missing:
+                    raise ValueError(f"Columns {missing} not found in {path}!")
+                batch = {columns[0]: [row.get(columns[0]) for row in rows]}
+                for column in columns[1:]:
+                    batch[column] = [
+                        "" if row.get(column) is None else str(row[column])
+                        for row in rows
+                    ]
+                yield batch
+        return
+    if file_format != "csv":
+        raise ValueError(f"Format must be one of {sorted(set(FORMATS.values()))}!")
+
+    import pandas as pd
+
+    # texts and ids are read as they are, without turning empty cells into
+    # NaN or ids like 007 into numbers
+    with pd.read_csv(
+        path,
+        usecols=columns,
+        chunksize=batch_size,
+        dtype={column: str for column in columns},
+        keep_default_na=False,
+    ) as reader:
+        for chunk in reader:
+            yield {column: chunk[column].tolist() for column in columns}
+
+
+def read_texts(
+    path: Union[str, Path],
+    text_column: str = "text",
+    id_column: Optional[str] = None,
+    batch_size: int = 10_000,
+    file_format: Optional[str] = None,
+) -> Iterator[TextBatch]:
+    """Reads the texts of the corpus in batches, only one batch is held in memory
+    at a time.
+
+    Parameters
+    ----------
+    path : Union[str, Path]
+        Path to a Parquet, CSV or JSONL file.
+    text_column : str, optional
+        Column with the texts, by default "text"
+    id_column : Optional[str], optional
+        Column with the identifiers of the texts, read as strings from the CSV
+        and JSONL files, if None the row numbers are used, by default None
+    batch_size : int, optional
+        Number of rows in a batch, by default 10_000
+    file_format : Optional[str], optional
+        One of 'parquet', 'csv' and 'jsonl', by default inferred from the
+        extension
+
+    Yields
+    ------
+    TextBatch
+        Identifiers and texts of the consecutive rows.
+
+    Raises
+    ------
+    ValueError
+        Error if the batch size is not positive or the format is not known.
+    """
+    if batch_size < 1:
+        raise ValueError("Batch size must be a positive integer!")
+    file_format = file_format or infer_format(path)
+    columns = [text_column] if id_column is None else [text_column, id_column]
+
+    row = 0
+    for batch in _iter_columns(path, columns, batch_size, file_format):
+        texts = ["" if text is None else str(text) for text in batch[text_column]]
+        if id_column is None:
+            ids = list(range(row, row + len(texts)))
+        else:
+            ids = batch[id_column]
+        row += len(texts)
+        yield TextBatch(ids=ids, texts=texts)
+
+
+class AnnotationWriter:
+    def __init__(
+        self,
+        path: Union[str, Path],
+        row_group_size: int = 100_000,
+        compression: str = "zstd",
+    ):
+        """Writes the annotations to a Parquet file with the review_id, aspect,
+        label and score columns, one row per aspect (aspect is null for the
+        overall annotations). Rows are buffered until there is a full row group,
+        so the file is written incrementally.
+
+        Parameters
+        ----------
+        path : Union[str, Path]
+            Path to the output file.
+        row_group_size : int, optional
+            Number of rows in a row group, by default 100_000
+        compression : str, optional
+            Parquet compression codec, by default "zstd"
+
+        Raises
+        ------
+        ValueError
+            Error if the row group size is not positive.
+        """
+        if row_group_size < 1:
+            raise ValueError("Row group size must be a positive integer!")
+        self.path = path
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.rows_written = 0
+        self._writer = None
+        self._schema = None
+        self._buffer = []
+        self._buffered_rows = 0
+
+    def write(
+        self,
+        ids: list,
+        annotations: Union[
+            list[AspectAnnotation],
+            list[SentimentAnnotation],
+            AnnotationBatch,
+            SentimentBatch,
+        ],
+    ):
+        """Adds the annotations of the texts to the file.
+
+        Parameters
+        ----------
+        ids : list
+            Identifiers of the annotated texts, of the same type in the whole file.
+        annotations : Union[list[AspectAnnotation], list[SentimentAnnotation], AnnotationBatch, SentimentBatch]
+            Annotations of the texts, in the same order as the ids.
+
+        Raises
+        ------
+        ValueError
+            Error if the numbers of ids and annotations differ.
+        """
+        if len(ids) != len(annotations):
+            raise ValueError("Number of ids must be equal to number of annotations!")
+        table = self._to_table(ids, annotations)
+        if table.num_rows == 0:
+            return
+        self._buffer.append(table)
+        self._buffered_rows += table.num_rows
+        if self._buffered_rows >= self.row_group_size:
+            self._flush()
+
+    def _to_table(self, ids: list, annotations: Any) -> "pa.Table":
+        import pyarrow as pa
+
+        ids = np.asarray(ids) if len(ids) > 0 else np.empty(0, dtype=np.int64)
+        if not isinstance(annotations, (AnnotationBatch, SentimentBatch)):
+            if len(annotations) > 0 and isinstance(annotations[0], AspectAnnotation):
+                annotations = AnnotationBatch.from_annotations(annotations)
+            else:
+                annotations = SentimentBatch.from_annotations(annotations)
+
+        if isinstance(annotations, AnnotationBatch):
+            review_ids = ids[annotations.text_ids]
+            aspects = annotations.aspects
+            aspect = pa.array(aspects.text, type=pa.string())
+        else:
+            review_ids = ids
+            aspects = annotations
+            aspect = pa.nulls(len(aspects), type=pa.string())
+
+        return pa.table(
+            {
+                "review_id": pa.array(review_ids),
+                "aspect": aspect,
+                "label": pa.array(aspects.label, type=pa.string()),
+                "score": pa.array(aspects.score, mask=np.isnan(aspects.score)),
+            }
+        )
+
+    def _flush(self, final: bool = False):
+        # only full row groups are written, the rest stays in the buffer
+        # until the file is closed
+        if self._buffered_rows == 0:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.concat_tables(self._buffer)
+        n_rows = table.num_rows
+        if not final:
+            n_rows -= n_rows % self.row_group_size
+        rest = table.slice(n_rows)
+        self._buffer = [rest] if rest.num_rows > 0 else []
+        self._buffered_rows = rest.num_rows
+        table = table.slice(0, n_rows)
+
+        if self._writer is None:
+            self._schema = table.schema
+            self._writer = pq.ParquetWriter(
+                self.path, self._schema, compression=self.compression
+            )
+        self._writer.write_table(
+            table.cast(self._schema), row_group_size=self.row_group_size
+        )
+        self.rows_written += table.num_rows
+
+    def close(self):
+        """Writes the buffered rows and closes the file. A file without any
+        annotations is still created, with the review_id column of strings."""
+        self._flush(final=True)
+        if self._writer is None:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            self._schema = pa.schema(
+                [
+                    ("review_id", pa.string()),
+                    ("aspect", pa.string()),
+                    ("label", pa.string()),
+                    ("score", pa.float64()),
+                ]
+            )
+            self._writer = pq.ParquetWriter(
+                self.path, self._schema, compression=self.compression
+            )
+        self._writer.close()
+
+    def __enter__(self) -> "AnnotationWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def annotate_corpus(
+    annotator,
+    source: Union[str, Path],
+    destination: Union[str, Path],
+    text_column: str = "text",
+    id_column: Optional[str] = None,
+    batch_size: int = 10_000,
+    file_format: Optional[str] = None,
+    deduplicate: bool = False,
+    row_group_size: int = 100_000,
+) -> int:
+    """Annotates the texts of the corpus batch by batch and writes the
+    annotations to a Parquet file, see read_texts and AnnotationWriter.
+
+    Parameters
+    ----------
+    annotator : Union[OverallAnotator, AspectAnotator]
+        Annotator of the texts.
+    source : Union[str, Path]
+        Path to a Parquet, CSV or JSONL file with the texts.
+    destination : Union[str, Path]
+        Path to the output Parquet file.
+    text_column : str, optional
+        Column with the texts, by default "text"
+    id_column : Optional[str], optional
+        Column with the identifiers of the texts, if None the row numbers
+        are used, by default None
+    batch_size : int, optional
+        Number of texts annotated at once, by default 10_000
+    file_format : Optional[str], optional
+        Format of the source file, by default inferred from the extension
+    deduplicate : bool, optional
+        If True, duplicates are removed within each batch, by default False
+    row_group_size : int, optional
+        Number of rows in a row group of the output, by default 100_000
+
+    Returns
+    -------
+    int
+        Number of annotated texts.
+    """
+    n_texts = 0
+    with AnnotationWriter(destination, row_group_size=row_group_size) as writer:
+        for batch in read_texts(
+            source, text_column, id_column, batch_size, file_format
+        ):
+            writer.write(
+                batch.ids, annotator.annotate(batch.texts, deduplicate=deduplicate)
+            )
+            n_texts += len(batch.texts)
+    return n_texts
@@ -1,23 +1,83 @@
+import sys
 from dataclasses import dataclass, field, fields
-from typing import Literal, Optional, Annotated
-import plotnine as p9
-from plotnine import ggplot, aes
-import pandas as pd
-import numpy as np
+from enum import StrEnum
+from typing import TYPE_CHECKING, Literal, Optional, Annotated
 
+# pandas, numpy and plotnine are imported inside the methods that use them
+# to keep importing the data structures cheap
+if TYPE_CHECKING:
+    import pandas as pd
 
-@dataclass
+
+class SentimentLabel(StrEnum):
+    """
+    Canonical sentiment labels. Members are strings, so they compare equal to
+    the plain labels and every annotation with the same label shares one object.
+    """
+
+    POSITIVE = "positive"
+    NEGATIVE = "negative"
+    NEUTRAL = "neutral"
+
+    def __repr__(self) -> str:
+        return repr(self.value)
+
+
+_CANONICAL_LABELS = {label.value: label for label in SentimentLabel}
+
+
+def intern_label(label: Optional[str]) -> Optional[str]:
+    """Replaces the label with the SentimentLabel member equal to it, other
+    labels are interned, so equal labels are stored once.
+
+    Parameters
+    ----------
+    label : Optional[str]
+        Label of the annotation.
+
+    Returns
+    -------
+    Optional[str]
+        Label equal to the given one.
+    """
+    if type(label) is not str:
+        return label
+    canonical = _CANONICAL_LABELS.get(label)
+    return canonical if canonical is not None else sys.intern(label)
+
+
+@dataclass(slots=True)
 class ExtractedAspect:
     """
     Class representing the output of extraction aspect tools. Has a aspect keyword
     and context in text.
+
+    Parameters
+    ----------
+
+    aspect : string
+        Aspect keyword.
+    text : string
+        Context of the aspect - the aspect with surrounding words.
+    start : int
+        Character offset of the beginning of the aspect in the original text.
+        Optional since not all tools returns that.
+    end : int
+        Character offset of the end of the aspect in the original text.
+        Optional since not all tools returns that.
     """
 
     aspect: str
     text: str
+    start: Optional[int] = None
+    end: Optional[int] = None
 
+    def freeze(self) -> "FrozenExtractedAspect":
+        """Returns the immutable, hashable copy of the aspect."""
+        return FrozenExtractedAspect(self.aspect, self.text, self.start, self.end)
 
-@dataclass
+
+@dataclass(slots=True)
 class SentimentAnnotation:
     """
     Contains information about single sentiment annotation.
@@ -28,7 +88,8 @@ class SentimentAnnotation:
     text : string
         Contain text that is labeled.
     label : string
-        Label of the annotation e.g. 'positive', 'negative' and etc.
+        Label of the annotation e.g. 'positive', 'negative' and etc. Canonical
+        labels are stored as SentimentLabel members, other labels are interned.
     score: float
         Score of the annotation, the more, the better. Optional since not all tools returns that.
     """
@@ -37,8 +98,15 @@ class SentimentAnnotation:
     label: str
     score: Optional[float] = None
 
+    def __post_init__(self):
+        self.label = intern_label(self.label)
 
-@dataclass
+    def freeze(self) -> "FrozenSentimentAnnotation":
+        """Returns the immutable, hashable copy of the annotation."""
+        return FrozenSentimentAnnotation(self.text, self.label, self.score)
+
+
+@dataclass(slots=True)
 class AspectAnnotation:
     """
     Contains information about aspect sentiment annotation.
@@ -57,6 +125,63 @@ class AspectAnnotation:
     text: str
     aspects: list[SentimentAnnotation]
 
+    def freeze(self) -> "FrozenAspectAnnotation":
+        """Returns the immutable, hashable copy of the annotation."""
+        return FrozenAspectAnnotation(
+            self.text, tuple(aspect.freeze() for aspect in self.aspects)
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class FrozenExtractedAspect:
+    """
+    Immutable variant of ExtractedAspect, can be used as a dictionary key or
+    a set element.
+    """
+
+    aspect: str
+    text: str
+    start: Optional[int] = None
+    end: Optional[int] = None
+
+    def thaw(self) -> ExtractedAspect:
+        """Returns the mutable copy of the aspect."""
+        return ExtractedAspect(self.aspect, self.text, self.start, self.end)
+
+
+@dataclass(slots=True, frozen=True)
+class FrozenSentimentAnnotation:
+    """
+    Immutable variant of SentimentAnnotation, can be used as a dictionary key
+    or a set element.
+    """
+
+    text: str
+    label: str
+    score: Optional[float] = None
+
+    def __post_init__(self):
+        object.__setattr__(self, "label", intern_label(self.label))
+
+    def thaw(self) -> SentimentAnnotation:
+        """Returns the mutable copy of the annotation."""
+        return SentimentAnnotation(self.text, self.label, self.score)
+
+
+@dataclass(slots=True, frozen=True)
+class FrozenAspectAnnotation:
+    """
+    Immutable variant of AspectAnnotation with the aspects in a tuple, can be
+    used as a dictionary key or a set element.
+    """
+
+    text: str
+    aspects: tuple[FrozenSentimentAnnotation, ...]
+
+    def thaw(self) -> AspectAnnotation:
+        """Returns the mutable copy of the annotation."""
+        return AspectAnnotation(self.text, [aspect.thaw() for aspect in self.aspects])
+
 
 @dataclass
 class OrdinaryResults:
@@ -81,6 +206,11 @@ class OrdinaryResults:
         Googleit
     name: string
         Name, used to distinguish results
+    per_class: dict
+        Precision, recall, F1 and support of each label
+    confidence_intervals: dict
+        Bootstrap confidence intervals (lower and upper bound) of the
+        statistics above, None if they were not calculated
 
 
     """
@@ -93,17 +223,32 @@ class OrdinaryResults:
     micro_recall: float
     micro_f1: float
     name: Optional[str] = None
+    per_class: Optional[dict[str, dict[str, float]]] = None
+    confidence_intervals: Optional[dict[str, tuple[float, float]]] = None
     # automation similar to class below can be implemented
 
     def to_data_frame(self):
-        stat_names = [field.name for field in fields(self)]
-        values = [getattr(self, field.name) for field in fields(self)]
+        import pandas as pd
+
+        # breakdowns are not single statistics, so they are left out
+        stat_fields = [
+            field
+            for field in fields(self)
+            if field.name not in ("per_class", "confidence_intervals")
+        ]
+        stat_names = [field.name for field in stat_fields]
+        values = [getattr(self, field.name) for field in stat_fields]
         data_frame = pd.DataFrame(
             {"Statistic": stat_names, "Value": values, "Name": self.name}
         )
         return data_frame
 
     def plot(self):
+        import numpy as np
+        import pandas as pd
+        import plotnine as p9
+        from plotnine import ggplot, aes
+
         res_df = pd.DataFrame(
             {
                 "names": [
@@ -219,6 +364,8 @@ class AspectBasedResults:
         self.f1 = 2 * self.precision * self.recall / (self.precision + self.recall)
 
     def to_data_frame(self):
+        import pandas as pd
+
         stat_names = [field.name for field in fields(self)]
         values = [getattr(self, field.name) for field in fields(self)]
         data_frame = pd.DataFrame(
@@ -227,6 +374,11 @@ class AspectBasedResults:
         return data_frame
 
     def plot(self):
+        import numpy as np
+        import pandas as pd
+        import plotnine as p9
+        from plotnine import ggplot, aes
+
         res_df = pd.DataFrame(
             {
                 "names": ["Precision", "Recall", "F1"],
@@ -269,7 +421,9 @@ class AspectBasedResults:
 
 def concat_results(
     results: list[OrdinaryResults] | list[AspectBasedResults],
-) -> pd.DataFrame:
+) -> "pd.DataFrame":
+    import pandas as pd
+
     types = set([type(result) for result in results])
     if len(types) != 1:
         raise ValueError("All elements of array must be the same Results class!")
@@ -280,12 +434,24 @@ def concat_results(
 
 def transform_output(
     reviews: list[str], annotations : list[AspectAnnotation],
-) -> pd.DataFrame:
-    df = pd.DataFrame()
-    for review_id in range(len(reviews)):
-        for annotation_id in range(len(annotations[review_id].aspects)):
-            df_part = pd.DataFrame({"review": [reviews[review_id]], 
-                                    "aspect": [annotations[review_id].aspects[annotation_id].text],
-                                    "label": [annotations[review_id].aspects[annotation_id].label.lower()]})
-            df = pd.concat([df, df_part])
-    return df.reset_index(drop=True)
+) -> "pd.DataFrame":
+    import numpy as np
+    import pandas as pd
+
+    if len(reviews) != len(annotations):
+        raise ValueError("Lengths of reviews and annotations must be equal!")
+
+    # annotations are flattened once into columns, reviews are repeated by
+    # reference for each of their aspects
+    counts = [len(annotation.aspects) for annotation in annotations]
+    if sum(counts) == 0:
+        return pd.DataFrame()
+    review_column = np.repeat(np.array(reviews, dtype=object), counts)
+    aspects = [aspect for annotation in annotations for aspect in annotation.aspects]
+    return pd.DataFrame(
+        {
+            "review": review_column.tolist(),
+            "aspect": [aspect.text for aspect in aspects],
+            "label": [aspect.label.lower() for aspect in aspects],
+        }
+    )
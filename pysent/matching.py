@@ -0,0 +1,325 @@
+"""
+Matching of the predicted aspects with the true aspects, used to evaluate the
+aspect based tools. Aspects of each side are normalized once and exact matches
+are found with a hash index. Partial matches (one aspect contained in the other)
+are found by comparing the pairs of aspects directly, or, for texts with
+hundreds of aspects, with the Aho-Corasick automaton, whose time grows linearly
+with the total length of the aspects instead of with the product of their
+numbers.
+"""
+
+import math
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterator
+
+from pysent.data_structures import AspectAnnotation, SentimentAnnotation
+
+# up to this number of pairs of the true and predicted aspects, comparing them
+# directly is faster than building the automata in Python
+MAX_SCANNED_PAIRS = 2**16
+
+
+class AhoCorasick:
+    def __init__(self, patterns: list[str]):
+        """Automaton finding all the patterns in a text in one pass.
+
+        Parameters
+        ----------
+        patterns : list[str]
+            Distinct, non empty patterns.
+        """
+        self.goto = [{}]
+        # index of the pattern ending in the state, -1 if there is none
+        self.output = [-1]
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.output.append(-1)
+                state = next_state
+            self.output[state] = index
+
+        # fail links point to the longest proper suffix present in the trie,
+        # dictionary links to the longest proper suffix which is a pattern
+        self.fail = [0] * len(self.goto)
+        self.dictionary_link = [-1] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                fail = self.fail[state]
+                while fail and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+                fail = self.goto[fail].get(char, 0)
+                self.fail[next_state] = fail
+                self.dictionary_link[next_state] = (
+                    fail if self.output[fail] != -1 else self.dictionary_link[fail]
+                )
+                queue.append(next_state)
+
+    def states(self, text: str) -> Iterator[int]:
+        """Yields the state of the automaton after each character of the text."""
+        state = 0
+        for char in text:
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            yield state
+
+    def matches(self, state: int) -> Iterator[int]:
+        """Yields the states of the patterns ending in the state, longest first."""
+        if self.output[state] == -1:
+            state = self.dictionary_link[state]
+        while state != -1:
+            yield state
+            state = self.dictionary_link[state]
+
+
+@dataclass
+class MatchCounts:
+    """
+    Contains the numbers of matches of the predicted and true aspects.
+
+    Parameters
+    ----------
+
+    correct : int
+        Predicted aspects matching a true aspect exactly, with the same sentiment.
+    incorrect : int
+        Predicted aspects matching a true aspect, with different sentiment.
+    partial : int
+        Predicted aspects containing or contained in a true aspect, with the
+        same sentiment.
+    spurious : int
+        Predicted aspects not matching any true aspect.
+    """
+
+    correct: int = 0
+    incorrect: int = 0
+    partial: int = 0
+    spurious: int = 0
+
+
+def partial_match_indices(true_texts: list[str], predicted_texts: list[str]) -> dict:
+    """For each predicted aspect finds the first true aspect which contains it
+    or is contained in it, with scan_match_indices or, for many aspects,
+    automaton_match_indices.
+
+    Parameters
+    ----------
+    true_texts : list[str]
+        Normalized true aspects of the text.
+    predicted_texts : list[str]
+        Normalized predicted aspects of the text.
+
+    Returns
+    -------
+    dict
+        Index of the first matching true aspect by the predicted aspect,
+        math.inf if there is none.
+    """
+    predicted_texts = list(dict.fromkeys(predicted_texts))
+    if len(true_texts) * len(predicted_texts) <= MAX_SCANNED_PAIRS:
+        return scan_match_indices(true_texts, predicted_texts)
+    return automaton_match_indices(true_texts, predicted_texts)
+
+
+def scan_match_indices(true_texts: list[str], predicted_texts: list[str]) -> dict:
+    """For each predicted aspect finds the first true aspect which contains it
+    or is contained in it, comparing every pair of the aspects.
+
+    Parameters
+    ----------
+    true_texts : list[str]
+        Normalized true aspects of the text.
+    predicted_texts : list[str]
+        Normalized predicted aspects of the text.
+
+    Returns
+    -------
+    dict
+        Index of the first matching true aspect by the predicted aspect,
+        math.inf if there is none.
+    """
+    return {
+        text: next(
+            (
+                j
+                for j, true_text in enumerate(true_texts)
+                if true_text in text or text in true_text
+            ),
+            math.inf,
+        )
+        for text in dict.fromkeys(predicted_texts)
+    }
+
+
+def automaton_match_indices(true_texts: list[str], predicted_texts: list[str]) -> dict:
+    """For each predicted aspect finds the first true aspect which contains it
+    or is contained in it, with the Aho-Corasick automata of both sides.
+
+    Parameters
+    ----------
+    true_texts : list[str]
+        Normalized true aspects of the text.
+    predicted_texts : list[str]
+        Normalized predicted aspects of the text.
+
+    Returns
+    -------
+    dict
+        Index of the first matching true aspect by the predicted aspect,
+        math.inf if there is none.
+    """
+    # true aspects contained in the predicted one - the smallest index of the
+    # true aspect ending in each state is propagated along the fail links
+    first_true = {}
+    for j, text in enumerate(true_texts):
+        first_true.setdefault(text, j)
+    empty_true = first_true.pop("", math.inf)
+    true_patterns = list(first_true)
+    true_automaton = AhoCorasick(true_patterns)
+    min_index = [math.inf] * len(true_automaton.goto)
+    order = deque(true_automaton.goto[0].values())
+    while order:
+        state = order.popleft()
+        own = true_automaton.output[state]
+        min_index[state] = min(
+            first_true[true_patterns[own]] if own != -1 else math.inf,
+            min_index[true_automaton.fail[state]],
+        )
+        order.extend(true_automaton.goto[state].values())
+
+    # predicted aspects contained in the true ones - true aspects are scanned
+    # in order, so each predicted aspect is marked with the first one. Suffixes
+    # of a marked aspect are marked with the same or an earlier true aspect,
+    # so the walk along the dictionary links stops at the first marked state.
+    predicted_patterns = [text for text in dict.fromkeys(predicted_texts) if text]
+    predicted_automaton = AhoCorasick(predicted_patterns)
+    first_container = {}
+    for j, text in enumerate(true_texts):
+        for state in predicted_automaton.states(text):
+            for match in predicted_automaton.matches(state):
+                if match in first_container:
+                    break
+                first_container[match] = j
+    container_by_text = {
+        predicted_patterns[predicted_automaton.output[state]]: j
+        for state, j in first_container.items()
+    }
+
+    indices = {}
+    for text in dict.fromkeys(predicted_texts):
+        contained = min(
+            (min_index[state] for state in true_automaton.states(text)),
+            default=math.inf,
+        )
+        if text == "":
+            # the empty aspect is contained in every true aspect
+            container = 0 if len(true_texts) > 0 else math.inf
+        else:
+            container = container_by_text.get(text, math.inf)
+        indices[text] = min(contained, container, empty_true)
+    return indices
+
+
+def match_aspects(
+    true_aspects: list[SentimentAnnotation],
+    predicted_aspects: list[SentimentAnnotation],
+    counts: MatchCounts,
+):
+    """Matches the predicted aspects of one text with its true aspects and adds
+    the results to the counts. A predicted aspect is matched with the first
+    true aspect equal to it, otherwise with the first true aspect containing it
+    or contained in it. Aspects and labels are compared case insensitive.
+
+    Parameters
+    ----------
+    true_aspects : list[SentimentAnnotation]
+        True aspects of the text.
+    predicted_aspects : list[SentimentAnnotation]
+        Predicted aspects of the text.
+    counts : MatchCounts
+        Counts updated in place.
+    """
+    true_texts = [aspect.text.lower() for aspect in true_aspects]
+    true_labels = [aspect.label.lower() for aspect in true_aspects]
+    if len(true_texts) * len(predicted_aspects) <= MAX_SCANNED_PAIRS:
+        # few aspects (the common case) are compared directly, building the
+        # indices would take longer than the comparisons
+        for pred in predicted_aspects:
+            pred_text = pred.text.lower()
+            pred_label = pred.label.lower()
+            if pred_text in true_texts:
+                if pred_label == true_labels[true_texts.index(pred_text)]:
+                    counts.correct += 1
+                else:
+                    counts.incorrect += 1
+                continue
+            for j, true_text in enumerate(true_texts):
+                if true_text in pred_text or pred_text in true_text:
+                    if pred_label == true_labels[j]:
+                        counts.partial += 1
+                    else:
+                        counts.incorrect += 1
+                    break
+            else:
+                counts.spurious += 1
+        return
+
+    first_exact = {}
+    for j, text in enumerate(true_texts):
+        first_exact.setdefault(text, j)
+
+    unmatched = []
+    for pred in predicted_aspects:
+        pred_text = pred.text.lower()
+        pred_label = pred.label.lower()
+        j = first_exact.get(pred_text)
+        if j is None:
+            unmatched.append((pred_text, pred_label))
+        elif pred_label == true_labels[j]:
+            counts.correct += 1
+        else:
+            counts.incorrect += 1
+
+    if len(unmatched) == 0:
+        return
+    indices = partial_match_indices(true_texts, [text for text, _ in unmatched])
+    for pred_text, pred_label in unmatched:
+        j = indices[pred_text]
+        if j == math.inf:
+            counts.spurious += 1
+        elif pred_label == true_labels[j]:
+            counts.partial += 1
+        else:
+            counts.incorrect += 1
+
+
+def count_matches(
+    true_annotations: list[AspectAnnotation],
+    predicted_annotations: list[AspectAnnotation],
+) -> MatchCounts:
+    """Matches the predicted aspects with the true aspects of each text.
+
+    Parameters
+    ----------
+    true_annotations : list[AspectAnnotation]
+        List of true annotations
+    predicted_annotations : list[AspectAnnotation]
+        List of predicted annotations
+
+    Returns
+    -------
+    MatchCounts
+        Numbers of matches of all texts.
+    """
+    counts = MatchCounts()
+    for pred_an, true_an in zip(predicted_annotations, true_annotations):
+        match_aspects(true_an.aspects, pred_an.aspects, counts)
+    return counts
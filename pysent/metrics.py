@@ -0,0 +1,194 @@
+"""
+Classification metrics of the overall annotation. Labels are encoded as
+integers once and all metrics are derived from one confusion matrix, bootstrap
+confidence intervals from a stack of confusion matrices of the resamples.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+# names of the metrics, in the order of the OrdinaryResults fields
+METRICS = [
+    "global_accuracy",
+    "macro_precision",
+    "macro_recall",
+    "macro_f1",
+    "micro_precision",
+    "micro_recall",
+    "micro_f1",
+]
+
+# maximal number of elements of the resampled label arrays held at once
+BOOTSTRAP_BLOCK = 10_000_000
+
+
+def encode_labels(
+    true_labels: list[str], predicted_labels: list[str]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Encodes the labels as indices of the sorted distinct labels.
+
+    Parameters
+    ----------
+    true_labels : list[str]
+        True labels
+    predicted_labels : list[str]
+        Predicted labels
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, np.ndarray]
+        Distinct labels, codes of the true labels and codes of the predicted labels.
+    """
+    classes, codes = np.unique(
+        np.asarray(list(true_labels) + list(predicted_labels), dtype=object),
+        return_inverse=True,
+    )
+    codes = codes.reshape(-1)
+    return classes, codes[: len(true_labels)], codes[len(true_labels) :]
+
+
+def confusion_matrices(
+    true_codes: np.ndarray, predicted_codes: np.ndarray, n_classes: int
+) -> np.ndarray:
+    """Counts the pairs of true and predicted labels.
+
+    Parameters
+    ----------
+    true_codes : np.ndarray
+        Codes of the true labels, the last axis are the samples, the leading
+        axes (if any) are separate sets of samples.
+    predicted_codes : np.ndarray
+        Codes of the predicted labels, the same shape as true_codes.
+    n_classes : int
+        Number of classes.
+
+    Returns
+    -------
+    np.ndarray
+        Confusion matrices with the true labels in rows, of the shape
+        (*leading axes, n_classes, n_classes).
+    """
+    leading_shape = true_codes.shape[:-1]
+    n_sets = int(np.prod(leading_shape))
+    cells = true_codes * n_classes + predicted_codes
+    # every set of samples gets its own range of the cells
+    offsets = np.arange(n_sets).reshape(leading_shape + (1,)) * n_classes**2
+    counts = np.bincount((cells + offsets).reshape(-1), minlength=n_sets * n_classes**2)
+    return counts.reshape(leading_shape + (n_classes, n_classes))
+
+
+def divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    # division with 0 for the zero denominator, as zero_division=0 in sklearn
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    result = np.zeros(np.broadcast(numerator, denominator).shape)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+    return result
+
+
+def class_scores(matrix: np.ndarray) -> dict[str, np.ndarray]:
+    """Calculates precision, recall, F1 and support of each class.
+
+    Parameters
+    ----------
+    matrix : np.ndarray
+        Confusion matrices of the shape (..., n_classes, n_classes).
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        Scores of the shape (..., n_classes) by their names.
+    """
+    true_positives = np.diagonal(matrix, axis1=-2, axis2=-1)
+    support = matrix.sum(axis=-1)
+    predicted = matrix.sum(axis=-2)
+    precision = divide(true_positives, predicted)
+    recall = divide(true_positives, support)
+    f1 = divide(2 * true_positives, support + predicted)
+    return {"precision": precision, "recall": recall, "f1": f1, "support": support}
+
+
+def metrics_from_confusion(matrix: np.ndarray) -> dict[str, np.ndarray]:
+    """Calculates the metrics of OrdinaryResults. Macro averages are taken over
+    the classes present in the true or predicted labels, micro averages are
+    equal to the accuracy, as every sample has exactly one label.
+
+    Parameters
+    ----------
+    matrix : np.ndarray
+        Confusion matrices of the shape (..., n_classes, n_classes).
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        Metrics of the shape (...) by their names.
+    """
+    scores = class_scores(matrix)
+    present = (scores["support"] + matrix.sum(axis=-2)) > 0
+    n_present = present.sum(axis=-1)
+    accuracy = divide(
+        np.diagonal(matrix, axis1=-2, axis2=-1).sum(axis=-1),
+        matrix.sum(axis=(-2, -1)),
+    )
+    return {
+        "global_accuracy": accuracy,
+        "macro_precision": divide((scores["precision"] * present).sum(-1), n_present),
+        "macro_recall": divide((scores["recall"] * present).sum(-1), n_present),
+        "macro_f1": divide((scores["f1"] * present).sum(-1), n_present),
+        "micro_precision": accuracy,
+        "micro_recall": accuracy,
+        "micro_f1": accuracy,
+    }
+
+
+def bootstrap_intervals(
+    true_codes: np.ndarray,
+    predicted_codes: np.ndarray,
+    n_classes: int,
+    n_bootstrap: int,
+    confidence_level: float = 0.95,
+    random_state: Optional[int] = None,
+) -> dict[str, tuple[float, float]]:
+    """Calculates percentile bootstrap confidence intervals of the metrics.
+    Resamples are processed in blocks, each block with one bincount.
+
+    Parameters
+    ----------
+    true_codes : np.ndarray
+        Codes of the true labels.
+    predicted_codes : np.ndarray
+        Codes of the predicted labels.
+    n_classes : int
+        Number of classes.
+    n_bootstrap : int
+        Number of resamples.
+    confidence_level : float, optional
+        Confidence level of the intervals, by default 0.95
+    random_state : Optional[int], optional
+        Seed of the random generator, by default None
+
+    Returns
+    -------
+    dict[str, tuple[float, float]]
+        Lower and upper bound of each metric by its name.
+    """
+    rng = np.random.default_rng(random_state)
+    n_samples = len(true_codes)
+    block = max(1, BOOTSTRAP_BLOCK // max(n_samples, 1))
+    values = {name: [] for name in METRICS}
+    for start in range(0, n_bootstrap, block):
+        size = min(block, n_bootstrap - start)
+        indices = rng.integers(0, n_samples, size=(size, n_samples))
+        matrices = confusion_matrices(
+            true_codes[indices], predicted_codes[indices], n_classes
+        )
+        for name, value in metrics_from_confusion(matrices).items():
+            values[name].append(value)
+
+    alpha = (1 - confidence_level) / 2
+    intervals = {}
+    for name in METRICS:
+        low, high = np.quantile(np.concatenate(values[name]), [alpha, 1 - alpha])
+        intervals[name] = (float(low), float(high))
+    return intervals
@@ -0,0 +1,153 @@
+"""
+Process wide registry of the loaded models. Tools using the same model on the
+same device share one instance of it, so memory use and loading time grow with
+the number of distinct models instead of the number of tools.
+"""
+
+import threading
+import weakref
+from typing import Any, Callable
+
+
+class _Entry:
+    def __init__(self):
+        self.model = None
+        self.refcount = 0
+        # exception of the failed loader, raised to all tools waiting for it
+        self.error = None
+        # held while the model is loaded, so it is loaded only once
+        self.load_lock = threading.Lock()
+        # held by the tools while they run the model
+        self.lock = threading.RLock()
+
+
+class ModelHandle:
+    def __init__(self, registry: "ModelRegistry", key: tuple[str, str], entry: _Entry):
+        """Reference to a model shared through the registry. The model should be
+        run while holding the lock of the handle. The handle is released by
+        release(), at the end of a with block or, at the latest, when it is
+        garbage collected.
+
+        Parameters
+        ----------
+        registry : ModelRegistry
+            Registry which created the handle.
+        key : tuple[str, str]
+            Model id and device.
+        entry : _Entry
+            Entry of the registry holding the model.
+        """
+        self.registry = registry
+        self.key = key
+        self.model = entry.model
+        self.lock = entry.lock
+        self.released = False
+        self._entry = entry
+        # drops the reference when the handle is collected without release(),
+        # it holds the entry and not the handle, so it does not keep it alive
+        self._finalizer = weakref.finalize(self, registry._unref, key, entry)
+
+    def release(self):
+        """Releases the reference, the model is dropped from the registry when
+        no handle refers to it."""
+        self.registry.release(self)
+
+    def __enter__(self) -> "ModelHandle":
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+
+class ModelRegistry:
+    def __init__(self):
+        """Registry of the loaded models, keyed by model id and device. It is
+        thread safe."""
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def acquire(
+        self, model_id: str, device: str, loader: Callable[[], Any]
+    ) -> ModelHandle:
+        """Returns a handle to the model, loads it if it is not loaded yet.
+
+        Parameters
+        ----------
+        model_id : str
+            Id of the model, which identifies its weights and the options it
+            was loaded with.
+        device : str
+            Device the model is loaded on, e.g. "cpu" or "cuda:0".
+        loader : Callable[[], Any]
+            Function without arguments which loads the model.
+
+        Returns
+        -------
+        ModelHandle
+            Handle to the shared model.
+
+        Raises
+        ------
+        BaseException
+            Error of the loader, raised also in the threads which waited for
+            the same model. The model is loaded again by the next acquire
+            after all of them returned.
+        """
+        key = (model_id, device)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _Entry()
+                self._entries[key] = entry
+            entry.refcount += 1
+
+        with entry.load_lock:
+            if entry.error is None and entry.model is None:
+                try:
+                    entry.model = loader()
+                except BaseException as error:
+                    entry.error = error
+            if entry.error is not None:
+                self._unref(key, entry)
+                raise entry.error
+        return ModelHandle(self, key, entry)
+
+    def _unref(self, key: tuple[str, str], entry: _Entry):
+        # the entry is removed only when nobody refers to it, a failed entry
+        # may have been replaced by then
+        with self._lock:
+            entry.refcount -= 1
+            if entry.refcount == 0 and self._entries.get(key) is entry:
+                del self._entries[key]
+
+    def release(self, handle: ModelHandle):
+        """Releases the handle, the model is dropped from the registry when no
+        handle refers to it.
+
+        Parameters
+        ----------
+        handle : ModelHandle
+            Handle returned by acquire.
+        """
+        with self._lock:
+            if handle.released:
+                return
+            handle.released = True
+            handle.model = None
+        # the finalizer runs only once, collecting the handle does not unref again
+        handle._finalizer()
+
+    def loaded(self) -> dict[tuple[str, str], int]:
+        """Returns the number of handles of each loaded model.
+
+        Returns
+        -------
+        dict[tuple[str, str], int]
+            Number of handles by model id and device.
+        """
+        with self._lock:
+            return {key: entry.refcount for key, entry in self._entries.items()}
+
+
+# registry shared by all tools of the process
+registry = ModelRegistry()
@@ -4,9 +4,10 @@ sentiment analysis and test tools on already annotated texts. The structure is
 similar to the aspect based class.
 """
 
-from typing import Literal
+from typing import Callable, Iterable, Iterator, Literal, Optional
 from pysent.data_structures import SentimentAnnotation, OrdinaryResults
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+from pysent.batching import deduplicate_texts, expand_results, iter_chunks
+from pysent.parallel import parallel_annotate
 
 
 from pysent.overall_annotators import OverallAnnotatorAbstract
@@ -31,14 +32,21 @@ class OverallAnotator:
             raise ValueError("Tool must be (inherit from) an AspectExtrassifier class!")
 
         self.tool = tool
+        self.last_dedup_ratio = None
 
-    def annotate(self, texts: list[str]) -> list[SentimentAnnotation]:
+    def annotate(
+        self, texts: list[str], deduplicate: bool = False
+    ) -> list[SentimentAnnotation]:
         """Extracts and annotates aspects from the given texts.
 
         Parameters
         ----------
         texts : list[str]
             List of texts to annotate.
+        deduplicate : bool, optional
+            If True, each distinct text is annotated once and the annotation is
+            shared by all its duplicates. The fraction of texts that were
+            duplicates is stored in last_dedup_ratio, by default False
 
         Returns
         -------
@@ -48,10 +56,98 @@ class OverallAnotator:
         if isinstance(texts, str):
             texts = [texts]
 
+        if deduplicate:
+            unique_texts, inverse = deduplicate_texts(texts)
+            self.last_dedup_ratio = (
+                1 - len(unique_texts) / len(texts) if len(texts) > 0 else 0.0
+            )
+            annotations = self.tool.classify(unique_texts)
+            return expand_results(annotations, inverse)
+
         annotations = self.tool.classify(texts)
 
         return annotations
 
+    def annotate_iter(
+        self, texts: Iterable[str], batch_size: int = 256, deduplicate: bool = False
+    ) -> Iterator[SentimentAnnotation]:
+        """Annotates the texts lazily, pulling batch_size texts at a time from
+        the iterable, so neither the texts nor the annotations have to fit
+        in memory at once.
+
+        Parameters
+        ----------
+        texts : Iterable[str]
+            Iterable of texts to annotate, e.g. a generator reading them from a file.
+        batch_size : int, optional
+            Number of texts passed to the tools at once, by default 256
+        deduplicate : bool, optional
+            If True, duplicates are removed within each batch, see annotate,
+            by default False
+
+        Yields
+        ------
+        SentimentAnnotation
+            Sentiment annotation of each text, in the same order as the texts.
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+
+        for batch in iter_chunks(texts, batch_size):
+            yield from self.annotate(batch, deduplicate=deduplicate)
+
+    @classmethod
+    def annotate_parallel(
+        cls,
+        factory: Callable[[], OverallAnnotatorAbstract],
+        texts: Iterable[str],
+        n_workers: Optional[int] = None,
+        batch_size: int = 256,
+        threads_per_worker: Optional[int] = None,
+        deduplicate: bool = False,
+    ) -> list[SentimentAnnotation]:
+        """Annotates the texts in parallel worker processes. Each worker builds
+        its own tool once with the factory, so the factory (not the loaded model)
+        has to be picklable, e.g. the tool class or functools.partial(FlairAnnotator, language="en").
+
+        Parameters
+        ----------
+        factory : Callable[[], OverallAnnotatorAbstract]
+            Function without arguments which creates the tool.
+        texts : Iterable[str]
+            Iterable of texts to annotate.
+        n_workers : Optional[int], optional
+            Number of worker processes, by default number of cores
+        batch_size : int, optional
+            Number of texts sent to a worker at once, by default 256
+        threads_per_worker : Optional[int], optional
+            Number of torch / BLAS threads of each worker, by default number of
+            cores divided by n_workers
+        deduplicate : bool, optional
+            If True, duplicates are removed within each batch, by default False
+
+        Returns
+        -------
+        list[SentimentAnnotation]
+            List of sentiment annotations, in the same order as the texts. All
+            annotations are held in memory, pysent.parallel.parallel_annotate
+            yields them one by one instead.
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+
+        return list(
+            parallel_annotate(
+                cls,
+                factory,
+                texts,
+                n_workers=n_workers,
+                batch_size=batch_size,
+                threads_per_worker=threads_per_worker,
+                deduplicate=deduplicate,
+            )
+        )
+
     def test_annotator(
         self, texts: list[str], true_labels: list[str]
     ) -> OrdinaryResults:
@@ -74,13 +170,19 @@ class OverallAnotator:
             predicted_label.label.lower() for predicted_label in predicted_labels
         ]
         true_labels = [true_label.lower() for true_label in true_labels]
-        results = self.calculate_results(predicted_labels, true_labels)
+        results = self.calculate_results(true_labels, predicted_labels)
         return results
 
     def calculate_results(
-        self, true_labels: list[str], predicted_labels: list[str]
+        self,
+        true_labels: list[str],
+        predicted_labels: list[str],
+        n_bootstrap: int = 0,
+        confidence_level: float = 0.95,
+        random_state: Optional[int] = None,
     ) -> OrdinaryResults:
-        """Calculate results for predicted labels and true labels
+        """Calculate results for predicted labels and true labels. All statistics
+        are derived from one confusion matrix.
 
         Parameters
         ----------
@@ -88,6 +190,13 @@ class OverallAnotator:
             True sentiment labels
         predicted_labels : list[str]
             Predicted sentiment labels
+        n_bootstrap : int, optional
+            Number of bootstrap resamples used to calculate the confidence
+            intervals of the statistics, no intervals if 0, by default 0
+        confidence_level : float, optional
+            Confidence level of the intervals, by default 0.95
+        random_state : Optional[int], optional
+            Seed of the bootstrap resampling, by default None
 
         Returns
         -------
@@ -104,43 +213,39 @@ class OverallAnotator:
                 "Lenghts of true_labels and predicted_labels must be equal!"
             )
 
+        from pysent.metrics import (
+            bootstrap_intervals,
+            class_scores,
+            confusion_matrices,
+            encode_labels,
+            metrics_from_confusion,
+        )
+
+        classes, true_codes, predicted_codes = encode_labels(
+            true_labels, predicted_labels
+        )
+        matrix = confusion_matrices(true_codes, predicted_codes, len(classes))
+        metrics = metrics_from_confusion(matrix)
+        scores = class_scores(matrix)
+        per_class = {
+            label: {name: values[i].item() for name, values in scores.items()}
+            for i, label in enumerate(classes)
+        }
+
+        confidence_intervals = None
+        if n_bootstrap > 0 and len(true_labels) > 0:
+            confidence_intervals = bootstrap_intervals(
+                true_codes,
+                predicted_codes,
+                len(classes),
+                n_bootstrap,
+                confidence_level=confidence_level,
+                random_state=random_state,
+            )
+
         return OrdinaryResults(
-            global_accuracy=accuracy_score(y_true=true_labels, y_pred=predicted_labels),
-            macro_precision=precision_score(
-                y_true=true_labels,
-                y_pred=predicted_labels,
-                average="macro",
-                zero_division=0,
-            ),
-            macro_recall=recall_score(
-                y_true=true_labels,
-                y_pred=predicted_labels,
-                average="macro",
-                zero_division=0,
-            ),
-            macro_f1=f1_score(
-                y_true=true_labels,
-                y_pred=predicted_labels,
-                average="macro",
-                zero_division=0,
-            ),
-            micro_precision=precision_score(
-                y_true=true_labels,
-                y_pred=predicted_labels,
-                average="micro",
-                zero_division=0,
-            ),
-            micro_recall=recall_score(
-                y_true=true_labels,
-                y_pred=predicted_labels,
-                average="micro",
-                zero_division=0,
-            ),
-            micro_f1=f1_score(
-                y_true=true_labels,
-                y_pred=predicted_labels,
-                average="micro",
-                zero_division=0,
-            ),
+            **{name: value.item() for name, value in metrics.items()},
+            per_class=per_class,
+            confidence_intervals=confidence_intervals,
             name=type(self.tool).__name__,
         )
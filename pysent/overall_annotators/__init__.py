@@ -1,6 +1,11 @@
-from pysent.overall_annotators.overall_annotator_abstract import (
-    OverallAnnotatorAbstract,
+from pysent._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "OverallAnnotatorAbstract": "pysent.overall_annotators.overall_annotator_abstract",
+        "FlairAnnotator": "pysent.overall_annotators.flair_annotator",
+        "ChatGPTAnnotator": "pysent.overall_annotators.chatgpt_annotator",
+        "SentiAnnotator": "pysent.overall_annotators.senti_annotator",
+    },
 )
-from pysent.overall_annotators.flair_annotator import FlairAnnotator
-from pysent.overall_annotators.chatgpt_annotator import ChatGPTAnnotator
-from pysent.overall_annotators.senti_annotator import SentiAnnotator
@@ -1,13 +1,13 @@
 """
 Sentiment annotator based on the Chat GPT.
 """
-from openai import OpenAI
-import openai
-import time
+
+import json
 
 from pysent.overall_annotators.overall_annotator_abstract import (
     OverallAnnotatorAbstract,
 )
+from pysent.chatgpt_engine import ChatGPTTool
 from pysent.data_structures import (
     AspectAnnotation,
     ExtractedAspect,
@@ -15,56 +15,118 @@ from pysent.data_structures import (
 )
 
 
-class ChatGPTAnnotator(OverallAnnotatorAbstract):
-    def __init__(self, api_key: str, free_tier: bool = True):
-        """Object constructor
+class ChatGPTAnnotator(ChatGPTTool, OverallAnnotatorAbstract):
+    def create_message(self, text: str) -> list[dict]:
+        """Creates the prompt for the given text.
 
         Parameters
         ----------
-        api_key : str
-            API key to the Open AI service
-        free_tier : bool, optional
-            Indicator whether account connected with the API key is free.
-            For free account, the cooldown is added, by default True
-        """
-        openai.api_key = api_key
-        self.free_tier = free_tier
-
-    def classify(self, texts: str) -> list[SentimentAnnotation]:
-        super().check_arguments(texts)
+        text : str
+            Text to annotate.
 
-        annotations = []
-
-        for text in texts:
-            if len(text) > 1000:
-                text = text[:1000]
-            message = [
-                {
-                    "role": "system",
-                    "content": f"""For text below provide me a sentiment analysis label and score in the format:
+        Returns
+        -------
+        list[dict]
+            Message to send to the Chat GPT.
+        """
+        return [
+            {
+                "role": "system",
+                "content": f"""For text below provide me a sentiment analysis label and score in the format:
                                     Label: <label you suggest>
                                     Score: <score you suggest>
                                     
                                     Text:
                                     {text}""",
-                }
-            ]
-            chat = OpenAI(api_key=openai.api_key).chat
-            chat_completion = chat.completions.create(
-                messages=message,
-                model="gpt-3.5-turbo",
-            )
-            reply = chat_completion.choices[0].message.content
-
-            try:
-                label, score = reply.split("\n")
-                label = label.removeprefix("Label: ")
-                score = score.removeprefix("Score: ")
-                score = float(score)
-            except:
-                ValueError(f"Something wrong in the response: {reply}!")
-            if self.free_tier:
-                time.sleep(20)
-
-            annotations.append(SentimentAnnotation(text=text, label=label, score=score))
-        return annotations
+            }
+        ]
+
+    def parse_reply(self, text: str, reply: str) -> SentimentAnnotation:
+        """Turns the reply of the Chat GPT into annotation.
+
+        Parameters
+        ----------
+        text : str
+            Annotated text.
+        reply : str
+            Reply of the Chat GPT.
+
+        Returns
+        -------
+        SentimentAnnotation
+            Annotation of the text.
+
+        Raises
+        ------
+        ValueError
+            Error if the reply is not in the requested format.
+        """
+        try:
+            label, score = reply.split("\n")
+            label = label.removeprefix("Label: ")
+            score = score.removeprefix("Score: ")
+            score = float(score)
+        except (AttributeError, ValueError):
+            raise ValueError(f"Something wrong in the response: {reply}!")
+
+        return SentimentAnnotation(text=text, label=label, score=score)
+
+    def create_packed_message(self, texts: list[str]) -> list[dict]:
+        """Creates the prompt for multiple texts sent in one request.
+
+        Parameters
+        ----------
+        texts : list[str]
+            Texts to annotate.
+
+        Returns
+        -------
+        list[dict]
+            Message to send to the Chat GPT.
+        """
+        numbered_texts = json.dumps(
+            {str(i): text for i, text in enumerate(texts)}, ensure_ascii=False
+        )
+        return [
+            {
+                "role": "system",
+                "content": f"""For each text below provide me a sentiment analysis label and score.
+                                    Texts are given as a JSON object keyed by the index of the text.
+                                    Answer only with a JSON object keyed by the same indices, in the format:
+                                    {{"<index>": {{"label": "<label you suggest>", "score": <score you suggest>}}}}
+
+                                    Texts:
+                                    {numbered_texts}""",
+            }
+        ]
+
+    def parse_packed_item(self, text: str, item: dict) -> SentimentAnnotation:
+        """Turns the item of the JSON reply to the packed prompt into annotation.
+
+        Parameters
+        ----------
+        text : str
+            Annotated text.
+        item : dict
+            Item of the reply for the text.
+
+        Returns
+        -------
+        SentimentAnnotation
+            Annotation of the text.
+        """
+        return SentimentAnnotation(
+            text=text, label=str(item["label"]), score=float(item["score"])
+        )
+
+    def empty_result(self, text: str) -> SentimentAnnotation:
+        """Annotation of the text whose replies could not be parsed, with the
+        'unknown' label and no score."""
+        return SentimentAnnotation(text=text, label="unknown")
+
+    def classify(self, texts: str) -> list[SentimentAnnotation]:
+        super().check_arguments(texts)
+
+        texts = [text[:1000] if len(text) > 1000 else text for text in texts]
+
+        return self.complete_texts(texts)
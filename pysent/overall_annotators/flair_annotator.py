@@ -2,6 +2,7 @@
 Sentiment annotator based on the Flair Python package.
 """
 
+import flair
 from flair.data import Sentence
 from flair.nn import Classifier
 from itertools import chain
@@ -9,6 +10,9 @@ from itertools import chain
 from pysent.overall_annotators.overall_annotator_abstract import (
     OverallAnnotatorAbstract,
 )
+from pysent.annotation_batch import SentimentBatch
+from pysent.batching import length_buckets
+from pysent.model_registry import registry
 from pysent.data_structures import (
     AspectAnnotation,
     ExtractedAspect,
@@ -17,34 +21,81 @@ from pysent.data_structures import (
 
 
 class FlairAnnotator(OverallAnnotatorAbstract):
-    def __init__(self, language: str = "en"):
+    def __init__(
+        self,
+        language: str = "en",
+        mini_batch_size: int = 32,
+        return_batch: bool = False,
+    ):
         """Object constructor
 
         Parameters
         ----------
         language : str, optional
             Language to use, one of ['pl', 'en'], by default "en"
+        mini_batch_size : int, optional
+            Number of texts passed to the model in one forward pass, by default 32
+        return_batch : bool, optional
+            If True, annotations are returned as SentimentBatch (columnar, list-like)
+            instead of the list of dataclasses, by default False
 
         Raises
         ------
         ValueError
             Error is language not supported
+        ValueError
+            Error if mini_batch_size is not positive
         """
         if language not in ["en", "pl"]:
             raise ValueError("Language must be either 'en' or 'pl'!")
-        self.classifier = Classifier.load("sentiment")
+        if mini_batch_size < 1:
+            raise ValueError("mini_batch_size must be a positive integer!")
+        self.language = language
+        self.mini_batch_size = mini_batch_size
+        self.return_batch = return_batch
+        # the model is shared with other Flair tools of the process
+        self.model_handle = registry.acquire(
+            "flair:sentiment", str(flair.device), lambda: Classifier.load("sentiment")
+        )
+        self.classifier = self.model_handle.model
+
+    def get_config(self) -> dict:
+        return {"language": self.language, "model": "sentiment"}
+
+    def release(self):
+        """Releases the model shared through the registry, the tool can not be
+        used afterwards."""
+        self.model_handle.release()
+        self.classifier = None
 
     def classify(self, texts: str) -> list[SentimentAnnotation]:
         super().check_arguments(texts)
 
-        annotations = []
+        sentences = [Sentence(text) for text in texts]
 
-        for text in texts:
-            sentence = Sentence(text)
-            self.classifier.predict(sentence)
-            annotations.append(
-                SentimentAnnotation(
-                    text=text, label=sentence.tag.lower(), score=sentence.score
+        # texts of similar length are predicted together to cut the padding,
+        # sentences are labeled in place so the input order is kept
+        buckets = length_buckets(
+            [len(sentence) for sentence in sentences], self.mini_batch_size
+        )
+        with self.model_handle.lock:
+            for bucket in buckets:
+                self.classifier.predict(
+                    [sentences[i] for i in bucket],
+                    mini_batch_size=self.mini_batch_size,
                 )
+
+        if self.return_batch:
+            return SentimentBatch(
+                texts,
+                [sentence.tag.lower() for sentence in sentences],
+                [sentence.score for sentence in sentences],
+            )
+
+        annotations = [
+            SentimentAnnotation(
+                text=text, label=sentence.tag.lower(), score=sentence.score
             )
+            for text, sentence in zip(texts, sentences)
+        ]
         return annotations
@@ -2,12 +2,15 @@
 Sentiment annotator based on the Flair Python package.
 """
 
-from sentistrength import PySentiStr
+import os
+
 import numpy as np
 from itertools import chain
 from pysent.overall_annotators.overall_annotator_abstract import (
     OverallAnnotatorAbstract,
 )
+from pysent.annotation_batch import SentimentBatch, to_object_array
+from pysent.sentistrength_pool import get_pool
 from pysent.data_structures import (
     AspectAnnotation,
     ExtractedAspect,
@@ -17,7 +20,13 @@ from pysent.data_structures import (
 
 class SentiAnnotator(OverallAnnotatorAbstract):
     def __init__(
-        self, language: str = "en", ss_jar_path: str = None, ss_lang_path: str = None
+        self,
+        language: str = "en",
+        ss_jar_path: str = None,
+        ss_lang_path: str = None,
+        chunk_size: int = 5000,
+        n_workers: int = 2,
+        return_batch: bool = False,
     ):
         """Object constructor
 
@@ -29,6 +38,14 @@ class SentiAnnotator(OverallAnnotatorAbstract):
             Path to jar SentiStrenght file, by default None
         ss_lang_path : str, optional
             Path to jar SentiStrenght language folder, by default None
+        chunk_size : int, optional
+            Number of texts sent to the SentiStrength pool at once, by default 5000
+        n_workers : int, optional
+            Number of SentiStrength processes of the pool, used if the pool for
+            the given files is not created yet, by default 2
+        return_batch : bool, optional
+            If True, annotations are returned as SentimentBatch (columnar, list-like)
+            instead of the list of dataclasses, by default False
 
         Raises
         ------
@@ -38,37 +55,68 @@ class SentiAnnotator(OverallAnnotatorAbstract):
             Error if data folder path is missing.
         ValueError
             Error if language is not one of ['en', 'pl'].
+        ValueError
+            Error if chunk_size is not positive.
         """
         if ss_jar_path == None:
             raise ValueError(
                 "Missing path for SentiStrength .jar! Note: Provide absolute path instead of relative path"
             )
-        if ss_jar_path == None:
+        if ss_lang_path == None:
             raise ValueError(
                 "Missing path for SentiStrength data folder! Note: Provide absolute path instead of relative path"
             )
         if language not in ["en", "pl"]:
             raise ValueError("Language must be either 'en' or 'pl'!")
-        self.classifier = PySentiStr()
-        self.classifier.setSentiStrengthPath(ss_jar_path)
-        self.classifier.setSentiStrengthLanguageFolderPath(ss_lang_path)
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer!")
+        self.language = language
+        self.ss_jar_path = os.path.abspath(ss_jar_path)
+        self.ss_lang_path = os.path.abspath(ss_lang_path)
+        self.chunk_size = chunk_size
+        self.return_batch = return_batch
+        # persistent SentiStrength processes, shared with other tools using
+        # the same files
+        self.pool = get_pool(ss_jar_path, ss_lang_path, n_workers=n_workers)
+
+    def get_config(self) -> dict:
+        # the output depends on the SentiStrength files, not on the language
+        return {
+            "language": self.language,
+            "ss_jar_path": self.ss_jar_path,
+            "ss_lang_path": self.ss_lang_path,
+        }
 
     def classify(self, texts: str) -> list[SentimentAnnotation]:
         super().check_arguments(texts)
 
-        annotations = []
+        # labels indexed by the position of the strongest of the
+        # (positive, negative, trinary) scores
+        labels = np.array([self.map_sentiment(i) for i in range(3)], dtype=object)
+
+        sentiment_index = []
+        scores = []
+        for start in range(0, len(texts), self.chunk_size):
+            chunk = texts[start : start + self.chunk_size]
+            sentiment_scores = np.asarray(self.pool.score(chunk)).reshape(-1, 3)
+            chunk_index = np.argmax(np.abs(sentiment_scores), axis=1)
+            sentiment_index.append(chunk_index)
+            scores.append(sentiment_scores[np.arange(len(chunk)), chunk_index])
+        sentiment_index = np.concatenate(sentiment_index or [np.empty(0, dtype=int)])
+        scores = np.concatenate(scores or [np.empty(0, dtype=int)])
+
+        if self.return_batch:
+            return SentimentBatch.from_codes(
+                to_object_array(list(texts)),
+                sentiment_index.astype(np.int32),
+                labels,
+                scores.astype(np.float64),
+            )
 
-        for text in texts:
-            sentiment_score = self.classifier.getSentiment(text, score="trinary")
-            sentiment_index = [
-                np.argmax(np.abs(sentiment)) for sentiment in sentiment_score
-            ]
-            sentiment = list(map(self.map_sentiment, sentiment_index))[0]
-            annotations.append(
-                SentimentAnnotation(
-                    text=text,
-                    label=sentiment,
-                    score=sentiment_score[0][sentiment_index[0]],
-                )
+        annotations = [
+            SentimentAnnotation(text=text, label=label, score=score)
+            for text, label, score in zip(
+                texts, labels[sentiment_index].tolist(), scores.tolist()
             )
+        ]
         return annotations
@@ -0,0 +1,140 @@
+"""
+Parallel annotation in worker processes. Every worker builds its own tool once
+with a picklable factory (e.g. the tool class or a functools.partial of it), so
+models are never sent between the processes, only texts and annotations.
+
+Workers are spawned, so they import the main module of the program again. The
+code starting the annotation in a script must be guarded with
+`if __name__ == "__main__":`, otherwise every worker runs it again and the
+pool fails to start.
+"""
+
+import importlib.util
+import os
+import pickle
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Callable, Iterable, Iterator, Optional
+
+from pysent.batching import iter_chunks
+
+# variables read by the BLAS / OpenMP libraries when they are loaded
+THREAD_ENV_VARS = [
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+]
+
+# annotator of the worker process, created by init_worker
+_annotator = None
+
+
+def limit_threads(n_threads: int):
+    """Limits the number of threads used by torch and the BLAS libraries in
+    the current process, so the workers do not oversubscribe the cores. The
+    environment variables are read by the libraries when they are loaded, so
+    it should be called before they are imported. Libraries loaded already are
+    limited with threadpoolctl, if it is installed, and torch directly.
+
+    Parameters
+    ----------
+    n_threads : int
+        Number of threads.
+    """
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(n_threads)
+    if importlib.util.find_spec("threadpoolctl") is not None:
+        from threadpoolctl import threadpool_limits
+
+        threadpool_limits(n_threads)
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(n_threads)
+
+
+def init_worker(n_threads: int, payload: bytes):
+    global _annotator
+    # the annotator class and the factory are sent pickled and loaded only
+    # after the limits are set, since loading them imports the tools together
+    # with torch and the BLAS libraries
+    limit_threads(n_threads)
+    annotator_class, factory = pickle.loads(payload)
+    _annotator = annotator_class(factory())
+
+
+def annotate_batch(texts: list[str], deduplicate: bool = False) -> list:
+    return _annotator.annotate(texts, deduplicate=deduplicate)
+
+
+def parallel_annotate(
+    annotator_class: type,
+    factory: Callable,
+    texts: Iterable[str],
+    n_workers: Optional[int] = None,
+    batch_size: int = 256,
+    threads_per_worker: Optional[int] = None,
+    deduplicate: bool = False,
+) -> Iterator:
+    """Annotates the texts in worker processes and yields the annotations in
+    the order of the texts. At most two batches per worker are in flight, so
+    the texts can be a lazy iterable of any length. In a script, it must be
+    called under `if __name__ == "__main__":`, see the module docstring.
+
+    Parameters
+    ----------
+    annotator_class : type
+        OverallAnotator or AspectAnotator.
+    factory : Callable
+        Picklable function without arguments which creates the argument of the
+        annotator_class - the tool for the OverallAnotator or the pipeline list
+        for the AspectAnotator. Called once in every worker.
+    texts : Iterable[str]
+        Iterable of texts to annotate.
+    n_workers : Optional[int], optional
+        Number of worker processes, by default number of cores
+    batch_size : int, optional
+        Number of texts sent to a worker at once, by default 256
+    threads_per_worker : Optional[int], optional
+        Number of torch / BLAS threads of each worker, by default number of
+        cores divided by n_workers
+    deduplicate : bool, optional
+        If True, duplicates are removed within each batch, by default False
+
+    Yields
+    ------
+    Any
+        Annotation of each text, in the same order as the texts.
+
+    Raises
+    ------
+    ValueError
+        Error if n_workers or threads_per_worker is not positive.
+    """
+    n_cores = os.cpu_count() or 1
+    if n_workers is None:
+        n_workers = n_cores
+    if n_workers < 1:
+        raise ValueError("n_workers must be a positive integer!")
+    if threads_per_worker is None:
+        threads_per_worker = max(1, n_cores // n_workers)
+    if threads_per_worker < 1:
+        raise ValueError("threads_per_worker must be a positive integer!")
+
+    # workers are spawned, not forked, so they do not inherit torch thread
+    # pools or CUDA state of the parent
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        mp_context=get_context("spawn"),
+        initializer=init_worker,
+        initargs=(threads_per_worker, pickle.dumps((annotator_class, factory))),
+    ) as executor:
+        pending = deque()
+        for batch in iter_chunks(texts, batch_size):
+            pending.append(executor.submit(annotate_batch, batch, deduplicate))
+            if len(pending) >= 2 * n_workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
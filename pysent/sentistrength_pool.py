@@ -0,0 +1,258 @@
+"""
+Pool of long-lived SentiStrength processes shared by the SentiStrength based
+tools. Each worker runs SentiStrength in the stdin mode, so the JVM is started
+once and every text costs one line written to its stdin and one line read from
+its stdout.
+"""
+
+import atexit
+import math
+import queue
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SentiStrengthWorker:
+    def __init__(self, command: list[str], window: int = 256):
+        """Persistent SentiStrength process scoring texts line by line.
+
+        Parameters
+        ----------
+        command : list[str]
+            Command starting SentiStrength in the stdin, trinary mode.
+        window : int, optional
+            Maximal number of texts written to the process before their scores
+            are read. Keeps both pipes from filling up, by default 256
+        """
+        self.command = command
+        self.window = window
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+        )
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    @staticmethod
+    def to_line(text: str) -> str:
+        # one text has to be one line, SentiStrength reads "+" as a space
+        return text.replace("\r", " ").replace("\n", " ").replace(" ", "+") + "\n"
+
+    def read_scores(self) -> tuple[int, int, int]:
+        line = self.process.stdout.readline()
+        if line == "":
+            raise RuntimeError("SentiStrength process exited unexpectedly!")
+        positive, negative, trinary = line.split()[:3]
+        return int(positive), int(negative), int(trinary)
+
+    def score(self, texts: list[str]) -> list[tuple[int, int, int]]:
+        """Scores the texts, writing them to the process while reading the
+        scores of the previous ones.
+
+        Parameters
+        ----------
+        texts : list[str]
+            List of texts.
+
+        Returns
+        -------
+        list[tuple[int, int, int]]
+            Positive, negative and trinary score of each text.
+
+        Raises
+        ------
+        RuntimeError
+            Error if the process died.
+        """
+        scores = []
+        for written, text in enumerate(texts, start=1):
+            self.process.stdin.write(self.to_line(text))
+            if written - len(scores) >= self.window:
+                self.process.stdin.flush()
+                scores.append(self.read_scores())
+        self.process.stdin.flush()
+        while len(scores) < len(texts):
+            scores.append(self.read_scores())
+        return scores
+
+    def close(self):
+        """Stops the process."""
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class SentiStrengthPool:
+    def __init__(
+        self,
+        ss_jar_path: str,
+        ss_lang_path: str,
+        n_workers: int = 2,
+        chunk_size: int = 1000,
+        window: int = 256,
+        max_restarts: int = 3,
+        java_path: str = "java",
+    ):
+        """Pool of persistent SentiStrength processes. Texts are split into
+        chunks scored by the workers in parallel, workers which died are
+        restarted and their chunk is scored again.
+
+        Parameters
+        ----------
+        ss_jar_path : str
+            Path to jar SentiStrenght file
+        ss_lang_path : str
+            Path to jar SentiStrenght language folder
+        n_workers : int, optional
+            Number of SentiStrength processes, by default 2
+        chunk_size : int, optional
+            Maximal number of texts sent to a worker at once, by default 1000
+        window : int, optional
+            Maximal number of texts in flight in one worker, by default 256
+        max_restarts : int, optional
+            Number of times a chunk is scored again after its worker died,
+            by default 3
+        java_path : str, optional
+            Path to the java executable, by default "java"
+
+        Raises
+        ------
+        ValueError
+            Error if n_workers, chunk_size or window is not positive.
+        """
+        if n_workers < 1:
+            raise ValueError("n_workers must be a positive integer!")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer!")
+        if window < 1:
+            raise ValueError("window must be a positive integer!")
+        self.command = [
+            java_path,
+            "-jar",
+            ss_jar_path,
+            "stdin",
+            "sentidata",
+            ss_lang_path,
+            "trinary",
+        ]
+        self.n_workers = n_workers
+        self.chunk_size = chunk_size
+        self.window = window
+        self.max_restarts = max_restarts
+        # idle workers, None stands for a worker not started yet
+        self._idle = queue.Queue(maxsize=n_workers)
+        for _ in range(n_workers):
+            self._idle.put(None)
+        self._executor = ThreadPoolExecutor(max_workers=n_workers)
+        self._closed = False
+
+    def _score_chunk(self, texts: list[str]) -> list[tuple[int, int, int]]:
+        worker = self._idle.get()
+        try:
+            for attempt in range(self.max_restarts + 1):
+                if worker is None or not worker.is_alive():
+                    if worker is not None:
+                        worker.close()
+                    worker = SentiStrengthWorker(self.command, self.window)
+                try:
+                    return worker.score(texts)
+                except (RuntimeError, OSError, ValueError):
+                    # the process died or its output is out of sync, the
+                    # worker is replaced and the chunk scored again
+                    worker.close()
+                    worker = None
+                    if attempt == self.max_restarts:
+                        raise
+        finally:
+            self._idle.put(worker)
+
+    def score(self, texts: list[str]) -> list[tuple[int, int, int]]:
+        """Scores the texts with the SentiStrength in the trinary mode.
+
+        Parameters
+        ----------
+        texts : list[str]
+            List of texts.
+
+        Returns
+        -------
+        list[tuple[int, int, int]]
+            Positive, negative and trinary score of each text, in the same
+            order as the texts.
+        """
+        if self._closed:
+            raise RuntimeError("SentiStrength pool is closed!")
+        if len(texts) == 0:
+            return []
+        # chunks are spread over all workers, but no longer than chunk_size
+        size = min(self.chunk_size, math.ceil(len(texts) / self.n_workers))
+        chunks = [texts[i : i + size] for i in range(0, len(texts), size)]
+        scores = []
+        for chunk_scores in self._executor.map(self._score_chunk, chunks):
+            scores.extend(chunk_scores)
+        return scores
+
+    def close(self):
+        """Stops all workers of the pool."""
+        if self._closed:
+            return
+        self._closed = True
+        self._executor.shutdown(wait=True)
+        while not self._idle.empty():
+            worker = self._idle.get()
+            if worker is not None:
+                worker.close()
+
+
+# pools are shared by all tools using the same SentiStrength files
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(ss_jar_path: str, ss_lang_path: str, **kwargs) -> SentiStrengthPool:
+    """Returns the pool shared by all tools using the given SentiStrength files,
+    creates it if it does not exist.
+
+    Parameters
+    ----------
+    ss_jar_path : str
+        Path to jar SentiStrenght file
+    ss_lang_path : str
+        Path to jar SentiStrenght language folder
+    **kwargs
+        Arguments of the SentiStrengthPool used if the pool is created.
+
+    Returns
+    -------
+    SentiStrengthPool
+        Shared pool.
+    """
+    key = (ss_jar_path, ss_lang_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = SentiStrengthPool(ss_jar_path, ss_lang_path, **kwargs)
+            _pools[key] = pool
+        return pool
+
+
+@atexit.register
+def close_pools():
+    """Stops the workers of all shared pools."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -1,23 +1,30 @@
 from pysent.data_structures import SentimentAnnotation, AspectAnnotation
 
 
-def create_aspects(array_, aspect_column, sentiment_column):
-    return [
-        SentimentAnnotation(text=el[aspect_column], label=el[sentiment_column])
-        for id, el in array_.iterrows()
-    ]
-
-
-def create_sentimented(row, text_column):
-    return AspectAnnotation(text=row[text_column], aspects=row["Aspects"])
-
-
 def transform_aspects(
     data_frame, id_column, text_column, aspect_column, sentiment_column
 ):
-    true_labels = (
-        data_frame.groupby([id_column, text_column])
-        .apply(lambda row: create_aspects(row, aspect_column, sentiment_column))
-        .reset_index(name="Aspects")
-    )
-    return list(true_labels.apply(lambda x: create_sentimented(x, text_column), axis=1))
+    import numpy as np
+
+    # number of the (id, text) group of each row, in the sorted order of the
+    # groups, -1 for the rows with missing keys (dropped by groupby)
+    codes = data_frame.groupby([id_column, text_column], sort=True).ngroup().to_numpy()
+    keep = np.flatnonzero(codes >= 0)
+    # rows are ordered by group, keeping the order of the rows within a group
+    order = keep[np.argsort(codes[keep], kind="stable")]
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.diff(sorted_codes, prepend=-1))
+    ends = np.append(starts[1:], len(order))
+
+    texts = data_frame[text_column].to_numpy()[order[starts]].tolist()
+    aspects = [
+        SentimentAnnotation(text=aspect, label=sentiment)
+        for aspect, sentiment in zip(
+            data_frame[aspect_column].to_numpy()[order].tolist(),
+            data_frame[sentiment_column].to_numpy()[order].tolist(),
+        )
+    ]
+    return [
+        AspectAnnotation(text=text, aspects=aspects[start:end])
+        for text, start, end in zip(texts, starts.tolist(), ends.tolist())
+    ]
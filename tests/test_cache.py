@@ -0,0 +1,98 @@
+"""
+Results of the tools are served from the cache only to the tools with the same
+class and configuration, and stored as JSON.
+"""
+
+import sqlite3
+
+import pytest
+
+from pysent.cache import AnnotationCache, cached, decode_result, encode_result
+from pysent.data_structures import (
+    AspectAnnotation,
+    ExtractedAspect,
+    SentimentAnnotation,
+)
+from pysent.overall_annotators.overall_annotator_abstract import (
+    OverallAnnotatorAbstract,
+)
+from pysent.overall_annotators.senti_annotator import SentiAnnotator
+
+
+class PrefixAnnotator(OverallAnnotatorAbstract):
+    """Labels each text with the prefix, which is a part of its configuration."""
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.calls = []
+
+    def get_config(self) -> dict:
+        return {"prefix": self.prefix}
+
+    def classify(self, texts: list[str]) -> list[SentimentAnnotation]:
+        self.calls.append(list(texts))
+        return [
+            SentimentAnnotation(text=text, label=f"{self.prefix}{text}", score=0.5)
+            for text in texts
+        ]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = AnnotationCache(str(tmp_path / "cache.sqlite"))
+    yield cache
+    cache.close()
+
+
+def test_tools_with_different_configs_do_not_share_entries(cache):
+    first = cached(PrefixAnnotator("a-"), cache)
+    second = cached(PrefixAnnotator("b-"), cache)
+
+    assert [el.label for el in first.classify(["x", "y"])] == ["a-x", "a-y"]
+    assert [el.label for el in second.classify(["x", "y"])] == ["b-x", "b-y"]
+    assert second.tool.calls == [["x", "y"]]
+
+    again = cached(PrefixAnnotator("a-"), cache)
+    assert [el.label for el in again.classify(["x", "y"])] == ["a-x", "a-y"]
+    assert again.tool.calls == []
+
+
+def test_senti_config_depends_on_sentistrength_files(tmp_path):
+    jar = str(tmp_path / "SentiStrength.jar")
+    first = SentiAnnotator(ss_jar_path=jar, ss_lang_path=str(tmp_path / "en"))
+    second = SentiAnnotator(ss_jar_path=jar, ss_lang_path=str(tmp_path / "pl"))
+    assert AnnotationCache.namespace(first) != AnnotationCache.namespace(second)
+
+
+def test_duplicate_misses_are_counted_as_misses(cache):
+    tool = cached(PrefixAnnotator("a-"), cache)
+    tool.classify(["x", "x", "y"])
+    assert tool.tool.calls == [["x", "y"]]
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (0, 3)
+
+    tool.classify(["x", "z", "z"])
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (1, 5)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        SentimentAnnotation("nice book", "positive", 0.9),
+        SentimentAnnotation("nice book", "positive"),
+        AspectAnnotation("nice book", [SentimentAnnotation("book", "positive", 0.75)]),
+        [ExtractedAspect("book", "nice book", 5, 9), ExtractedAspect("x", "y")],
+        [],
+    ],
+)
+def test_results_round_trip_through_json(value):
+    assert decode_result(encode_result(value)) == value
+
+
+def test_results_are_stored_as_json(cache):
+    cached(PrefixAnnotator("a-"), cache).classify(["x"])
+    connection = sqlite3.connect(cache.path)
+    (value,) = connection.execute("SELECT value FROM annotations").fetchone()
+    connection.close()
+    assert decode_result(value) == SentimentAnnotation("x", "a-x", 0.5)
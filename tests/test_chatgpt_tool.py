@@ -0,0 +1,66 @@
+"""
+A malformed reply of the Chat GPT is requested again, and if it stays malformed
+only its text gets the empty result, the other replies of the batch are kept.
+"""
+
+import pytest
+
+pytest.importorskip("openai")
+
+from pysent.aspect_annotators.extractors.chatgpt_extractor import ChatGPTExtractor
+from pysent.chatgpt_engine import ChatGPTTool
+from pysent.data_structures import ExtractedAspect
+from pysent.overall_annotators.chatgpt_annotator import ChatGPTAnnotator
+
+
+class FakeEngine:
+    """Replies to the prompts from the queues of the replies of each text."""
+
+    def __init__(self, tool: ChatGPTTool, replies: dict[str, list[str]]):
+        self.prompts = {
+            tool.create_message(text)[0]["content"]: text for text in replies
+        }
+        self.replies = replies
+        self.requests = []
+
+    def complete(self, messages: list[list[dict]]) -> list[str]:
+        texts = [self.prompts[message[0]["content"]] for message in messages]
+        self.requests.append(texts)
+        return [self.replies[text].pop(0) for text in texts]
+
+
+def test_tool_is_abstract():
+    with pytest.raises(TypeError):
+        ChatGPTTool("sk-test")
+
+
+def test_malformed_reply_is_requested_again():
+    tool = ChatGPTAnnotator("sk-test")
+    tool.engine = FakeEngine(
+        tool,
+        {
+            "good": ["Label: positive\nScore: 0.9"],
+            "bad": ["no idea", "Label: negative\nScore: 0.2"],
+        },
+    )
+    annotations = tool.classify(["good", "bad"])
+    assert [(el.label, el.score) for el in annotations] == [
+        ("positive", 0.9),
+        ("negative", 0.2),
+    ]
+    assert tool.engine.requests == [["good", "bad"], ["bad"]]
+
+
+def test_malformed_reply_gets_empty_result_and_others_are_kept():
+    tool = ChatGPTExtractor("sk-test")
+    tool.engine = FakeEngine(
+        tool,
+        {
+            "nice food": ["Aspect: food\nChunk: nice food"],
+            "garbage": ["???"] * (tool.MAX_REPLY_RETRIES + 1),
+        },
+    )
+    assert tool.extract(["nice food", "garbage"]) == [
+        [ExtractedAspect("food", "nice food")],
+        [],
+    ]
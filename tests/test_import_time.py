@@ -0,0 +1,128 @@
+"""
+Importing pysent and its subpackages must not import any of the backends or
+the heavy dependencies, they are loaded only when their attributes are used,
+and an attribute loads only the dependencies of its own module.
+"""
+
+import importlib.util
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+HEAVY_MODULES = [
+    "flair",
+    "spacy",
+    "pyabsa",
+    "openai",
+    "sentistrength",
+    "pandas",
+    "plotnine",
+    "numpy",
+    "pyarrow",
+    "torch",
+]
+
+PACKAGES = [
+    "pysent",
+    "pysent.overall_annotators",
+    "pysent.aspect_annotators",
+    "pysent.aspect_annotators.classifiers",
+    "pysent.aspect_annotators.extractors",
+    "pysent.aspect_annotators.extrassifiers",
+    "pysent.cli",
+]
+
+# heavy dependencies imported by the module of each lazy attribute of pysent
+ATTRIBUTE_DEPENDENCIES = {
+    "ExtractedAspect": [],
+    "SentimentAnnotation": [],
+    "AspectAnnotation": [],
+    "FrozenExtractedAspect": [],
+    "FrozenSentimentAnnotation": [],
+    "FrozenAspectAnnotation": [],
+    "SentimentLabel": [],
+    "OrdinaryResults": [],
+    "AspectBasedResults": [],
+    "concat_results": [],
+    "transform_output": [],
+    "SentimentBatch": ["numpy"],
+    "AnnotationBatch": ["numpy"],
+    "AspectClassifier": [],
+    "FlairClassifier": ["flair"],
+    "SentiClassifier": ["sentistrength"],
+    "OverallAnnotatorAbstract": [],
+    "FlairAnnotator": ["flair"],
+    "ChatGPTAnnotator": ["openai"],
+    "SentiAnnotator": ["sentistrength"],
+    "AspectAnotator": [],
+    "OverallAnotator": [],
+    "AnnotationCache": [],
+    "cached": [],
+    "read_texts": ["numpy"],
+    "AnnotationWriter": ["numpy"],
+    "annotate_corpus": ["numpy"],
+}
+
+# attributes of the subpackages, which are not attributes of pysent
+SUBPACKAGE_DEPENDENCIES = {
+    ("pysent.aspect_annotators", "AspectExtractor"): [],
+    ("pysent.aspect_annotators", "SpacyExtractor"): ["spacy"],
+    ("pysent.aspect_annotators", "ChatGPTExtractor"): ["openai"],
+    ("pysent.aspect_annotators", "PyabsaExtractor"): ["pyabsa"],
+    ("pysent.aspect_annotators", "AspectExtrassifier"): [],
+    ("pysent.aspect_annotators", "PyabsaExtrassifier"): ["pyabsa"],
+    ("pysent.aspect_annotators", "ChatGPTExtrassifier"): ["openai"],
+}
+
+
+def imported_heavy_modules(statement: str) -> set[str]:
+    # a fresh interpreter, so modules imported by other tests do not count
+    code = (
+        f"import sys, json; {statement}; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(json.loads(result.stdout))
+
+
+def expected_heavy_modules(dependencies: list[str]) -> set[str]:
+    # the dependencies themselves and whatever they import, e.g. torch for flair
+    missing = [el for el in dependencies if importlib.util.find_spec(el) is None]
+    if missing:
+        pytest.skip(f"{', '.join(missing)} not installed")
+    expected = set(dependencies)
+    for dependency in dependencies:
+        expected |= imported_heavy_modules(f"import {dependency}")
+    return expected
+
+
+@pytest.mark.parametrize("package", PACKAGES)
+def test_import_does_not_load_backends(package):
+    assert imported_heavy_modules(f"import {package}") == set()
+
+
+def test_all_attributes_are_checked():
+    import pysent
+
+    assert set(pysent.__all__) == set(ATTRIBUTE_DEPENDENCIES)
+
+
+@pytest.mark.parametrize(
+    ("package", "attribute", "dependencies"),
+    [("pysent", name, deps) for name, deps in ATTRIBUTE_DEPENDENCIES.items()]
+    + [(*key, deps) for key, deps in SUBPACKAGE_DEPENDENCIES.items()],
+)
+def test_attribute_loads_only_its_dependencies(package, attribute, dependencies):
+    expected = expected_heavy_modules(dependencies)
+    assert imported_heavy_modules(f"from {package} import {attribute}") == expected
@@ -0,0 +1,102 @@
+"""
+Matching of the aspects gives the same counts as the nested loops it replaced,
+both with the direct scan and with the Aho-Corasick automata.
+"""
+
+import math
+import random
+
+import pytest
+
+import pysent.matching
+from pysent.data_structures import AspectAnnotation, SentimentAnnotation
+from pysent.matching import (
+    MatchCounts,
+    automaton_match_indices,
+    count_matches,
+    scan_match_indices,
+)
+
+# short words over a small alphabet, so aspects often contain one another
+WORDS = ["a", "b", "ab", "ba", "abc", "c", "bc", "cab", ""]
+LABELS = ["positive", "Positive", "negative", "neutral"]
+
+
+def reference_counts(true_annotations, predicted_annotations) -> MatchCounts:
+    # the nested loops of AspectAnotator.calculate_results before the indices
+    counts = MatchCounts()
+    for pred_an, true_an in zip(predicted_annotations, true_annotations):
+        for pred in pred_an.aspects:
+            pred_aspect = pred.text.lower()
+            pred_sentiment = pred.label.lower()
+            matching_aspect = False
+            for true_ in true_an.aspects:
+                true_aspect = true_.text.lower()
+                true_sentiment = true_.label.lower()
+                if pred_aspect == true_aspect:
+                    if pred_sentiment == true_sentiment:
+                        counts.correct += 1
+                    else:
+                        counts.incorrect += 1
+                    matching_aspect = True
+                    break
+            if not matching_aspect:
+                for true_ in true_an.aspects:
+                    true_aspect = true_.text.lower()
+                    true_sentiment = true_.label.lower()
+                    if true_aspect in pred_aspect or pred_aspect in true_aspect:
+                        if pred_sentiment == true_sentiment:
+                            counts.partial += 1
+                        else:
+                            counts.incorrect += 1
+                        matching_aspect = True
+                        break
+            if not matching_aspect:
+                counts.spurious += 1
+    return counts
+
+
+def random_aspect(rng: random.Random) -> str:
+    text = "".join(rng.choice(WORDS) for _ in range(rng.randint(0, 3)))
+    return text.upper() if rng.random() < 0.2 else text
+
+
+def random_annotations(rng: random.Random, max_aspects: int):
+    def annotation():
+        aspects = [
+            SentimentAnnotation(random_aspect(rng), rng.choice(LABELS))
+            for _ in range(rng.randint(0, max_aspects))
+        ]
+        return AspectAnnotation("text", aspects)
+
+    n_texts = rng.randint(1, 5)
+    return [annotation() for _ in range(n_texts)], [
+        annotation() for _ in range(n_texts)
+    ]
+
+
+@pytest.mark.parametrize("max_aspects", [0, 1, 4, 12, 300])
+@pytest.mark.parametrize("max_scanned_pairs", [pysent.matching.MAX_SCANNED_PAIRS, 0])
+def test_counts_match_nested_loops(monkeypatch, max_aspects, max_scanned_pairs):
+    # with no scanned pairs, all texts go through the hash and automaton indices
+    monkeypatch.setattr(pysent.matching, "MAX_SCANNED_PAIRS", max_scanned_pairs)
+    rng = random.Random(max_aspects)
+    for _ in range(50 if max_aspects < 300 else 3):
+        true, predicted = random_annotations(rng, max_aspects)
+        assert count_matches(true, predicted) == reference_counts(true, predicted)
+
+
+def test_scan_and_automaton_agree():
+    rng = random.Random(0)
+    for _ in range(500):
+        true_texts = [random_aspect(rng).lower() for _ in range(rng.randint(0, 8))]
+        predicted = [random_aspect(rng).lower() for _ in range(rng.randint(0, 8))]
+        expected = {
+            text: next(
+                (j for j, t in enumerate(true_texts) if t in text or text in t),
+                math.inf,
+            )
+            for text in predicted
+        }
+        assert scan_match_indices(true_texts, predicted) == expected
+        assert automaton_match_indices(true_texts, predicted) == expected
@@ -0,0 +1,80 @@
+"""
+Metrics derived from the confusion matrix are equal to the metrics of sklearn,
+with zero_division=0, and empty labels give zeros.
+"""
+
+import random
+
+import pytest
+
+sklearn_metrics = pytest.importorskip("sklearn.metrics")
+
+from pysent.data_structures import SentimentAnnotation
+from pysent.overall_annotator import OverallAnotator
+from pysent.overall_annotators.overall_annotator_abstract import (
+    OverallAnnotatorAbstract,
+)
+
+LABELS = ["positive", "negative", "neutral", "mixed"]
+
+
+class NeutralAnnotator(OverallAnnotatorAbstract):
+    """Labels every text as neutral, only calculate_results is used."""
+
+    def classify(self, texts: list[str]) -> list[SentimentAnnotation]:
+        return [SentimentAnnotation(text=text, label="neutral") for text in texts]
+
+
+def sklearn_results(true_labels: list[str], predicted_labels: list[str]) -> dict:
+    results = {
+        "global_accuracy": sklearn_metrics.accuracy_score(true_labels, predicted_labels)
+    }
+    for average in ["macro", "micro"]:
+        precision, recall, f1, _ = sklearn_metrics.precision_recall_fscore_support(
+            true_labels, predicted_labels, average=average, zero_division=0
+        )
+        results[f"{average}_precision"] = precision
+        results[f"{average}_recall"] = recall
+        results[f"{average}_f1"] = f1
+    return results
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_metrics_match_sklearn(seed):
+    rng = random.Random(seed)
+    labels = LABELS[: rng.randint(1, len(LABELS))]
+    n_samples = rng.randint(1, 60)
+    true_labels = [rng.choice(labels) for _ in range(n_samples)]
+    # some predicted labels never occur in the true labels and vice versa
+    predicted_labels = [rng.choice(LABELS) for _ in range(n_samples)]
+
+    results = OverallAnotator(NeutralAnnotator()).calculate_results(
+        true_labels, predicted_labels
+    )
+    for name, expected in sklearn_results(true_labels, predicted_labels).items():
+        assert getattr(results, name) == pytest.approx(expected), name
+
+    precision, recall, f1, support = sklearn_metrics.precision_recall_fscore_support(
+        true_labels, predicted_labels, labels=sorted(results.per_class), zero_division=0
+    )
+    for i, label in enumerate(sorted(results.per_class)):
+        scores = results.per_class[label]
+        assert scores["precision"] == pytest.approx(precision[i])
+        assert scores["recall"] == pytest.approx(recall[i])
+        assert scores["f1"] == pytest.approx(f1[i])
+        assert scores["support"] == support[i]
+
+
+def test_empty_labels_give_zeros():
+    results = OverallAnotator(NeutralAnnotator()).calculate_results([], [], 100)
+    assert [
+        results.global_accuracy,
+        results.macro_precision,
+        results.macro_recall,
+        results.macro_f1,
+        results.micro_precision,
+        results.micro_recall,
+        results.micro_f1,
+    ] == [0.0] * 7
+    assert results.per_class == {}
+    assert results.confidence_intervals is None
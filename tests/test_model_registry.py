@@ -0,0 +1,50 @@
+"""
+Models are shared by the handles of the registry and dropped when the last
+handle is released, explicitly, by a with block or by the garbage collector.
+"""
+
+import gc
+
+from pysent.model_registry import ModelRegistry
+
+
+def test_model_is_loaded_once_and_shared():
+    registry = ModelRegistry()
+    loads = []
+    first = registry.acquire("model", "cpu", lambda: loads.append(1) or object())
+    second = registry.acquire("model", "cpu", lambda: loads.append(1) or object())
+    assert first.model is second.model
+    assert loads == [1]
+    assert registry.loaded() == {("model", "cpu"): 2}
+
+    first.release()
+    first.release()
+    assert registry.loaded() == {("model", "cpu"): 1}
+    second.release()
+    assert registry.loaded() == {}
+
+
+def test_handle_is_released_at_the_end_of_with_block():
+    registry = ModelRegistry()
+    with registry.acquire("model", "cpu", object) as handle:
+        assert registry.loaded() == {("model", "cpu"): 1}
+    assert handle.released
+    assert registry.loaded() == {}
+
+
+def test_handle_is_released_when_collected():
+    registry = ModelRegistry()
+    handle = registry.acquire("model", "cpu", object)
+    released = registry.acquire("model", "cpu", object)
+    kept = registry.acquire("model", "cpu", object)
+    del handle
+    gc.collect()
+    assert registry.loaded() == {("model", "cpu"): 2}
+
+    # a released handle is not released again when it is collected
+    released.release()
+    del released
+    gc.collect()
+    assert registry.loaded() == {("model", "cpu"): 1}
+    kept.release()
+    assert registry.loaded() == {}
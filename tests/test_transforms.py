@@ -0,0 +1,48 @@
+"""
+Annotations are converted to a data frame with one row per aspect and back,
+and reviews without their annotations are an error instead of being dropped.
+"""
+
+import pytest
+
+pytest.importorskip("pandas")
+
+from pysent.data_structures import (
+    AspectAnnotation,
+    SentimentAnnotation,
+    transform_output,
+)
+from pysent.transforms import transform_aspects
+
+
+def test_data_frame_round_trip():
+    reviews = ["nice food, slow service", "no aspects", "cold soup"]
+    annotations = [
+        AspectAnnotation(
+            reviews[0],
+            [
+                SentimentAnnotation("food", "Positive"),
+                SentimentAnnotation("service", "negative"),
+            ],
+        ),
+        AspectAnnotation(reviews[1], []),
+        AspectAnnotation(reviews[2], [SentimentAnnotation("soup", "negative")]),
+    ]
+    data_frame = transform_output(reviews, annotations)
+    assert data_frame["review"].tolist() == [reviews[0], reviews[0], reviews[2]]
+    assert data_frame["label"].tolist() == ["positive", "negative", "negative"]
+
+    data_frame.insert(0, "id", data_frame.groupby("review", sort=False).ngroup())
+    restored = transform_aspects(data_frame, "id", "review", "aspect", "label")
+    assert [el.text for el in restored] == [reviews[0], reviews[2]]
+    assert [[aspect.text for aspect in el.aspects] for el in restored] == [
+        ["food", "service"],
+        ["soup"],
+    ]
+
+
+@pytest.mark.parametrize("n_annotations", [1, 3])
+def test_lengths_must_be_equal(n_annotations):
+    annotations = [AspectAnnotation("text", [])] * n_annotations
+    with pytest.raises(ValueError):
+        transform_output(["text", "text"], annotations)